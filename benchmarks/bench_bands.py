@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Benchmark healthy-weight bands: per slider event and per roster
+
+Compares the GUI's per-event label lookup (format_healthy_weight, a table
+hit for whole centimeters) with solving and formatting the band on every
+event, then times weight_bands_batch on a roster of random heights.
+
+    python benchmarks/bench_bands.py --rows 1000000
+"""
+
+import argparse
+import os
+import random
+import sys
+from array import array
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import utils
+from harness import measure, format_result
+from utils import format_healthy_weight, weight_bands_batch, _format_band
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Weight band benchmark")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    # A slider drag: every centimeter of the range, back and forth
+    drag = list(range(100, 251)) + list(range(250, 99, -1))
+    n = args.rows
+    heights = array('d', (rng.uniform(140, 200) for _ in range(n)))
+
+    format_healthy_weight(170)  # build the table outside the timing
+    results = [
+        measure(f"slider events, table lookup [{len(drag)}]",
+                lambda: [format_healthy_weight(cm, "imperial") for cm in drag], ops=len(drag)),
+        measure(f"slider events, solve per event [{len(drag)}]",
+                lambda: [_format_band(cm, "imperial", None) for cm in drag], ops=len(drag)),
+    ]
+    if utils._load_numpy() is not None:
+        results.append(measure(f"weight_bands_batch numpy[{n}]",
+                               lambda: weight_bands_batch(heights), samples=5, ops=n))
+    # The pure Python path is slow, so it runs on a tenth of the rows
+    small = n // 10
+    with mock.patch.object(utils, '_load_numpy', return_value=None):
+        results.append(measure(f"weight_bands_batch python[{small}]",
+                               lambda: weight_bands_batch(heights[:small]), samples=3, ops=small))
+    for result in results:
+        print(format_result(result))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Benchmark table-driven classification against the old if/elif chain
+
+    python benchmarks/bench_classification.py
+"""
+
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from harness import measure, format_result
+from classification import WHO_ADULT, WHO_OBESITY_CLASSES
+from utils import get_bmi_category
+
+def chain_category(bmi):
+    """get_bmi_category as it was before the cutoff tables"""
+    if bmi < 18.5:
+        return "Underweight", "#4A90E2"
+    elif bmi < 25:
+        return "Normal", "#7ED321"
+    elif bmi < 30:
+        return "Overweight", "#F5A623"
+    else:
+        return "Obese", "#D0021B"
+
+def chain_label(bmi):
+    """App.update_category's old label formatting"""
+    category, color = chain_category(bmi)
+    return f"{category} ({color})"
+
+def chain_obesity_classes(bmi):
+    if bmi < 18.5:
+        return "Underweight", "#4A90E2"
+    elif bmi < 25:
+        return "Normal", "#7ED321"
+    elif bmi < 30:
+        return "Overweight", "#F5A623"
+    elif bmi < 35:
+        return "Obese Class I", "#D0021B"
+    elif bmi < 40:
+        return "Obese Class II", "#A00115"
+    else:
+        return "Obese Class III", "#70010F"
+
+def main():
+    rng = random.Random(7)
+    values = [round(rng.uniform(14, 45), 2) for _ in range(1000)]
+    label_table = WHO_ADULT.label_table()
+    classify = WHO_ADULT.classify
+    classify_classes = WHO_OBESITY_CLASSES.classify
+
+    cases = [
+        ("scalar: if/elif chain", lambda: [chain_category(v) for v in values]),
+        ("scalar: utils.get_bmi_category", lambda: [get_bmi_category(v) for v in values]),
+        ("scalar: WHO_ADULT.classify", lambda: [classify(v) for v in values]),
+        ("6 classes: if/elif chain", lambda: [chain_obesity_classes(v) for v in values]),
+        ("6 classes: bisect", lambda: [classify_classes(v) for v in values]),
+        ("GUI label: chain + format", lambda: [chain_label(v) for v in values]),
+        ("GUI label: lookup table", lambda: [label_table.get(v) for v in values]),
+    ]
+    for name, fn in cases:
+        result = measure(name, fn, number=50, samples=30, ops=len(values))
+        print(format_result(result))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Benchmark Config lookups and multi-key updates
+
+Compares the old split-and-walk get() with the cached get() and compiled
+accessors, and N separate set() calls with one transaction().
+
+    python benchmarks/bench_config.py
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from harness import measure, format_result
+from config import Config
+
+KEYS = ['theme.primary_color', 'display.font_family', 'history.max_entries',
+        'window.width', 'features.auto_calculate', 'classification.scheme']
+
+def uncached_get(config, key, default=None):
+    """Config.get as it was before lookups were cached"""
+    value = config.config
+    try:
+        for k in key.split('.'):
+            value = value[k]
+        return value
+    except (KeyError, TypeError):
+        return default
+
+def main():
+    directory = tempfile.mkdtemp()
+    try:
+        config = Config(os.path.join(directory, 'config.json'))
+        accessors = [config.accessor(key) for key in KEYS]
+        lookups = len(KEYS) * 100
+        results = [
+            measure("get: split and walk", lambda: [uncached_get(config, key) for key in KEYS * 100],
+                    number=20, ops=lookups),
+            measure("get: cached", lambda: [config.get(key) for key in KEYS * 100],
+                    number=20, ops=lookups),
+            measure("get: compiled accessor", lambda: [read() for read in accessors * 100],
+                    number=20, ops=lookups),
+        ]
+
+        updates = 20
+
+        def separate_sets():
+            for i in range(updates):
+                config.set(f'bench.key{i}', i)
+
+        def transaction():
+            with config.transaction():
+                for i in range(updates):
+                    config.set(f'bench.key{i}', i)
+
+        results.append(measure(f"set: {updates} separate writes", separate_sets, samples=10))
+        results.append(measure(f"set: {updates} in one transaction", transaction, samples=10))
+    finally:
+        shutil.rmtree(directory)
+
+    for result in results:
+        print(format_result(result))
+
+if __name__ == "__main__":
+    main()
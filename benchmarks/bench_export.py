@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Benchmark streaming history export
+
+Writes a synthetic history log and exports it to CSV and JSONL, plain and
+gzip-compressed, reporting entries/sec and peak traced memory. Peak memory
+is measured for a log a tenth of the size too; it should not grow with the
+number of entries.
+
+    python benchmarks/bench_export.py --size 5000000
+"""
+
+import argparse
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from export import export_history_file
+from harness import measure, format_result
+from history import HISTORY_FILE
+from utils import get_bmi_category
+
+def write_log(path, size, rng):
+    """A history log of size entries, a few minutes apart"""
+    date = datetime(2015, 1, 1)
+    with open(path, 'w', encoding='utf-8') as f:
+        lines = []
+        for _ in range(size):
+            date += timedelta(minutes=rng.randint(1, 5))
+            height = rng.randint(150, 200)
+            weight = round(rng.uniform(45, 130), 1)
+            bmi = round(weight / (height / 100) ** 2, 2)
+            lines.append(json.dumps({'date': date.strftime("%Y-%m-%d %H:%M"), 'weight': weight,
+                                     'height': height, 'bmi': bmi, 'unit': 'metric',
+                                     'category': get_bmi_category(bmi)[0]}) + "\n")
+            if len(lines) >= 10_000:
+                f.writelines(lines)
+                lines.clear()
+        f.writelines(lines)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="History export benchmark")
+    parser.add_argument("--size", type=int, default=1_000_000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    cwd = os.getcwd()
+    directory = tempfile.mkdtemp()
+    os.chdir(directory)
+    try:
+        results = []
+        for size in (args.size // 10, args.size):
+            write_log(HISTORY_FILE, size, random.Random(args.seed))
+            for name in ("export.csv", "export.jsonl", "export.csv.gz", "export.jsonl.gz"):
+                results.append(measure(f"{name}[{size}]", lambda: export_history_file(name),
+                                       samples=3, ops=size))
+                results[-1]["output_bytes"] = os.path.getsize(name)
+        for result in results:
+            print(f"{format_result(result)}  output={result['output_bytes'] / 1e6:.1f}MB")
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(directory)
+
+if __name__ == "__main__":
+    main()
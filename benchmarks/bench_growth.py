@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Benchmark BMI-for-age batch scoring against adult batch scoring
+
+Scores the same number of rows with calculate_bmi_batch (adult cutoffs)
+and bmi_for_age_batch (LMS z-scores, percentiles and categories). Uses the
+installed reference table if there is one, otherwise a synthetic table of
+the CDC's shape (24-240 months); throughput does not depend on the values.
+
+    python benchmarks/bench_growth.py --rows 5000000
+"""
+
+import argparse
+import os
+import random
+import sys
+from array import array
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import growth
+import utils
+from growth import LMSTable, bmi_for_age_batch, get_table, MALE, FEMALE
+from harness import measure, format_result
+from utils import calculate_bmi_batch
+
+def synthetic_table():
+    """Smooth made-up LMS curves over 24-240 months (not a growth reference)"""
+    months = range(24, 241)
+    return LMSTable(24, len(months), {
+        sex: ([-2.0 + 0.005 * m for m in months],
+              [16.5 - 0.01 * m + 0.0002 * m * m / sex for m in months],
+              [0.08 + 0.0002 * m for m in months])
+        for sex in (MALE, FEMALE)})
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="BMI-for-age batch scoring benchmark")
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    try:
+        table, source = get_table(), "reference"
+    except FileNotFoundError:
+        table, source = synthetic_table(), "synthetic"
+    rng = random.Random(args.seed)
+    n = args.rows
+    weights = array('d', (rng.uniform(40, 120) for _ in range(n)))
+    heights = array('d', (rng.uniform(150, 200) for _ in range(n)))
+    bmis = array('d', (rng.uniform(12, 35) for _ in range(n)))
+    ages = array('d', (rng.uniform(table.first_month, table.last_month) for _ in range(n)))
+    sexes = array('b', (rng.choice((MALE, FEMALE)) for _ in range(n)))
+
+    samples = 5
+    results = []
+    if utils._load_numpy() is not None:
+        results.append(measure(f"calculate_bmi_batch numpy[{n}]",
+                               lambda: calculate_bmi_batch(weights, heights), samples=samples, ops=n))
+        results.append(measure(f"bmi_for_age_batch numpy[{n}] ({source} table)",
+                               lambda: bmi_for_age_batch(bmis, ages, sexes, table),
+                               samples=samples, ops=n))
+    # The pure Python paths are slow, so they run on a tenth of the rows
+    small = n // 10
+    with mock.patch.object(utils, '_load_numpy', return_value=None), \
+            mock.patch.object(growth, '_load_numpy', return_value=None):
+        results.append(measure(f"calculate_bmi_batch python[{small}]",
+                               lambda: calculate_bmi_batch(weights[:small], heights[:small]),
+                               samples=3, ops=small))
+        results.append(measure(f"bmi_for_age_batch python[{small}]",
+                               lambda: bmi_for_age_batch(bmis[:small], ages[:small], sexes[:small], table),
+                               samples=3, ops=small))
+    for result in results:
+        print(format_result(result))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Compare the memory of history entries as dicts and as HistoryRecords
+
+Loads the same JSONL history as plain dicts (as HistoryStore did before
+records) and through HistoryStore, and reports tracemalloc bytes retained
+per entry and the load time of each.
+
+    python benchmarks/bench_history_memory.py --size 1000000
+"""
+
+import argparse
+import gc
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from history import HistoryStore
+from utils import create_history_entry
+
+def load_dicts(path):
+    """HistoryStore's loop before entries became records"""
+    entries = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                entries.append(json.loads(line))
+    return entries
+
+def load_records(path):
+    return HistoryStore(path, None)._read_entries()[0]
+
+def retained(load, path):
+    """(entries, bytes retained by them, seconds to load)"""
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    entries = load(path)
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return entries, current, elapsed
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="History entry memory benchmark")
+    parser.add_argument("--size", type=int, default=100_000, help="entries in the history")
+    args = parser.parse_args(argv)
+
+    directory = tempfile.mkdtemp()
+    try:
+        path = os.path.join(directory, 'bmi_history.jsonl')
+        with open(path, 'w', encoding='utf-8') as f:
+            for i in range(args.size):
+                entry = create_history_entry(50 + i % 70, 150 + i % 50, 18 + (i % 170) / 10, "metric")
+                f.write(json.dumps(entry, separators=(',', ':')) + "\n")
+
+        for name, load in (("dict entries", load_dicts), ("HistoryRecord entries", load_records)):
+            entries, size, elapsed = retained(load, path)
+            print(f"{name:<24} {size / len(entries):>8.1f} bytes/entry  "
+                  f"{size / 2 ** 20:>8.1f} MiB total  load {elapsed:.2f}s (traced)")
+            del entries
+    finally:
+        shutil.rmtree(directory)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Measure the cost of crash-safe, multi-process-safe history appends
+
+Compares a bare append (what HistoryStore did before locking and the
+journal) with the locked, journaled append and with durable=True, then
+measures total throughput with several writer processes sharing one log.
+
+    python benchmarks/bench_history_writes.py --writers 4 --count 2000
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from harness import measure, format_result
+from history import HistoryStore
+from utils import create_history_entry
+
+ENTRY = create_history_entry(70, 175, 22.86, "metric")
+
+def bare_append(path, entry):
+    """Unlocked, unjournaled append"""
+    with open(path, 'ab') as f:
+        f.write((json.dumps(entry, separators=(',', ':')) + "\n").encode('utf-8'))
+
+def writer(path, count):
+    store = HistoryStore(path, None)
+    store.load()
+    for _ in range(count):
+        store.append(ENTRY)
+
+def concurrent_throughput(directory, writers, count):
+    path = os.path.join(directory, f'concurrent_{writers}.jsonl')
+    processes = [multiprocessing.Process(target=writer, args=(path, count)) for _ in range(writers)]
+    start = time.perf_counter()
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+    elapsed = time.perf_counter() - start
+    entries = HistoryStore(path, None).load()
+    return len(entries) / elapsed, len(entries) == writers * count
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="History write benchmark")
+    parser.add_argument("--writers", type=int, default=4, help="concurrent writer processes")
+    parser.add_argument("--count", type=int, default=1000, help="appends per writer")
+    args = parser.parse_args(argv)
+
+    directory = tempfile.mkdtemp()
+    try:
+        bare_path = os.path.join(directory, 'bare.jsonl')
+        store = HistoryStore(os.path.join(directory, 'safe.jsonl'), None)
+        store.load()
+        durable = HistoryStore(os.path.join(directory, 'durable.jsonl'), None, durable=True)
+        durable.load()
+        results = [
+            measure("append: bare (no lock, no journal)", lambda: bare_append(bare_path, ENTRY),
+                    number=200),
+            measure("append: locked + journal", lambda: store.append(ENTRY), number=200),
+            measure("append: locked + journal + fsync", lambda: durable.append(ENTRY),
+                    number=20, samples=10),
+        ]
+        for result in results:
+            print(format_result(result))
+
+        for writers in sorted({1, args.writers}):
+            rate, complete = concurrent_throughput(directory, writers, args.count)
+            print(f"{writers} writer process(es): {rate:,.0f} appends/s total"
+                  + ("" if complete else "  ENTRIES LOST"))
+    finally:
+        shutil.rmtree(directory)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Benchmark bulk history import against replaying rows one by one
+
+Writes a CSV of mixed-unit records (about 2% invalid) and imports it with
+importer.import_history, which validates and scores in batches and appends
+in one write. The baseline replays a sample of the rows the way a migration
+script would: validate_*, calculate_bmi and create_history_entry per row,
+then HistoryStore.append per entry (one locked, journaled write each).
+
+    python benchmarks/bench_import.py --rows 1000000 --memory
+"""
+
+import argparse
+import csv
+import io
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bulk import read_rows
+from history import HistoryStore
+from importer import import_history
+from utils import (
+    calculate_bmi, create_history_entry, validate_weight, validate_height,
+    convert_lbs_to_kg, convert_feet_inches_to_cm
+)
+
+def write_feed(path, rows, rng):
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(("date", "weight", "height", "unit"))
+        for i in range(rows):
+            date = f"20{10 + i * 14 // rows:02d}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d} 09:00"
+            kg, cm = rng.uniform(40, 160), rng.uniform(140, 210)
+            if rng.random() < 0.02:
+                writer.writerow((date, rng.choice(("", "abc", "900")), round(cm), "metric"))
+            elif rng.random() < 0.7:
+                writer.writerow((date, round(kg, 1), round(cm), "metric"))
+            else:
+                writer.writerow((date, round(kg * 2.20462, 1), round(cm / 30.48, 2), "imperial"))
+
+def replay(path, rows, store):
+    """Per-row validation, scoring and append of the first rows of the feed"""
+    with open(path, 'r', newline='', encoding='utf-8') as f:
+        for count, (_, row) in enumerate(read_rows(f, "csv")):
+            if count == rows:
+                break
+            try:
+                weight, height = float(row['weight']), float(row['height'])
+            except ValueError:
+                continue
+            unit = row['unit']
+            if not (validate_weight(weight, unit) and validate_height(height, unit)):
+                continue
+            if unit == "imperial":
+                weight, height = convert_lbs_to_kg(weight), convert_feet_inches_to_cm(0, height * 12)
+            store.append(create_history_entry(weight, height, calculate_bmi(weight, height), unit))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk history import benchmark")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--baseline-rows", type=int, default=20_000,
+                        help="rows replayed one by one for the baseline")
+    parser.add_argument("--memory", action="store_true",
+                        help="also measure peak memory (a slow tracemalloc run)")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    cwd = os.getcwd()
+    directory = tempfile.mkdtemp()
+    os.chdir(directory)
+    try:
+        write_feed("feed.csv", args.rows, random.Random(args.seed))
+
+        store = HistoryStore("baseline.jsonl", None)
+        baseline_rows = min(args.baseline_rows, args.rows)
+        start = time.perf_counter()
+        replay("feed.csv", baseline_rows, store)
+        elapsed = time.perf_counter() - start
+        print(f"per-row append[{baseline_rows}]   {baseline_rows / elapsed:>10,.0f} rows/s "
+              f"(~{args.rows * elapsed / baseline_rows:.1f}s for {args.rows} rows)")
+
+        start = time.perf_counter()
+        with open("feed.csv", 'r', newline='', encoding='utf-8') as f:
+            stats = import_history(f, rejects=io.StringIO())
+        elapsed = time.perf_counter() - start
+        print(f"import_history[{args.rows}]   {args.rows / elapsed:>10,.0f} rows/s ({elapsed:.1f}s, "
+              f"{stats.imported} imported, {stats.rejected} rejected)")
+
+        if args.memory:
+            os.remove("bmi_history.jsonl")
+            tracemalloc.start()
+            with open("feed.csv", 'r', newline='', encoding='utf-8') as f, \
+                    open("rejects.jsonl", 'w', encoding='utf-8') as rejects:
+                import_history(f, rejects=rejects)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            print(f"import_history[{args.rows}]   peak traced memory {peak / 2 ** 20:.1f}MiB")
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(directory)
+
+if __name__ == "__main__":
+    main()
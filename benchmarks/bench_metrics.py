@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""
+Measure what instrumentation costs on the hottest path
+
+Times utils.calculate_bmi in fresh interpreters with BMI_METRICS unset and
+set, since instrumentation is decided when utils is imported.
+
+    python benchmarks/bench_metrics.py
+"""
+
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SCRIPT = """
+import sys, timeit
+sys.path.insert(0, {root!r})
+from utils import calculate_bmi
+number = 200000
+best = min(timeit.repeat(lambda: calculate_bmi(70.5, 175), number=number, repeat=7))
+print(best / number * 1e9)
+"""
+
+def time_calculate_bmi(metrics_enabled):
+    env = dict(os.environ)
+    env.pop('BMI_METRICS', None)
+    if metrics_enabled:
+        env['BMI_METRICS'] = '1'
+    output = subprocess.run([sys.executable, '-c', SCRIPT.format(root=ROOT)], env=env,
+                            capture_output=True, text=True, check=True).stdout
+    return float(output)
+
+def main():
+    disabled = time_calculate_bmi(False)
+    enabled = time_calculate_bmi(True)
+    print(f"calculate_bmi, metrics disabled: {disabled:8.1f} ns/call")
+    print(f"calculate_bmi, metrics enabled:  {enabled:8.1f} ns/call (+{enabled - disabled:.1f} ns)")
+
+if __name__ == "__main__":
+    main()
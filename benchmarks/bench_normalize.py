@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Benchmark batch unit normalization against per-row conversion
+
+Builds a mixed feed of kg/cm, lbs + feet/inches and stones + feet/inches
+rows and normalizes it with the per-row helpers (branching on the unit,
+then validate_* and convert_* per row, as bulk.score_row and the console
+do) and with normalize_units_batch on both of its code paths.
+
+    python benchmarks/bench_normalize.py --rows 1000000
+"""
+
+import argparse
+import os
+import random
+import sys
+from array import array
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import utils
+from harness import measure, format_result
+from utils import (
+    normalize_units_batch, validate_weight, validate_height,
+    convert_lbs_to_kg, convert_feet_inches_to_cm, UNIT_CODES
+)
+
+def mixed_feed(count, rng):
+    """Columns of a feed that is half metric, a third imperial and the rest stones"""
+    weights, pounds, heights, inches, units = (array('d'), array('d'), array('d'),
+                                               array('d'), array('b'))
+    for _ in range(count):
+        kg = rng.uniform(40, 160)
+        cm = rng.uniform(140, 210)
+        unit = rng.choices(("metric", "imperial", "stones"), (3, 2, 1))[0]
+        total_inches = cm / 2.54
+        if unit == "metric":
+            row = (round(kg, 1), 0.0, round(cm), 0.0)
+        elif unit == "imperial":
+            row = (round(kg * 2.20462, 1), 0.0, total_inches // 12, round(total_inches % 12, 1))
+        else:
+            lbs = round(kg * 2.20462)
+            row = (lbs // 14, lbs % 14, total_inches // 12, round(total_inches % 12, 1))
+        for column, value in zip((weights, pounds, heights, inches), row):
+            column.append(value)
+        units.append(UNIT_CODES[unit])
+    return weights, heights, units, pounds, inches
+
+def normalize_per_row(weights, heights, units, pounds, inches):
+    """One branch, range check and conversion per row"""
+    weight_kg, height_cm, rejected = [], [], 0
+    for weight, height, unit, lbs, extra_inches in zip(weights, heights, units, pounds, inches):
+        if unit == 0:
+            valid = validate_weight(weight, "metric") and validate_height(height, "metric")
+            kg, cm = weight, height
+        else:
+            if unit == 2:
+                weight = weight * 14 + lbs
+            valid = (validate_weight(weight, "imperial")
+                     and validate_height(height + extra_inches / 12, "imperial"))
+            kg, cm = convert_lbs_to_kg(weight), convert_feet_inches_to_cm(0, height * 12 + extra_inches)
+        if not valid:
+            rejected += 1
+            continue
+        weight_kg.append(kg)
+        height_cm.append(cm)
+    return weight_kg, height_cm, rejected
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Unit normalization benchmark")
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    columns = mixed_feed(args.rows, random.Random(args.seed))
+
+    def python_batch():
+        with mock.patch.object(utils, '_load_numpy', return_value=None):
+            return normalize_units_batch(*columns)
+
+    samples = 5
+    results = [measure(f"per-row helpers[{args.rows}]", lambda: normalize_per_row(*columns),
+                       samples=samples, ops=args.rows)]
+    if utils._load_numpy() is not None:
+        results.append(measure(f"normalize_units_batch numpy[{args.rows}]",
+                               lambda: normalize_units_batch(*columns), samples=samples, ops=args.rows))
+    results.append(measure(f"normalize_units_batch python[{args.rows}]", python_batch,
+                           samples=samples, ops=args.rows))
+    for result in results:
+        print(format_result(result))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Benchmark parallel bulk scoring across worker counts
+
+Generates a CSV file, scores it with score_file_parallel at 1, 2, 4, ...
+workers up to the core count and prints throughput and scaling efficiency.
+
+    python benchmarks/bench_parallel_scoring.py --rows 2000000
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bulk import score_file_parallel
+
+def generate_csv(path, rows, seed=42):
+    """Write a CSV file of random metric rows"""
+    rng = random.Random(seed)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write("id,weight,height\n")
+        for i in range(rows):
+            f.write(f"{i},{rng.uniform(40, 160):.1f},{rng.randint(140, 210)}\n")
+
+def worker_counts(max_workers):
+    counts, n = [], 1
+    while n < max_workers:
+        counts.append(n)
+        n *= 2
+    counts.append(max_workers)
+    return counts
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=500000)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as directory:
+        input_path = os.path.join(directory, "input.csv")
+        generate_csv(input_path, args.rows)
+        print(f"{args.rows} rows, {os.path.getsize(input_path) / 1e6:.1f} MB, "
+              f"{os.cpu_count()} cores")
+        print(f"{'workers':>8} {'seconds':>9} {'rows/sec':>12} {'speedup':>8} {'efficiency':>10}")
+        baseline = None
+        for workers in worker_counts(args.max_workers):
+            with open(os.devnull, 'wb') as output:
+                stats = score_file_parallel(input_path, output, workers=workers)
+            baseline = baseline or stats.seconds
+            speedup = baseline / stats.seconds
+            print(f"{workers:>8} {stats.seconds:>9.2f} {stats.rows_per_second:>12.0f} "
+                  f"{speedup:>8.2f} {speedup / workers:>10.0%}")
+
+if __name__ == "__main__":
+    main()
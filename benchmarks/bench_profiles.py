@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Benchmark profile switching and the profile cache's memory bound
+
+Creates --profiles profiles of --entries entries each, then times loading
+a recently used profile (cache hit) against a cold one (disk), and checks
+that cycling through every profile keeps the cache within its bounds.
+
+    python benchmarks/bench_profiles.py --profiles 2000 --entries 20
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from harness import measure, format_result
+from profiles import ProfileStore
+from utils import create_history_entry
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Profile store benchmark")
+    parser.add_argument("--profiles", type=int, default=2000)
+    parser.add_argument("--entries", type=int, default=20, help="entries per profile")
+    parser.add_argument("--max-entries", type=int, default=5000, help="cache bound")
+    args = parser.parse_args(argv)
+
+    directory = tempfile.mkdtemp()
+    try:
+        root = os.path.join(directory, 'profiles')
+        writer = ProfileStore(root)
+        entry = create_history_entry(70, 175, 22.86, "metric")
+        ids = [f"patient-{i}" for i in range(args.profiles)]
+        for profile in ids:
+            path = writer.path(profile)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(''.join(f'{{"date":"{entry["date"]}","weight":70,"height":175,"bmi":22.86,'
+                                f'"unit":"metric","category":"Normal"}}\n' for _ in range(args.entries)))
+
+        store = ProfileStore(root, max_entries=args.max_entries)
+        store.load(ids[0])
+        cold = iter(ids[1:] * 2)
+
+        def load_cold():
+            profile = next(cold)
+            store.evict(profile)
+            store.load(profile)
+
+        results = [
+            measure("switch: recent profile (cache hit)", lambda: store.load(ids[0]), number=1000),
+            measure("switch: cold profile (disk)", load_cold, number=10, samples=10),
+        ]
+        for result in results:
+            print(format_result(result))
+
+        store = ProfileStore(root, max_entries=args.max_entries)
+        tracemalloc.start()
+        for profile in ids:
+            store.load(profile)
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"after loading all {args.profiles} profiles: {len(store.cached_profiles())} cached, "
+              f"{store.cached_entries()} entries (bound {args.max_entries}), "
+              f"{current / 1024:.0f} KiB retained, peak {peak / 1024:.0f} KiB")
+    finally:
+        shutil.rmtree(directory)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Cold-start benchmark for the console entry point
+
+Imports bmi_console in fresh interpreters with ``-X importtime`` and checks
+the median cumulative import time against a budget. The run also fails if
+the console entry point pulls in the GUI toolkit.
+
+    python benchmarks/bench_startup.py --runs 20 --budget-ms 35
+"""
+
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \| ( *)(\S+)")
+FORBIDDEN_MODULES = ("tkinter", "customtkinter", "numpy")
+
+def import_profile(module):
+    """
+    Import a module in a fresh interpreter
+
+    Returns:
+        Tuple of (cumulative import time in microseconds, dict of the module's
+        direct imports -> cumulative microseconds, set of every module imported)
+    """
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            cwd=ROOT, capture_output=True, text=True, check=True)
+    imported, children = set(), {}
+    # importtime prints children before their parent, indented by two spaces per level
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        _, cumulative, indent, name = match.groups()
+        imported.add(name)
+        if len(indent) == 2:
+            children[name] = int(cumulative)
+        elif not indent:
+            if name == module:
+                return int(cumulative), children, imported
+            children = {}
+    raise RuntimeError(f"{module} was not imported")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Console cold-start benchmark")
+    parser.add_argument("--module", default="bmi_console", help="module to import (default: bmi_console)")
+    parser.add_argument("--runs", type=int, default=15)
+    parser.add_argument("--budget-ms", type=float, default=35.0,
+                        help="maximum median cumulative import time (default: 35ms)")
+    parser.add_argument("--top", type=int, default=8, help="show the N slowest direct imports")
+    args = parser.parse_args(argv)
+
+    timings, children, imported = [], {}, set()
+    for _ in range(args.runs):
+        micros, children, imported = import_profile(args.module)
+        timings.append(micros / 1000)
+
+    median = statistics.median(timings)
+    print(f"{args.module}: median {median:.2f}ms, min {min(timings):.2f}ms, "
+          f"max {max(timings):.2f}ms over {args.runs} runs (budget {args.budget_ms:.0f}ms)")
+    print(f"Slowest imports made by {args.module} (last run):")
+    for name, micros in sorted(children.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"  {name:<30} {micros / 1000:>8.2f}ms")
+
+    failed = False
+    loaded = sorted(name for name in imported if name.split(".")[0] in FORBIDDEN_MODULES)
+    if loaded:
+        print(f"FAIL: {args.module} imports {', '.join(loaded)} at startup")
+        failed = True
+    if median > args.budget_ms:
+        print(f"FAIL: median import time {median:.2f}ms exceeds budget {args.budget_ms:.0f}ms")
+        failed = True
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
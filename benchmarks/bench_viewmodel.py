@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Benchmark the GUI's view-model with simulated input events, no Tk needed
+
+Replays a stream of slider drags (several positions per centimeter),
+weight button presses and unit toggles against BMIViewModel with no-op
+bound widgets, propagating after every event and once per simulated idle
+cycle (as the GUI does with after_idle), and reports events/sec plus how
+many recomputes and widget updates the events caused.
+
+    python benchmarks/bench_viewmodel.py --events 100000 --per-idle 8
+"""
+
+import argparse
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from harness import measure, format_result
+from viewmodel import BMIViewModel
+
+OUTPUTS = ('bmi_text', 'category_label', 'height_label', 'weight_label', 'unit_label')
+
+def input_events(count, rng):
+    """(kind, value) events: 90% slider positions, 9% weight steps, 1% unit toggles"""
+    events, position = [], 170.0
+    for _ in range(count):
+        roll = rng.random()
+        if roll < 0.9:
+            position = min(250.0, max(100.0, position + rng.uniform(-0.6, 0.6)))
+            events.append(('height', position))
+        elif roll < 0.99:
+            events.append(('weight', rng.choice((-1, -0.1, 0.1, 1))))
+        else:
+            events.append(('unit', None))
+    return events
+
+def new_view(schedule=None):
+    view = BMIViewModel(schedule=schedule)
+    for name in OUTPUTS:
+        view.bind(name, lambda value: None)
+    return view
+
+def replay(view, events, per_idle=0, pending=None):
+    """Feed events to the view, running pending flushes every per_idle events"""
+    for i, (kind, value) in enumerate(events, 1):
+        if kind == 'height':
+            view.set_height(value)
+        elif kind == 'weight':
+            view.step_weight(value)
+        else:
+            view.toggle_unit()
+        if per_idle and i % per_idle == 0:
+            while pending:
+                pending.pop()()
+    while pending:
+        pending.pop()()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="View-model event throughput benchmark")
+    parser.add_argument("--events", type=int, default=100_000)
+    parser.add_argument("--per-idle", type=int, default=8, help="events between simulated idle cycles")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    events = input_events(args.events, random.Random(args.seed))
+    pending = []
+    runs = [
+        ("view-model: propagate per event", lambda: new_view(), 0),
+        (f"view-model: propagate per {args.per_idle} events (idle)", lambda: new_view(pending.append),
+         args.per_idle),
+    ]
+    for name, make_view, per_idle in runs:
+        views = []
+
+        def run():
+            view = make_view()
+            views.append(view)
+            replay(view, events, per_idle, pending)
+
+        print(format_result(measure(f"{name} [{args.events}]", run, samples=5, ops=args.events)))
+        stats = views[-1].stats
+        print(f"    per 1000 events: {1000 * stats['flushes'] / args.events:.0f} propagations, "
+              f"{1000 * stats['recomputes'] / args.events:.0f} recomputes, "
+              f"{1000 * stats['notifications'] / args.events:.0f} widget updates")
+
+if __name__ == "__main__":
+    main()
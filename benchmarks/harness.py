@@ -0,0 +1,147 @@
+"""
+Minimal stdlib benchmark harness for BMI Calculator Pro
+
+Each benchmark is timed as a series of samples; a sample runs the function
+``number`` times, so per-op latencies are sample time / number. Peak memory
+is measured in a separate tracemalloc run so tracing does not skew timings.
+Results are plain dicts that serialize to JSON and can be compared between
+runs with compare_results.
+"""
+
+import gc
+import json
+import math
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional
+
+SCHEMA_VERSION = 1
+
+def percentile(values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of a list of values"""
+    ordered = sorted(values)
+    rank = math.ceil(fraction * len(ordered))
+    return ordered[min(len(ordered), max(1, rank)) - 1]
+
+def measure(name: str, fn: Callable[[], Any], number: int = 1, samples: int = 20,
+            setup: Optional[Callable[[], Any]] = None, ops: int = 1) -> Dict[str, Any]:
+    """
+    Time fn and record its peak memory
+
+    Args:
+        name: Benchmark name
+        fn: Function under test, called with no arguments
+        number: Calls per sample
+        samples: Number of timed samples
+        setup: Called before every sample (not timed)
+        ops: Operations performed by one call (e.g. rows scored), for ops/sec
+
+    Returns:
+        Result dict with ops_per_sec, p50/p99 latency per call and peak memory
+    """
+    if setup is not None:
+        setup()
+    fn()  # warm up caches and lazy imports
+
+    timings = []
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(samples):
+            if setup is not None:
+                setup()
+            start = time.perf_counter()
+            for _ in range(number):
+                fn()
+            timings.append((time.perf_counter() - start) / number)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+    if setup is not None:
+        setup()
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    mean = statistics.mean(timings)
+    return {
+        "name": name,
+        "number": number,
+        "samples": samples,
+        "ops_per_call": ops,
+        "ops_per_sec": ops / mean if mean > 0 else float("inf"),
+        "mean_s": mean,
+        "p50_s": percentile(timings, 0.50),
+        "p99_s": percentile(timings, 0.99),
+        "peak_memory_bytes": peak,
+    }
+
+def environment() -> Dict[str, str]:
+    """Describe the machine so results from different hosts are not compared blindly"""
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "executable": sys.executable,
+    }
+
+def write_results(path: str, results: List[Dict[str, Any]], metadata: Dict[str, Any] = None):
+    """Write benchmark results as JSON"""
+    document = {
+        "schema": SCHEMA_VERSION,
+        "environment": environment(),
+        "metadata": metadata or {},
+        "results": results,
+    }
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(document, f, indent=2, sort_keys=True)
+
+def load_results(path: str) -> Dict[str, Dict[str, Any]]:
+    """Load a results file as a dict keyed by benchmark name"""
+    with open(path, 'r', encoding='utf-8') as f:
+        document = json.load(f)
+    return {result["name"]: result for result in document["results"]}
+
+def compare_results(baseline: Dict[str, Dict[str, Any]], current: List[Dict[str, Any]],
+                    threshold: float = 0.10, metric: str = "p50_s") -> List[Dict[str, Any]]:
+    """
+    Compare results against a baseline
+
+    Args:
+        baseline: Results keyed by name, from load_results
+        current: Results of this run
+        threshold: Allowed relative slowdown (0.10 = 10%)
+        metric: Latency field to compare
+
+    Returns:
+        One dict per benchmark present in both runs, with the relative change
+        and whether it is a regression
+    """
+    rows = []
+    for result in current:
+        before = baseline.get(result["name"])
+        if before is None or not before.get(metric):
+            continue
+        change = result[metric] / before[metric] - 1
+        rows.append({
+            "name": result["name"],
+            "baseline": before[metric],
+            "current": result[metric],
+            "change": change,
+            "regression": change > threshold,
+        })
+    return rows
+
+def format_result(result: Dict[str, Any]) -> str:
+    """One-line human-readable summary of a result"""
+    return (f"{result['name']:<40} {result['ops_per_sec']:>14,.0f} ops/s "
+            f"p50 {result['p50_s'] * 1e6:>11.2f}us p99 {result['p99_s'] * 1e6:>11.2f}us "
+            f"peak {result['peak_memory_bytes'] / 1024:>10.1f}KiB")
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Load generator for the BMI scoring service
+
+Opens --connections keep-alive connections and sends requests back to back
+for --duration seconds, then reports requests/sec and latency percentiles.
+Without --url an in-process server is started on a free port.
+
+    python benchmarks/loadgen.py --connections 32 --duration 10
+    python benchmarks/loadgen.py --mode batch --batch-size 500
+    python benchmarks/loadgen.py --url http://127.0.0.1:8080
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from urllib.parse import urlsplit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from harness import percentile
+
+def build_requests(mode: str, batch_size: int, count: int = 256):
+    """Pre-encode a pool of requests so the client spends its time waiting"""
+    rng = random.Random(11)
+    requests = []
+    for _ in range(count):
+        if mode == "single":
+            requests.append(b"GET /bmi?weight=%.1f&height=%.1f HTTP/1.1\r\nHost: loadgen\r\n\r\n"
+                            % (rng.uniform(40, 150), rng.uniform(140, 210)))
+        else:
+            body = "".join(json.dumps({"weight": round(rng.uniform(40, 150), 1),
+                                       "height": round(rng.uniform(140, 210), 1)}) + "\n"
+                           for _ in range(batch_size)).encode("utf-8")
+            requests.append(b"POST /batch HTTP/1.1\r\nHost: loadgen\r\n"
+                            b"Content-Type: application/x-ndjson\r\nContent-Length: %d\r\n\r\n%s"
+                            % (len(body), body))
+    return requests
+
+async def read_response(reader: asyncio.StreamReader) -> int:
+    """Read one response and return its status code"""
+    head = await reader.readuntil(b"\r\n\r\n")
+    lines = head.decode("latin-1").split("\r\n")
+    status = int(lines[0].split(" ", 2)[1])
+    headers = {name.lower(): value.strip() for name, _, value in
+               (line.partition(":") for line in lines[1:] if line)}
+    if headers.get("transfer-encoding") == "chunked":
+        while True:
+            size = int((await reader.readuntil(b"\r\n")).split(b";")[0], 16)
+            await reader.readexactly(size + 2)
+            if size == 0:
+                break
+    else:
+        await reader.readexactly(int(headers.get("content-length", 0)))
+    return status
+
+async def client(host, port, requests, deadline, latencies, errors):
+    reader, writer = await asyncio.open_connection(host, port)
+    i = random.randrange(len(requests))
+    try:
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            writer.write(requests[i % len(requests)])
+            await writer.drain()
+            status = await read_response(reader)
+            latencies.append(time.perf_counter() - start)
+            if status != 200:
+                errors.append(status)
+            i += 1
+    finally:
+        writer.close()
+
+async def run_load(host, port, connections, duration, requests):
+    latencies, errors = [], []
+    deadline = time.perf_counter() + duration
+    start = time.perf_counter()
+    await asyncio.gather(*(client(host, port, requests, deadline, latencies, errors)
+                           for _ in range(connections)))
+    return latencies, errors, time.perf_counter() - start
+
+async def main_async(args):
+    requests = build_requests(args.mode, args.batch_size)
+    server = None
+    if args.url:
+        url = urlsplit(args.url)
+        host, port = url.hostname, url.port or 80
+    else:
+        from server import BMIServer
+        server = BMIServer(port=0, max_concurrency=args.max_concurrency)
+        await server.start()
+        host, port = server.host, server.port
+    try:
+        return await run_load(host, port, args.connections, args.duration, requests)
+    finally:
+        if server is not None:
+            await server.close()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--url", help="server to load (default: start one in-process)")
+    parser.add_argument("--mode", choices=("single", "batch"), default="single")
+    parser.add_argument("--batch-size", type=int, default=100, help="rows per batch request")
+    parser.add_argument("--connections", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=5.0, help="seconds")
+    parser.add_argument("--max-concurrency", type=int, default=64,
+                        help="concurrency limit of the in-process server")
+    args = parser.parse_args(argv)
+
+    latencies, errors, elapsed = asyncio.run(main_async(args))
+    if not latencies:
+        print("No requests completed")
+        return 1
+    rows = len(latencies) * (args.batch_size if args.mode == "batch" else 1)
+    print(f"{len(latencies)} requests over {args.connections} connections in {elapsed:.2f}s "
+          f"({len(errors)} errors)")
+    print(f"throughput: {len(latencies) / elapsed:,.0f} req/s, {rows / elapsed:,.0f} rows/s")
+    print("latency: " + "  ".join(f"p{label} {percentile(latencies, fraction) * 1000:.2f}ms"
+                                  for label, fraction in (("50", 0.50), ("90", 0.90),
+                                                          ("99", 0.99), ("99.9", 0.999))))
+    return 1 if errors else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
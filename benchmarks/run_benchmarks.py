@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for the utils hot paths, history I/O and bulk scoring
+
+    python benchmarks/run_benchmarks.py -o baseline.json
+    python benchmarks/run_benchmarks.py -o current.json --compare baseline.json --threshold 0.15
+
+Exits with status 1 when --compare finds a benchmark whose p50 latency grew
+by more than the threshold.
+"""
+
+import argparse
+import io
+import json
+import os
+import random
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from harness import measure, write_results, load_results, compare_results, format_result
+from bulk import read_rows, score_stream, ResultWriter
+from history import HistoryStore
+import utils
+
+SEED = 1234
+
+def micro_benchmarks(quick=False):
+    """One benchmark per utils function"""
+    number = 2000 if quick else 20000
+    samples = 10 if quick else 30
+    cases = [
+        ("utils.calculate_bmi", lambda: utils.calculate_bmi(70.5, 175)),
+        ("utils.get_bmi_category", lambda: utils.get_bmi_category(27.3)),
+        ("utils.convert_kg_to_lbs", lambda: utils.convert_kg_to_lbs(70.5)),
+        ("utils.convert_lbs_to_kg", lambda: utils.convert_lbs_to_kg(155.4)),
+        ("utils.convert_cm_to_feet_inches", lambda: utils.convert_cm_to_feet_inches(175)),
+        ("utils.convert_feet_inches_to_cm", lambda: utils.convert_feet_inches_to_cm(5, 9.5)),
+        ("utils.validate_weight", lambda: utils.validate_weight(70.5, "metric")),
+        ("utils.validate_height", lambda: utils.validate_height(175, "metric")),
+        ("utils.format_height_display[metric]", lambda: utils.format_height_display(175, "metric")),
+        ("utils.format_height_display[imperial]", lambda: utils.format_height_display(175, "imperial")),
+        ("utils.format_weight_display[metric]", lambda: utils.format_weight_display(70.5, "metric")),
+        ("utils.format_weight_display[imperial]", lambda: utils.format_weight_display(70.5, "imperial")),
+        ("utils.create_history_entry", lambda: utils.create_history_entry(70.5, 175, 23.02, "metric")),
+    ]
+    return [measure(name, fn, number=number, samples=samples) for name, fn in cases]
+
+def random_rows(count, rng):
+    return [(round(rng.uniform(40, 160), 1), rng.randint(140, 210)) for _ in range(count)]
+
+def bulk_benchmarks(quick=False):
+    """Batch and streaming scoring throughput"""
+    rng = random.Random(SEED)
+    count = 10000 if quick else 100000
+    rows = random_rows(count, rng)
+    weights = [w for w, _ in rows]
+    heights = [h for _, h in rows]
+    csv_text = "weight,height\n" + "".join(f"{w},{h}\n" for w, h in rows)
+
+    def score_csv():
+        score_stream(read_rows(io.StringIO(csv_text), "csv"), ResultWriter(io.StringIO(), "csv"))
+
+    samples = 3 if quick else 5
+    return [
+        measure(f"bulk.calculate_bmi_batch[{count}]", lambda: utils.calculate_bmi_batch(weights, heights),
+                samples=samples, ops=count),
+        measure(f"bulk.score_stream[csv,{count}]", score_csv, samples=samples, ops=count),
+    ]
+
+def history_benchmarks(directory, sizes, quick=False):
+    """History load, append and compaction at several sizes"""
+    rng = random.Random(SEED)
+    results = []
+    for size in sizes:
+        path = os.path.join(directory, f"history_{size}.jsonl")
+        entries = [utils.create_history_entry(w, h, utils.calculate_bmi(w, h), "metric")
+                   for w, h in random_rows(size, rng)]
+        store = HistoryStore(path, legacy_path=None)
+        store._write_entries(entries)
+        entry = entries[-1]
+        samples = 3 if quick or size >= 1000000 else 5 if size >= 100000 else 20
+        legacy_path = os.path.join(directory, f"history_{size}.json")
+
+        def rewrite_legacy():
+            with open(legacy_path, 'w') as f:
+                json.dump(entries, f, indent=2)
+
+        def restore():
+            store._write_entries(entries)
+
+        results.append(measure(f"history.load[{size}]", store.load, samples=samples, ops=size))
+        results.append(measure(f"history.append[{size}]", lambda: store.append(entry),
+                               number=100, samples=samples, setup=restore))
+        results.append(measure(f"history.compact[{size}]", store.compact, samples=samples, ops=size))
+        results.append(measure(f"history.legacy_json_save[{size}]", rewrite_legacy,
+                               samples=samples, ops=size))
+        del entries
+    return results
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Run the BMI Calculator Pro benchmark suite")
+    parser.add_argument("-o", "--output", default="benchmark_results.json", help="results file to write")
+    parser.add_argument("--compare", metavar="BASELINE", help="results file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="allowed relative p50 slowdown before failing (default: 0.10)")
+    parser.add_argument("--sizes", default="1000,100000,1000000",
+                        help="comma-separated history sizes (default: 1000,100000,1000000)")
+    parser.add_argument("--quick", action="store_true", help="fewer samples and smaller inputs")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    random.seed(SEED)
+    sizes = [int(size) for size in args.sizes.split(",") if size]
+
+    results = []
+    results += micro_benchmarks(args.quick)
+    results += bulk_benchmarks(args.quick)
+    with tempfile.TemporaryDirectory() as directory:
+        results += history_benchmarks(directory, sizes, args.quick)
+
+    for result in results:
+        print(format_result(result))
+    write_results(args.output, results, {"sizes": sizes, "quick": args.quick, "seed": SEED})
+    print(f"\nResults written to {args.output}")
+
+    if args.compare:
+        rows = compare_results(load_results(args.compare), results, args.threshold)
+        regressions = [row for row in rows if row["regression"]]
+        print(f"\nCompared with {args.compare} (threshold {args.threshold:.0%}):")
+        for row in rows:
+            flag = "REGRESSION" if row["regression"] else ""
+            print(f"{row['name']:<40} {row['change']:>+8.1%} {flag}")
+        if regressions:
+            print(f"\n{len(regressions)} benchmark(s) regressed")
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
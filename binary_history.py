@@ -0,0 +1,204 @@
+"""
+Fixed-width binary history format for BMI Calculator Pro
+
+Large aggregated histories are too slow and too big to load as JSON, so this
+module stores them as fixed-width little-endian records behind a small
+header. Files are opened with mmap: reading the last N entries or one column
+only touches those bytes, and columns are exposed as zero-copy views.
+
+Record layout (48 bytes):
+    timestamp  int64    seconds since the epoch
+    weight     float64  as saved in the JSON entry
+    height     float64  as saved in the JSON entry
+    bmi        float64
+    unit       uint8    index into UNITS
+    category   int8     index into records.CATEGORY_NAMES (every scheme's names)
+    (6 bytes padding)
+"""
+
+import mmap
+import struct
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+
+from records import CATEGORY_NAMES
+from utils import get_bmi_category, _load_numpy
+
+MAGIC = b'BMIH'
+VERSION = 1
+HEADER = struct.Struct('<4sHH8x')
+RECORD = struct.Struct('<qdddBb6x')
+DATE_FORMAT = "%Y-%m-%d %H:%M"
+UNITS = ("metric", "imperial")
+FIELDS = ("timestamp", "weight", "height", "bmi", "unit", "category")
+
+# Byte offset and struct format of each field inside a record
+_FIELD_LAYOUT = {
+    "timestamp": (0, 'q'),
+    "weight": (8, 'd'),
+    "height": (16, 'd'),
+    "bmi": (24, 'd'),
+    "unit": (32, 'B'),
+    "category": (33, 'b'),
+}
+
+def entry_to_record(entry: Dict[str, Any]) -> Tuple:
+    """
+    Convert a JSON history entry to a record tuple
+
+    Entries without a category (as saved by the GUI) get one from their BMI.
+
+    Raises:
+        ValueError: If the category is not a name of any classification scheme
+    """
+    timestamp = int(datetime.strptime(entry['date'], DATE_FORMAT).timestamp())
+    category = entry.get('category') or get_bmi_category(entry['bmi'])[0]
+    if category not in CATEGORY_NAMES:
+        raise ValueError(f"Unknown category: {category!r}")
+    return (timestamp, float(entry['weight']), float(entry['height']), float(entry['bmi']),
+            UNITS.index(entry.get('unit', 'metric')), CATEGORY_NAMES.index(category))
+
+def record_to_entry(record: Tuple) -> Dict[str, Any]:
+    """Convert a record tuple to the layout produced by create_history_entry"""
+    timestamp, weight, height, bmi, unit, category = record
+    return {
+        'date': datetime.fromtimestamp(timestamp).strftime(DATE_FORMAT),
+        'weight': weight,
+        'height': height,
+        'bmi': bmi,
+        'unit': UNITS[unit],
+        'category': CATEGORY_NAMES[category]
+    }
+
+def write_binary_history(path: str, entries: Iterable[Dict[str, Any]]) -> int:
+    """
+    Write JSON history entries to a new binary history file
+
+    Returns:
+        Number of records written
+    """
+    count = 0
+    with open(path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, RECORD.size))
+        for entry in entries:
+            f.write(RECORD.pack(*entry_to_record(entry)))
+            count += 1
+    return count
+
+def append_binary_history(path: str, entries: Iterable[Dict[str, Any]]) -> int:
+    """Append JSON history entries to an existing binary history file"""
+    count = 0
+    with open(path, 'ab') as f:
+        for entry in entries:
+            f.write(RECORD.pack(*entry_to_record(entry)))
+            count += 1
+    return count
+
+class Column:
+    """Zero-copy, read-only view of one field across all records"""
+
+    def __init__(self, view: memoryview, index: int):
+        self._view = view
+        self._index = index
+
+    def __len__(self) -> int:
+        return self._view.shape[0]
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self._view[j, self._index] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("column index out of range")
+        return self._view[i, self._index]
+
+    def __iter__(self) -> Iterator:
+        view, index = self._view, self._index
+        for i in range(view.shape[0]):
+            yield view[i, index]
+
+class BinaryHistory:
+    """Memory-mapped, read-only binary history file"""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, record_size = HEADER.unpack_from(self._mmap)
+        if magic != MAGIC or version != VERSION or record_size != RECORD.size:
+            self._mmap.close()
+            raise ValueError(f"{path} is not a version {VERSION} binary history file")
+        self._count = (len(self._mmap) - HEADER.size) // RECORD.size
+        self._data = memoryview(self._mmap)[HEADER.size:HEADER.size + self._count * RECORD.size]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def close(self):
+        """Unmap the file; columns still referenced keep the mapping alive"""
+        try:
+            self._data.release()
+            self._mmap.close()
+        except BufferError:
+            pass
+
+    def record(self, i: int) -> Tuple:
+        """Decode record i as a (timestamp, weight, height, bmi, unit, category) tuple"""
+        if i < 0:
+            i += self._count
+        if not 0 <= i < self._count:
+            raise IndexError("record index out of range")
+        return RECORD.unpack_from(self._data, i * RECORD.size)
+
+    def records(self, start: int = 0, stop: int = None) -> Iterator[Tuple]:
+        """Decode records in [start, stop) without touching the rest of the file"""
+        start, stop, _ = slice(start, stop).indices(self._count)
+        yield from RECORD.iter_unpack(self._data[start * RECORD.size:stop * RECORD.size])
+
+    def entries(self, start: int = 0, stop: int = None) -> Iterator[Dict[str, Any]]:
+        """Decode records in [start, stop) as JSON history entries"""
+        for record in self.records(start, stop):
+            yield record_to_entry(record)
+
+    def tail(self, n: int) -> List[Dict[str, Any]]:
+        """Return the last n entries, oldest first"""
+        return list(self.entries(max(0, self._count - n)))
+
+    def raw(self, start: int = 0, stop: int = None) -> memoryview:
+        """Zero-copy bytes of records in [start, stop)"""
+        start, stop, _ = slice(start, stop).indices(self._count)
+        return self._data[start * RECORD.size:stop * RECORD.size]
+
+    def column(self, name: str) -> Column:
+        """Zero-copy view of one field, indexed by record number"""
+        offset, fmt = _FIELD_LAYOUT[name]
+        size = struct.calcsize(fmt)
+        if not self._count:
+            return Column(self._data.cast(fmt), 0)
+        view = self._data.cast(fmt, shape=[self._count, RECORD.size // size])
+        return Column(view, offset // size)
+
+    def numpy_column(self, name: str):
+        """
+        Zero-copy NumPy view of one field
+
+        Raises:
+            ImportError: If NumPy is not installed
+        """
+        np = _load_numpy()
+        if np is None:
+            raise ImportError("NumPy is required for numpy_column")
+        dtype = np.dtype({
+            'names': list(FIELDS),
+            'formats': ['<i8', '<f8', '<f8', '<f8', 'u1', 'i1'],
+            'offsets': [_FIELD_LAYOUT[field][0] for field in FIELDS],
+            'itemsize': RECORD.size,
+        })
+        return np.frombuffer(self._data, dtype=dtype)[name]
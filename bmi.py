@@ -1,8 +1,13 @@
 import customtkinter as ctk
 from settings import *
-import json
 import os
-from datetime import datetime
+import time
+from profiles import ProfileStore, DEFAULT_PROFILE, normalize_profile_id
+from records import HistoryRecord
+from classification import get_scheme, DEFAULT_SCHEME
+from config import get_config
+from viewmodel import BMIViewModel
+import metrics
 
 class App(ctk.CTk):
     def __init__(self):
@@ -16,29 +21,28 @@ class App(ctk.CTk):
         self.columnconfigure(0, weight = 1)
         self.rowconfigure((0, 1, 2, 3, 4, 5), weight= 1, uniform = 'a')
 
-        # Data 
-        self.height_int = ctk.IntVar( value = 170 )
-        self.weight_float = ctk.DoubleVar( value = 65 )
-        self.bmi_string = ctk.StringVar()
-        self.category_string = ctk.StringVar()
-        self.unit_mode = ctk.StringVar(value="metric")  # metric or imperial
+        # Data: widgets set the view-model's inputs and bind to its outputs;
+        # changes propagate once per idle cycle, so a slider drag costs at
+        # most one recompute per idle cycle
+        self.view = BMIViewModel(height=170, weight=65.0, unit="metric",
+                                 scheme=self.load_scheme(), schedule=self.after_idle)
         self.history = []
+        self.profiles = ProfileStore()
+        self.profile = DEFAULT_PROFILE
         self.load_history()
-        self.update_bmi()
-        
-        # Setup for Tracing 
-        self.height_int.trace('w', self.update_bmi)
-        self.weight_float.trace('w', self.update_bmi)
 
         # Widget Setup 
-        ResultText(self, self.bmi_string, self.category_string)
-        WeightInput(self, self.weight_float, self.unit_mode)
-        HeightInput(self, self.height_int, self.unit_mode)
-        UnitSwitcher(self, self.unit_mode, self)
-        HistoryPanel(self, self.history, self)
+        ResultText(self, self.view)
+        WeightInput(self, self.view)
+        HeightInput(self, self.view)
+        UnitSwitcher(self, self.view)
+        self.history_panel = HistoryPanel(self, self.history, self)
         
         # Center window on screen
         self.center_window()
+        
+        if os.environ.get('BMI_PROFILE_UPDATES'):
+            self._report_update_rates(time.perf_counter())
 
         self.mainloop()
     
@@ -51,86 +55,143 @@ class App(ctk.CTk):
         y = (self.winfo_screenheight() // 2) - (height // 2)
         self.geometry(f'{width}x{height}+{x}+{y}')
     
-    def update_bmi(self, *args):
-        height_meter = self.height_int.get() / 100
-        weight_kg = self.weight_float.get()
-        if height_meter > 0:  # Prevent division by zero
-            bmi_result = round(weight_kg / height_meter ** 2, 2)
-            self.bmi_string.set(bmi_result)
-            self.update_category(bmi_result)
-        else:
-            self.bmi_string.set("0.0")
-            self.category_string.set("")
+    def _report_update_rates(self, since, last=None):
+        """Print input events/sec vs recomputes/sec every 2 seconds"""
+        now = time.perf_counter()
+        stats = dict(self.view.stats)
+        last = last or dict.fromkeys(stats, 0)
+        events = stats['events'] - last['events']
+        if now > since and events:
+            print(f"view-model: {events / (now - since):.1f} input events/sec, "
+                  f"{(stats['flushes'] - last['flushes']) / (now - since):.1f} updates/sec, "
+                  f"{(stats['recomputes'] - last['recomputes']) / (now - since):.1f} recomputes/sec")
+        self.after(2000, self._report_update_rates, now, stats)
     
-    def update_category(self, bmi):
-        """Update BMI category based on BMI value"""
-        if bmi < 18.5:
-            category = "Underweight"
-            color = "#4A90E2"  # Blue
-        elif bmi < 25:
-            category = "Normal"
-            color = "#7ED321"  # Green
-        elif bmi < 30:
-            category = "Overweight"
-            color = "#F5A623"  # Orange
-        else:
-            category = "Obese"
-            color = "#D0021B"  # Red
-        
-        self.category_string.set(f"{category} ({color})")
+    def load_scheme(self):
+        """Classification scheme from the 'classification.scheme' setting"""
+        try:
+            return get_scheme(get_config().get('classification.scheme', DEFAULT_SCHEME))
+        except ValueError as e:
+            print(f"Error loading classification scheme: {e}")
+            return get_scheme(DEFAULT_SCHEME)
     
     def save_to_history(self):
         """Save current BMI calculation to history"""
-        entry = {
-            'date': datetime.now().strftime("%Y-%m-%d %H:%M"),
-            'weight': self.weight_float.get(),
-            'height': self.height_int.get(),
-            'bmi': float(self.bmi_string.get()),
-            'unit': self.unit_mode.get()
-        }
-        self.history.append(entry)
-        self.save_history()
+        view = self.view
+        entry = HistoryRecord.create(view['weight'], view['height'], view['bmi'] or 0.0, view['unit'],
+                                     view.scheme.key)
+        if self.save_history(entry):
+            self.history_panel.append_entry(entry)
     
+    @metrics.timed('history.load')
     def load_history(self):
-        """Load BMI history from file"""
+        """Load the current profile's BMI history"""
         try:
-            if os.path.exists('bmi_history.json'):
-                with open('bmi_history.json', 'r') as f:
-                    self.history = json.load(f)
-        except:
+            # The profile store keeps this list up to date on save
+            self.history = self.profiles.load(self.profile)
+        except OSError as e:
+            # Saves only ever append, so an unreadable file is not overwritten
+            print(f"Error loading history: {e}")
             self.history = []
+        self.history_store = self.profiles.store(self.profile)
+        if self.history_store.skipped_lines:
+            self.history_store.compact(background=True)
+    
+    @metrics.timed('history.save')
+    def save_history(self, entry):
+        """
+        Append a history entry to the current profile (in memory and on file)
+        
+        Returns:
+            Whether the entry was saved; on failure the history panel shows
+            the error and the in-memory history is unchanged
+        """
+        try:
+            self.profiles.append(self.profile, entry)
+        except OSError as e:
+            self.history_panel.status_label.configure(text=f"Could not save: {e}")
+            return False
+        self.history_panel.status_label.configure(text="")
+        return True
+    
+    def export_history(self):
+        """Ask for a file and stream the current profile's history to it in the background"""
+        from tkinter import filedialog
+        path = filedialog.asksaveasfilename(
+            parent=self, title="Export history", defaultextension=".csv",
+            filetypes=[("CSV", "*.csv"), ("CSV, gzip", "*.csv.gz"),
+                       ("JSON Lines", "*.jsonl"), ("JSON Lines, gzip", "*.jsonl.gz")])
+        if not path:
+            return
+        from export import export_history_file
+        import threading
+        
+        result = []
+        
+        def run(profile=self.profile):
+            try:
+                result.append(export_history_file(path, profiles=[profile], store=self.profiles))
+            except (OSError, ValueError) as e:
+                result.append(e)
+        
+        threading.Thread(target=run, daemon=True).start()
+        self.history_panel.status_label.configure(text="Exporting...")
+        self._poll_export(result, os.path.basename(path))
+    
+    def _poll_export(self, result, name):
+        """Show the export's outcome once the background thread has finished"""
+        if not result:
+            self.after(100, self._poll_export, result, name)
+        elif isinstance(result[0], Exception):
+            self.history_panel.status_label.configure(text=f"Export failed: {result[0]}")
+        else:
+            self.history_panel.status_label.configure(text=f"Exported {result[0].entries} entries to {name}")
     
-    def save_history(self):
-        """Save BMI history to file"""
+    def switch_profile(self, profile_id):
+        """Make another profile current; recently used profiles load from memory"""
         try:
-            with open('bmi_history.json', 'w') as f:
-                json.dump(self.history, f, indent=2)
-        except:
-            pass
+            profile = normalize_profile_id(profile_id)
+        except ValueError as e:
+            print(e)
+            self.history_panel.show_profile(self.profile)
+            return
+        if profile != self.profile:
+            self.profile = profile
+            self.load_history()
+            self.history_panel.set_history(self.history)
+        self.history_panel.show_profile(profile)
 
 class ResultText(ctk.CTkFrame):
-    def __init__(self, parent, bmi_string, category_string):
+    def __init__(self, parent, view):
         super().__init__(master=parent, fg_color="transparent")
         self.grid(column=0, row=0, rowspan=2, sticky='nsew', padx=20, pady=20)
         
         # BMI Display
         font_large = ctk.CTkFont(family=FONT, size=MAIN_TEXT_SIZE, weight='bold')
         self.bmi_label = ctk.CTkLabel(self, text="22.5", font=font_large, 
-                                     text_color=WHITE, textvariable=bmi_string)
+                                     text_color=WHITE)
         self.bmi_label.pack(expand=True)
         
         # Category Display
         font_medium = ctk.CTkFont(family=FONT, size=INPUT_FONT_SIZE, weight='bold')
         self.category_label = ctk.CTkLabel(self, text="", font=font_medium,
-                                         text_color=WHITE, textvariable=category_string)
+                                         text_color=WHITE)
         self.category_label.pack(pady=10)
 
+        # Healthy weight range at the slider's height
+        font_small = ctk.CTkFont(family=FONT, size=SWITCH_FONT_SIZE)
+        self.band_label = ctk.CTkLabel(self, text="", font=font_small, text_color=WHITE)
+        self.band_label.pack(pady=(0, 10))
+
+        view.bind('bmi_text', lambda text: self.bmi_label.configure(text=text))
+        view.bind('category_label', lambda text: self.category_label.configure(text=text))
+        view.bind('band_label', lambda text: self.band_label.configure(text=text))
+
 class WeightInput(ctk.CTkFrame):
-    def __init__(self, parent, weight_float, unit_mode):
+    def __init__(self, parent, view):
         super().__init__(master=parent, fg_color=WHITE)
         self.grid(column=0, row=2, sticky='nsew', padx=10, pady=10)
-        self.weight_float = weight_float
-        self.unit_mode = unit_mode
+        self.view = view
 
         # Layout for Weight Input
         self.rowconfigure(0, weight=1, uniform='b')
@@ -145,8 +206,8 @@ class WeightInput(ctk.CTkFrame):
         self.label = ctk.CTkLabel(self, text='70kg', text_color=BLACK, font=font)
         self.label.grid(row=0, column=2)
         
-        # Update label when unit changes
-        self.unit_mode.trace('w', self.update_label)
+        # Update label when the weight or unit changes
+        view.bind('weight_label', lambda text: self.label.configure(text=text))
 
         # Buttons Setup 
         minus_button = ctk.CTkButton(self, command=lambda: self.update_weight(('minus', 'large')), text='-', 
@@ -191,77 +252,42 @@ class WeightInput(ctk.CTkFrame):
         
     def update_weight(self, info=None):
         amount = 1 if info[1] == 'large' else 0.1
-        if info[0] == 'plus':
-            self.weight_float.set(self.weight_float.get() + amount)
-        else:
-            self.weight_float.set(self.weight_float.get() - amount)
-    
-    def update_label(self, *args):
-        unit = self.unit_mode.get()
-        weight = self.weight_float.get()
-        if unit == "metric":
-            self.label.configure(text=f"{weight:.1f}kg")
-        else:
-            lbs = weight * 2.20462
-            self.label.configure(text=f"{lbs:.1f}lbs")
+        self.view.step_weight(amount if info[0] == 'plus' else -amount)
 
 class HeightInput(ctk.CTkFrame):
-    def __init__(self, parent, height_int, unit_mode):
+    def __init__(self, parent, view):
         super().__init__(master=parent, fg_color=WHITE)
         self.grid(row=3, column=0, sticky='nsew', padx=10, pady=10)
-        self.height_int = height_int
-        self.unit_mode = unit_mode
 
         # Widgets Setup 
         self.slider = ctk.CTkSlider(master=self, 
-                               command=self.update_text,
+                               command=view.set_height,
                                button_color=GREEN, 
                                button_hover_color=GRAY, 
                                progress_color=GREEN, 
                                fg_color=LIGHT_GRAY,
-                               variable=height_int, 
                                from_=100, to=250)
+        self.slider.set(view['height'])
         self.slider.pack(side='left', fill='x', expand=True, padx=10, pady=10)
 
-        self.output_string = ctk.StringVar()
-        self.update_text(height_int.get())
-        self.unit_mode.trace('w', lambda *args: self.update_text(height_int.get()))
-
-        self.output_text = ctk.CTkLabel(self, textvariable=self.output_string, text='1.80m', text_color=BLACK, 
+        self.output_text = ctk.CTkLabel(self, text='1.80m', text_color=BLACK, 
                                    font=ctk.CTkFont(family=FONT, 
                                                   size=INPUT_FONT_SIZE))
         self.output_text.pack(side='left', padx=10, pady=10)
-    
-    def update_text(self, amount):
-        unit = self.unit_mode.get()
-        if unit == "metric":
-            # Measurement Conversion 
-            text_string = str(int(amount))
-            if len(text_string) >= 2:
-                meter = text_string[0]
-                cm = text_string[1:]
-                self.output_string.set(f'{meter}.{cm}m')
-            else:
-                self.output_string.set(f'0.{text_string}m')
-        else:
-            # Imperial conversion
-            cm = int(amount)
-            feet = cm // 30.48
-            inches = (cm % 30.48) / 2.54
-            self.output_string.set(f"{feet}'{inches:.1f}\"")
+        # The slider reports every pixel of a drag; the view-model only
+        # notifies when the whole-centimeter label actually changes
+        view.bind('height_label', lambda text: self.output_text.configure(text=text))
 
 class UnitSwitcher(ctk.CTkFrame):
-    def __init__(self, parent, unit_mode, app):
+    def __init__(self, parent, view):
         super().__init__(master=parent, fg_color="transparent")
         self.place(relx=0.98, rely=0.01, anchor='ne')
-        self.unit_mode = unit_mode
-        self.app = app
         
         # Create switch button
         self.switch_button = ctk.CTkButton(
             self, 
             text="Metric", 
-            command=self.toggle_unit,
+            command=view.toggle_unit,
             font=ctk.CTkFont(family=FONT, size=SWITCH_FONT_SIZE, weight='bold'),
             fg_color=DARK_GREEN,
             hover_color=GREEN,
@@ -271,25 +297,20 @@ class UnitSwitcher(ctk.CTkFrame):
         self.switch_button.pack()
         
         # Update button text when unit changes
-        self.unit_mode.trace('w', self.update_button_text)
-    
-    def toggle_unit(self):
-        current = self.unit_mode.get()
-        if current == "metric":
-            self.unit_mode.set("imperial")
-        else:
-            self.unit_mode.set("metric")
-    
-    def update_button_text(self, *args):
-        unit = self.unit_mode.get()
-        self.switch_button.configure(text=unit.title())
+        view.bind('unit_label', lambda text: self.switch_button.configure(text=text))
 
 class HistoryPanel(ctk.CTkFrame):
+    VISIBLE_ROWS = 5
+    
     def __init__(self, parent, history, app):
         super().__init__(master=parent, fg_color=WHITE)
         self.grid(row=4, column=0, sticky='nsew', padx=10, pady=10)
         self.history = history
         self.app = app
+        # Index of the first visible entry; the panel follows the newest
+        # entries until the user scrolls back
+        self.first = max(0, len(history) - self.VISIBLE_ROWS)
+        self.shown = []
         
         # Title
         title = ctk.CTkLabel(self, text="BMI History", 
@@ -297,33 +318,141 @@ class HistoryPanel(ctk.CTkFrame):
                             text_color=BLACK)
         title.pack(pady=5)
         
-        # Save button
-        save_button = ctk.CTkButton(self, text="Save Current", 
+        # Profile switcher: pick a known profile or type a new ID and press Enter
+        self.profile_box = ctk.CTkComboBox(self, values=self.app.profiles.profiles() or [DEFAULT_PROFILE],
+                                           command=self.app.switch_profile,
+                                           font=ctk.CTkFont(family=FONT, size=12))
+        self.profile_box.set(self.app.profile)
+        self.profile_box.bind('<Return>', lambda event: self.app.switch_profile(self.profile_box.get()))
+        self.profile_box.pack(pady=2)
+        
+        # Running statistics, kept up to date by the history store
+        self.summary_label = ctk.CTkLabel(self, text="", justify='left',
+                                          font=ctk.CTkFont(family=FONT, size=10),
+                                          text_color=BLACK)
+        self.summary_label.pack(pady=2)
+        
+        # Save and export buttons
+        buttons = ctk.CTkFrame(self, fg_color="transparent")
+        buttons.pack(pady=5)
+        save_button = ctk.CTkButton(buttons, text="Save Current", 
                                    command=self.app.save_to_history,
                                    font=ctk.CTkFont(family=FONT, size=12),
                                    fg_color=GREEN, hover_color=DARK_GREEN,
                                    text_color=WHITE)
-        save_button.pack(pady=5)
+        save_button.pack(side='left', padx=5)
+        export_button = ctk.CTkButton(buttons, text="Export...", 
+                                     command=self.app.export_history,
+                                     font=ctk.CTkFont(family=FONT, size=12),
+                                     fg_color=LIGHT_GRAY, hover_color=GRAY,
+                                     text_color=BLACK)
+        export_button.pack(side='left', padx=5)
+        self.status_label = ctk.CTkLabel(self, text="", font=ctk.CTkFont(family=FONT, size=10),
+                                         text_color=BLACK)
+        self.status_label.pack()
         
-        # History display
-        self.history_text = ctk.CTkTextbox(self, height=100, 
+        # History display: the textbox only ever holds the visible rows, the
+        # scrollbar moves the window over the full history
+        self.scrollbar = ctk.CTkScrollbar(self, command=self.on_scroll)
+        self.scrollbar.pack(side='right', fill='y', pady=5)
+        self.history_text = ctk.CTkTextbox(self, height=100, activate_scrollbars=False,
                                           font=ctk.CTkFont(family=FONT, size=10))
         self.history_text.pack(fill='both', expand=True, padx=10, pady=5)
+        self.history_text.bind('<MouseWheel>', self.on_mousewheel)
+        self.history_text.bind('<Button-4>', lambda event: self.scroll_to(self.first - 1))
+        self.history_text.bind('<Button-5>', lambda event: self.scroll_to(self.first + 1))
         
         self.update_history_display()
+        self.update_summary()
+    
+    @staticmethod
+    def format_entry(entry):
+        return f"{entry['date']}: BMI {entry['bmi']} ({entry['weight']}kg, {entry['height']}cm)"
+    
+    def following(self):
+        """True when the newest entry is visible"""
+        return self.first + len(self.shown) >= len(self.history) - 1
     
     def update_history_display(self):
+        """Redraw the visible rows (only VISIBLE_ROWS entries are formatted)"""
+        self.history_text.configure(state='normal')
         self.history_text.delete("1.0", "end")
         if not self.history:
+            self.shown = []
             self.history_text.insert("1.0", "No history yet. Save your first BMI!")
+        else:
+            self.shown = [self.format_entry(entry)
+                          for entry in self.history[self.first:self.first + self.VISIBLE_ROWS]]
+            self.history_text.insert("1.0", "\n".join(self.shown))
+        self.history_text.configure(state='disabled')
+        self.update_scrollbar()
+    
+    def set_history(self, history):
+        """Show another profile's history, starting at its newest entries"""
+        self.history = history
+        self.first = max(0, len(history) - self.VISIBLE_ROWS)
+        self.update_history_display()
+        self.update_summary()
+    
+    def show_profile(self, profile):
+        self.profile_box.set(profile)
+        known = self.app.profiles.profiles()
+        if profile not in known:
+            known.append(profile)
+        self.profile_box.configure(values=known)
+    
+    def update_summary(self):
+        summary = self.app.history_store.summary
+        self.summary_label.configure(text="\n".join(summary.describe()) if summary else "")
+    
+    def append_entry(self, entry):
+        """Show an entry that was just appended to the history"""
+        self.update_summary()
+        if len(self.history) == 1:
+            # The first entry replaces the placeholder text
+            self.update_history_display()
+            return
+        if not self.following():
+            # Scrolled back: the visible rows stay, only the scrollbar moves
+            self.update_scrollbar()
             return
         
-        # Show last 5 entries
-        recent = self.history[-5:]
-        for entry in reversed(recent):
-            text = f"{entry['date']}: BMI {entry['bmi']} ({entry['weight']}kg, {entry['height']}cm)\n"
-            self.history_text.insert("1.0", text)
+        self.history_text.configure(state='normal')
+        if len(self.shown) == self.VISIBLE_ROWS:
+            self.history_text.delete("1.0", "2.0")
+            self.shown.pop(0)
+            self.first += 1
+        line = self.format_entry(entry)
+        self.history_text.insert("end", ("\n" if self.shown else "") + line)
+        self.shown.append(line)
+        self.history_text.configure(state='disabled')
+        self.update_scrollbar()
+    
+    def scroll_to(self, first):
+        """Show the rows starting at history index first"""
+        first = max(0, min(first, len(self.history) - self.VISIBLE_ROWS))
+        if first != self.first:
+            self.first = first
+            self.update_history_display()
+    
+    def on_scroll(self, action, amount, unit=None):
+        if action == 'moveto':
+            self.scroll_to(int(float(amount) * len(self.history)))
+        elif action == 'scroll':
+            step = self.VISIBLE_ROWS if unit == 'pages' else 1
+            self.scroll_to(self.first + int(amount) * step)
+    
+    def on_mousewheel(self, event):
+        self.scroll_to(self.first - (1 if event.delta > 0 else -1))
+    
+    def update_scrollbar(self):
+        total = len(self.history)
+        if total <= self.VISIBLE_ROWS:
+            self.scrollbar.set(0, 1)
+        else:
+            self.scrollbar.set(self.first / total, (self.first + len(self.shown)) / total)
 
 if __name__ == '__main__':
+    metrics.start_snapshots()
     App()
     
\ No newline at end of file
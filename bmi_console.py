@@ -3,40 +3,63 @@ BMI Calculator Pro - Console Version
 A fully functional BMI calculator that works without GUI dependencies
 """
 
+import argparse
 import sys
 import os
-from datetime import datetime
-import json
+from datetime import datetime, timedelta
 
 # Import our utility functions
 from utils import (
     calculate_bmi, get_bmi_category, convert_kg_to_lbs, convert_lbs_to_kg,
     convert_cm_to_feet_inches, convert_feet_inches_to_cm,
-    validate_weight, validate_height, create_history_entry
+    validate_weight, validate_height
 )
+from classification import SCHEMES, DEFAULT_SCHEME, get_scheme
+import metrics
 
 class ConsoleBMICalculator:
-    def __init__(self):
+    def __init__(self, profile=None):
+        from profiles import ProfileStore, DEFAULT_PROFILE, normalize_profile_id
+        
         self.history = []
         self.unit_mode = "metric"
+        self.scheme = DEFAULT_SCHEME
+        self.profiles = ProfileStore()
+        self.profile = normalize_profile_id(profile or DEFAULT_PROFILE)
         self.load_history()
     
+    @metrics.timed('history.load')
     def load_history(self):
-        """Load BMI history from file"""
+        """Load the current profile's BMI history"""
+        from history import TimeIndex
+        
         try:
-            if os.path.exists('bmi_history.json'):
-                with open('bmi_history.json', 'r') as f:
-                    self.history = json.load(f)
-        except:
+            # The profile store keeps this list up to date on save and clear
+            self.history = self.profiles.load(self.profile)
+        except OSError as e:
+            # Saves only ever append, so an unreadable file is not overwritten
+            print(f"Error loading history: {e}")
             self.history = []
+        self.history_store = self.profiles.store(self.profile)
+        if self.history_store.skipped_lines:
+            self.history_store.compact(background=True)
+        self.time_index = TimeIndex(self.history)
     
-    def save_history(self):
-        """Save BMI history to file"""
+    @metrics.timed('history.save')
+    def save_history(self, entry):
+        """
+        Append a history entry to the current profile (in memory and on file)
+        
+        Returns:
+            Whether the entry was saved; on failure a warning is printed and
+            the in-memory history is unchanged
+        """
         try:
-            with open('bmi_history.json', 'w') as f:
-                json.dump(self.history, f, indent=2)
-        except:
-            pass
+            self.profiles.append(self.profile, entry)
+        except OSError as e:
+            print(f"\n⚠️ Could not save to history: {e}")
+            return False
+        return True
     
     def clear_screen(self):
         """Clear the console screen"""
@@ -97,7 +120,7 @@ class ConsoleBMICalculator:
         
         # Calculate BMI
         bmi = calculate_bmi(weight_kg, height_cm)
-        category, color = get_bmi_category(bmi)
+        category, color = get_bmi_category(bmi, self.scheme)
         
         # Display in both units
         weight_lbs = convert_kg_to_lbs(weight_kg)
@@ -110,20 +133,21 @@ class ConsoleBMICalculator:
         print(f"🎨 Color Code: {color}")
         
         # BMI interpretation
-        print("\n📋 BMI Categories:")
-        print("• Underweight: < 18.5 (Blue)")
-        print("• Normal: 18.5 - 24.9 (Green)")
-        print("• Overweight: 25 - 29.9 (Orange)")
-        print("• Obese: ≥ 30 (Red)")
+        scheme = get_scheme(self.scheme)
+        print(f"\n📋 BMI Categories ({scheme.label}):")
+        for line in scheme.describe():
+            print(f"• {line}")
         
         return bmi, category
     
     def save_to_history(self, weight_kg, height_cm, bmi, category):
         """Save current calculation to history"""
-        entry = create_history_entry(weight_kg, height_cm, bmi, self.unit_mode)
-        self.history.append(entry)
-        self.save_history()
-        print(f"\n✅ Saved to history: {entry['date']}")
+        from records import HistoryRecord
+        
+        entry = HistoryRecord.create(weight_kg, height_cm, bmi, self.unit_mode, self.scheme)
+        if self.save_history(entry):
+            self.time_index.add(entry, len(self.history) - 1)
+            print(f"\n✅ Saved to history: {entry['date']}")
     
     def show_history(self):
         """Display BMI history"""
@@ -138,14 +162,94 @@ class ConsoleBMICalculator:
         # Show last 10 entries
         recent = self.history[-10:]
         for i, entry in enumerate(reversed(recent), 1):
-            print(f"{i:2d}. {entry['date']}: BMI {entry['bmi']} ({entry['category']})")
+            category = entry.get('category') or get_bmi_category(entry['bmi'], self.scheme)[0]
+            print(f"{i:2d}. {entry['date']}: BMI {entry['bmi']} ({category})")
             print(f"    Weight: {entry['weight']}kg, Height: {entry['height']}cm")
+        
+        summary = self.history_store.summary
+        if summary is not None and summary.count:
+            print("\n📈 Summary")
+            for line in summary.describe():
+                print(f"   {line}")
+    
+    def read_date(self, prompt):
+        """Ask for a YYYY-MM-DD date; an empty answer means no limit"""
+        while True:
+            text = input(prompt).strip()
+            if not text:
+                return None
+            try:
+                return datetime.strptime(text, "%Y-%m-%d")
+            except ValueError:
+                print("❌ Please enter a date as YYYY-MM-DD")
+    
+    def show_history_between(self, start=None, end=None):
+        """
+        Display history entries saved between two dates, both days included
+        
+        Args:
+            start: First day as a datetime, or None for no lower bound
+            end: Last day as a datetime, or None for no upper bound
+        """
+        lower = start.timestamp() if start else None
+        upper = (end + timedelta(days=1)).timestamp() if end else None
+        positions = self.time_index.between(lower, upper)
+        
+        print("\n" + "=" * 40)
+        print("📅 BMI HISTORY BETWEEN DATES")
+        print("=" * 40)
+        if not positions:
+            print("No entries in that range.")
+            return
+        for i, position in enumerate(positions, 1):
+            entry = self.history[position]
+            category = entry.get('category') or get_bmi_category(entry['bmi'], self.scheme)[0]
+            print(f"{i:2d}. {entry['date']}: BMI {entry['bmi']} ({category})")
+            print(f"    Weight: {entry['weight']}kg, Height: {entry['height']}cm")
+        print(f"\n{len(positions)} entries")
+    
+    def export_history(self, path, start=None, end=None, categories=None, all_profiles=False):
+        """
+        Stream the current profile's history (or every profile's) to a file
+        
+        Args:
+            path: CSV or JSONL file, gzip-compressed if it ends in .gz
+            start: First day as a datetime, or None for no lower bound
+            end: Last day as a datetime, or None for no upper bound
+            categories: Category names to keep, or None for all
+            all_profiles: Export every profile instead of the current one
+        """
+        from export import export_history_file
+        
+        stats = export_history_file(path, profiles=None if all_profiles else [self.profile],
+                                    start=start, end=end + timedelta(days=1) if end else None,
+                                    categories=categories, store=self.profiles)
+        print(f"\n📤 Exported {stats.entries} entries to {path} in {stats.seconds:.2f}s"
+              + (f" ({stats.skipped} unreadable lines skipped)" if stats.skipped else ""))
     
     def toggle_units(self):
         """Toggle between metric and imperial units"""
         self.unit_mode = "imperial" if self.unit_mode == "metric" else "metric"
         print(f"\n🔄 Switched to {self.unit_mode} units")
     
+    def next_scheme(self):
+        """Cycle through the available classification schemes"""
+        keys = list(SCHEMES)
+        self.scheme = keys[(keys.index(self.scheme) + 1) % len(keys)]
+        print(f"\n🔄 Switched to {get_scheme(self.scheme).label} categories")
+    
+    def switch_profile(self, profile_id):
+        """Make another profile current, loading its history"""
+        from profiles import normalize_profile_id
+        
+        try:
+            self.profile = normalize_profile_id(profile_id)
+        except ValueError as e:
+            print(f"❌ {e}")
+            return
+        self.load_history()
+        print(f"\n👤 Switched to profile {self.profile} ({len(self.history)} entries)")
+    
     def show_menu(self):
         """Display main menu"""
         print("\n📋 MAIN MENU")
@@ -155,12 +259,21 @@ class ConsoleBMICalculator:
         print("3. Switch Units (Current: " + self.unit_mode.title() + ")")
         print("4. Clear History")
         print("5. Exit")
+        # Options added since 1.0 come after Exit so its number stays 5
+        print("6. Switch Categories (Current: " + get_scheme(self.scheme).label + ")")
+        print("7. View History Between Dates")
+        print("8. Switch Profile (Current: " + self.profile + ")")
+        print("9. Export History")
         print()
     
     def clear_history(self):
-        """Clear BMI history"""
-        self.history = []
-        self.save_history()
+        """Clear the current profile's BMI history"""
+        self.time_index.clear()
+        try:
+            self.profiles.clear(self.profile)
+        except OSError as e:
+            print(f"❌ Could not clear history file: {e}")
+            return
         print("🗑️ History cleared!")
     
     def run(self):
@@ -171,7 +284,7 @@ class ConsoleBMICalculator:
             self.show_menu()
             
             try:
-                choice = input("Enter your choice (1-5): ").strip()
+                choice = input("Enter your choice (1-9, q to quit): ").strip().lower()
                 
                 if choice == "1":
                     print("\n🧮 BMI CALCULATOR")
@@ -201,12 +314,41 @@ class ConsoleBMICalculator:
                         self.clear_history()
                     input("Press Enter to continue...")
                 
-                elif choice == "5":
+                elif choice in ("5", "q", "quit", "exit"):
                     print("\n👋 Thanks for using BMI Calculator Pro!")
                     break
                 
+                elif choice == "6":
+                    self.next_scheme()
+                    input("Press Enter to continue...")
+                
+                elif choice == "7":
+                    start = self.read_date("From date (YYYY-MM-DD, blank for earliest): ")
+                    end = self.read_date("To date (YYYY-MM-DD, blank for latest): ")
+                    self.show_history_between(start, end)
+                    input("\nPress Enter to continue...")
+                
+                elif choice == "8":
+                    known = self.profiles.profiles()
+                    if known:
+                        print("\n👥 Profiles: " + ", ".join(known[:20]) + (" ..." if len(known) > 20 else ""))
+                    profile = input("Profile ID (blank to keep current): ").strip()
+                    if profile:
+                        self.switch_profile(profile)
+                    input("Press Enter to continue...")
+                
+                elif choice == "9":
+                    path = input("Export to (.csv, .jsonl, add .gz to compress): ").strip()
+                    if path:
+                        start = self.read_date("From date (YYYY-MM-DD, blank for earliest): ")
+                        end = self.read_date("To date (YYYY-MM-DD, blank for latest): ")
+                        category = input("Category (blank for all): ").strip()
+                        everyone = input("All profiles? (y/n): ").lower().strip() in ['y', 'yes']
+                        self.export_history(path, start, end, [category] if category else None, everyone)
+                    input("\nPress Enter to continue...")
+                
                 else:
-                    print("❌ Invalid choice. Please enter 1-5.")
+                    print("❌ Invalid choice. Please enter 1-9.")
                     input("Press Enter to continue...")
                     
             except KeyboardInterrupt:
@@ -216,10 +358,136 @@ class ConsoleBMICalculator:
                 print(f"\n❌ Error: {e}")
                 input("Press Enter to continue...")
 
-def main():
+def score_file(input_path, output_path="-", rejects_path=None, input_format=None,
+               output_format=None, progress_every=0, workers=1):
+    """
+    Score a CSV/JSONL file non-interactively
+    
+    Args:
+        input_path: Input file, or "-" for stdin
+        output_path: Output file, or "-" for stdout
+        rejects_path: File that receives rejected rows as JSON lines
+        input_format: "csv" or "jsonl" (guessed from the file name if None)
+        output_format: "csv" or "jsonl" (same as the input if None)
+        progress_every: Report progress to stderr every N rows (0 disables)
+        workers: Worker processes; more than 1 shards the file across cores
+            (files only: stdin cannot be split into shards)
+        
+    Returns:
+        ScoreStats for the run
+        
+    Raises:
+        ValueError: If workers is not 1 and input_path is "-"
+    """
+    from bulk import detect_format, read_rows, score_stream, score_file_parallel, ResultWriter
+    
+    input_format = input_format or detect_format(input_path)
+    output_format = output_format or (detect_format(output_path, input_format)
+                                      if output_path != "-" else input_format)
+    if workers != 1:
+        if input_path == "-":
+            raise ValueError("--workers needs an input file; stdin is scored in one process")
+        
+        def report(done, total, rows):
+            if progress_every:
+                print(f"{done}/{total} shards, {rows} rows", file=sys.stderr)
+        
+        output = sys.stdout.buffer if output_path == "-" else open(output_path, 'wb')
+        rejects = open(rejects_path, 'w', encoding='utf-8') if rejects_path else None
+        try:
+            return score_file_parallel(input_path, output, rejects, input_format, output_format,
+                                       workers=workers or None, progress=report)
+        finally:
+            for stream in (output, rejects):
+                if stream not in (None, sys.stdout.buffer):
+                    stream.close()
+    
+    source = sys.stdin if input_path == "-" else open(input_path, 'r', newline='', encoding='utf-8')
+    output = sys.stdout if output_path == "-" else open(output_path, 'w', newline='', encoding='utf-8')
+    rejects = open(rejects_path, 'w', encoding='utf-8') if rejects_path else None
+    try:
+        return score_stream(read_rows(source, input_format), ResultWriter(output, output_format),
+                            rejects, progress_every=progress_every)
+    finally:
+        for stream in (source, output, rejects):
+            if stream not in (None, sys.stdin, sys.stdout):
+                stream.close()
+
+def parse_args(argv=None):
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description="BMI Calculator Pro - Console Version")
+    parser.add_argument("--score", metavar="INPUT",
+                        help="score a CSV/JSONL file (\"-\" for stdin) instead of running interactively")
+    parser.add_argument("-o", "--output", default="-", help="output file for --score (default: stdout)")
+    parser.add_argument("--rejects", help="write rejected rows of --score or --import to this file as JSON lines")
+    parser.add_argument("--input-format", choices=("csv", "jsonl"), help="input format (default: from file name)")
+    parser.add_argument("--output-format", choices=("csv", "jsonl"), help="output format (default: input format)")
+    parser.add_argument("--progress", type=int, default=0, metavar="N",
+                        help="report progress every N rows")
+    parser.add_argument("--workers", type=int, default=1, metavar="N",
+                        help="score with N worker processes (0 for one per core); "
+                             "needs an input file, not stdin")
+    parser.add_argument("--import", dest="import_path", metavar="INPUT",
+                        help="import records from a CSV/JSONL file (\"-\" for stdin) into --profile's history and exit")
+    parser.add_argument("--profile", help="start with this history profile (default: default)")
+    parser.add_argument("--export", metavar="OUTPUT",
+                        help="export history to a .csv/.jsonl file (.gz to compress, \"-\" for stdout) and exit")
+    parser.add_argument("--from", dest="start", type=parse_day, metavar="YYYY-MM-DD",
+                        help="--export entries saved on or after this day")
+    parser.add_argument("--to", dest="end", type=parse_day, metavar="YYYY-MM-DD",
+                        help="--export entries saved on or before this day")
+    parser.add_argument("--category", action="append", help="--export only this category (repeatable)")
+    parser.add_argument("--all-profiles", action="store_true",
+                        help="--export every profile instead of --profile")
+    args = parser.parse_args(argv)
+    if args.score == "-" and args.workers != 1:
+        parser.error("--workers needs an input file; stdin (\"-\") is scored in one process")
+    return args
+
+def parse_day(text):
+    """argparse type for YYYY-MM-DD dates"""
+    try:
+        return datetime.strptime(text, "%Y-%m-%d")
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid date {text!r} (use YYYY-MM-DD)")
+
+def main(argv=None):
     """Start the console BMI calculator"""
+    args = parse_args(argv)
+    metrics.start_snapshots()
+    if args.score:
+        stats = score_file(args.score, args.output, args.rejects, args.input_format,
+                           args.output_format, args.progress, args.workers)
+        print(f"Scored {stats.rows} rows, rejected {stats.rejected} "
+              f"in {stats.seconds:.2f}s ({stats.rows_per_second:.0f} rows/sec)", file=sys.stderr)
+        return
+    if args.import_path:
+        from importer import import_history_file
+        from profiles import DEFAULT_PROFILE
+        
+        def report(imported, rejected):
+            if args.progress:
+                print(f"{imported} imported, {rejected} rejected", file=sys.stderr)
+        
+        stats = import_history_file(args.import_path, args.input_format, args.rejects,
+                                    profile=args.profile or DEFAULT_PROFILE, progress=report)
+        print(f"Imported {stats.imported} entries, rejected {stats.rejected} "
+              f"in {stats.seconds:.2f}s ({stats.rows_per_second:.0f} rows/sec)", file=sys.stderr)
+        return
+    if args.export:
+        from export import export_history_file
+        from profiles import DEFAULT_PROFILE
+        
+        stats = export_history_file(
+            args.export, profiles=None if args.all_profiles else [args.profile or DEFAULT_PROFILE],
+            start=args.start, end=args.end + timedelta(days=1) if args.end else None,
+            categories=args.category)
+        print(f"Exported {stats.entries} entries, skipped {stats.skipped} "
+              f"in {stats.seconds:.2f}s ({stats.entries_per_second:.0f} entries/sec)", file=sys.stderr)
+        return
+    
     try:
-        calculator = ConsoleBMICalculator()
+        calculator = ConsoleBMICalculator(args.profile)
         calculator.run()
     except Exception as e:
         print(f"❌ Application error: {e}")
@@ -0,0 +1,366 @@
+"""
+Bulk scoring of CSV/JSONL files for BMI Calculator Pro
+
+Rows are read, scored and written one at a time so memory use does not grow
+with the size of the input. Each input row needs a ``weight`` and ``height``
+column and may carry a ``unit`` column ("metric" for kg/cm, "imperial" for
+lbs/feet; metric when omitted). Any other columns are passed through.
+
+CSV output has one fixed set of columns: the first scored row's columns,
+plus weight, height and unit if it lacked them, then the score columns. A
+later JSONL row with a column outside that set is rejected rather than
+written without it.
+"""
+
+import csv
+import json
+import os
+import sys
+import time
+from typing import Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, TextIO, Tuple
+
+from utils import (
+    calculate_bmi, get_bmi_category, convert_lbs_to_kg, convert_feet_inches_to_cm,
+    validate_weight, validate_height
+)
+
+FORMATS = ("csv", "jsonl")
+INPUT_COLUMNS = ("weight", "height", "unit")
+SCORE_COLUMNS = ("weight_kg", "height_cm", "bmi", "category")
+
+class RowError(ValueError):
+    """Raised for an input row that cannot be scored"""
+
+class ScoringCancelled(Exception):
+    """Raised when a parallel scoring run is cancelled"""
+
+class ScoreStats(NamedTuple):
+    """Counters for a bulk scoring run"""
+    rows: int
+    rejected: int
+    seconds: float
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds > 0 else 0.0
+
+def detect_format(path: str, default: str = "csv") -> str:
+    """Guess the input format from a file name ("-" uses the default)"""
+    lowered = path.lower()
+    if lowered.endswith((".jsonl", ".ndjson", ".json")):
+        return "jsonl"
+    if lowered.endswith(".csv"):
+        return "csv"
+    return default
+
+def read_rows(stream: TextIO, fmt: str = "csv") -> Iterator[Tuple[int, Any]]:
+    """
+    Yield (line_number, row) pairs from a CSV or JSONL stream
+
+    Malformed JSONL lines are yielded as RowError instances instead of rows so
+    the caller can reject them without stopping the run.
+    """
+    if fmt == "csv":
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, row
+    elif fmt == "jsonl":
+        for line_number, line in enumerate(stream, 1):
+            if not line.strip():
+                continue
+            try:
+                yield line_number, json.loads(line)
+            except ValueError as e:
+                yield line_number, RowError(f"Invalid JSON: {e}")
+    else:
+        raise ValueError(f"Unknown format: {fmt}")
+
+def _number(row: Dict[str, Any], key: str) -> float:
+    value = row.get(key)
+    if value is None or value == "":
+        raise RowError(f"Missing {key}")
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        raise RowError(f"Invalid {key}: {value!r}")
+
+def score_row(row: Any) -> Dict[str, Any]:
+    """
+    Score one input row
+
+    Args:
+        row: Mapping with weight, height and optional unit
+
+    Returns:
+        The row with weight_kg, height_cm, bmi and category added
+
+    Raises:
+        RowError: If the row is malformed or out of the valid ranges
+    """
+    if isinstance(row, RowError):
+        raise row
+    if not isinstance(row, dict):
+        raise RowError("Row is not an object")
+    unit = str(row.get("unit") or "metric").strip().lower()
+    if unit not in ("metric", "imperial"):
+        raise RowError(f"Invalid unit: {unit!r}")
+    weight = _number(row, "weight")
+    height = _number(row, "height")
+    if not validate_weight(weight, unit):
+        raise RowError(f"Weight out of range for {unit} units: {weight}")
+    if not validate_height(height, unit):
+        raise RowError(f"Height out of range for {unit} units: {height}")
+
+    if unit == "metric":
+        weight_kg, height_cm = weight, height
+    else:
+        weight_kg = convert_lbs_to_kg(weight)
+        height_cm = convert_feet_inches_to_cm(0, height * 12)
+    bmi = calculate_bmi(weight_kg, height_cm)
+    result = dict(row)
+    result["weight_kg"] = round(weight_kg, 2)
+    result["height_cm"] = round(height_cm, 2)
+    result["bmi"] = bmi
+    result["category"] = get_bmi_category(bmi)[0]
+    return result
+
+def output_fields(result: Dict[str, Any]) -> List[str]:
+    """CSV columns for a run whose first scored row is result"""
+    fields = [key for key in result if key not in SCORE_COLUMNS]
+    fields += [key for key in INPUT_COLUMNS if key not in fields]
+    return fields + list(SCORE_COLUMNS)
+
+class ResultWriter:
+    """Write scored rows as CSV or JSONL"""
+
+    def __init__(self, stream: TextIO, fmt: str = "csv", fieldnames: Optional[List[str]] = None):
+        """
+        Args:
+            stream: Output text stream
+            fmt: "csv" or "jsonl"
+            fieldnames: CSV columns (from the first row written if None)
+        """
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown format: {fmt}")
+        self.stream = stream
+        self.fmt = fmt
+        self.fieldnames = fieldnames
+        self._csv = None
+
+    def write(self, result: Dict[str, Any]):
+        """
+        Write one scored row
+
+        Raises:
+            RowError: If a CSV row has columns outside the output's columns
+        """
+        if self.fmt == "jsonl":
+            self.stream.write(json.dumps(result) + "\n")
+            return
+        if self._csv is None:
+            if self.fieldnames is None:
+                self.fieldnames = output_fields(result)
+            self._csv = csv.DictWriter(self.stream, fieldnames=self.fieldnames, lineterminator="\n")
+            self._csv.writeheader()
+        try:
+            self._csv.writerow(result)
+        except ValueError:
+            extra = [key for key in result if key not in self.fieldnames]
+            raise RowError(f"Columns not in the CSV output: {', '.join(map(str, extra))}")
+
+def write_reject(stream: TextIO, line_number: int, error: Exception, row: Any):
+    """Write a rejected row to the reject stream as one JSON line"""
+    record = {"line": line_number, "error": str(error)}
+    if not isinstance(row, Exception):
+        record["row"] = row
+    stream.write(json.dumps(record) + "\n")
+
+def score_stream(rows: Iterable[Tuple[int, Any]], writer: ResultWriter,
+                 rejects: Optional[TextIO] = None, progress_every: int = 0,
+                 progress: Optional[TextIO] = None) -> ScoreStats:
+    """
+    Score rows as they arrive and write each result immediately
+
+    Args:
+        rows: (line_number, row) pairs, e.g. from read_rows
+        writer: Destination for scored rows
+        rejects: Stream for rows that fail scoring (dropped when None)
+        progress_every: Report progress every N rows (0 disables)
+        progress: Stream for progress reports (stderr by default)
+
+    Returns:
+        ScoreStats for the run
+    """
+    progress = progress or sys.stderr
+    scored = rejected = 0
+    start = time.perf_counter()
+    for line_number, row in rows:
+        try:
+            writer.write(score_row(row))
+        except RowError as e:
+            rejected += 1
+            if rejects is not None:
+                write_reject(rejects, line_number, e, row)
+            continue
+        scored += 1
+        if progress_every and scored % progress_every == 0:
+            elapsed = time.perf_counter() - start
+            progress.write(f"{scored} rows, {scored / elapsed:.0f} rows/sec\n")
+    return ScoreStats(scored, rejected, time.perf_counter() - start)
+
+def plan_shards(path: str, shards: int, fmt: str = "csv") -> List[Tuple[int, int]]:
+    """
+    Split a file into byte ranges that start and end on line boundaries
+
+    Records must be one per line (no quoted newlines inside CSV fields). For
+    CSV the header line is left out of every range.
+
+    Returns:
+        List of (start, end) byte offsets covering the data lines
+    """
+    size = os.path.getsize(path)
+    with open(path, 'rb') as f:
+        first = len(f.readline()) if fmt == "csv" else 0
+        boundaries = [first]
+        for i in range(1, shards):
+            position = first + (size - first) * i // shards
+            if position <= boundaries[-1]:
+                continue
+            f.seek(position - 1)
+            f.readline()
+            if f.tell() >= size:
+                break
+            if f.tell() > boundaries[-1]:
+                boundaries.append(f.tell())
+    boundaries.append(size)
+    return [(start, end) for start, end in zip(boundaries, boundaries[1:]) if end > start]
+
+def _shard_lines(path: str, start: int, end: int, counter: List[int]) -> Iterator[str]:
+    with open(path, 'rb') as f:
+        f.seek(start)
+        position = start
+        while position < end:
+            line = f.readline()
+            if not line:
+                break
+            position += len(line)
+            counter[0] += 1
+            yield line.decode('utf-8')
+
+def _score_shard(path: str, fmt: str, output_format: str, start: int, end: int,
+                 header: Optional[str], fieldnames: Optional[List[str]], directory: str, index: int):
+    """Score one byte range into temp files (runs in a worker process)"""
+    counter = [0]
+    lines = _shard_lines(path, start, end, counter)
+    if header is not None:
+        lines = _prepend(header, lines)
+    output_path = os.path.join(directory, f"{index}.out")
+    rejects_path = os.path.join(directory, f"{index}.rej")
+    with open(output_path, 'w', newline='', encoding='utf-8') as output, \
+            open(rejects_path, 'w', encoding='utf-8') as rejects:
+        rows = read_rows(lines, fmt)
+        if header is not None:
+            # Line numbers relative to the shard, not counting the header
+            rows = ((line_number - 1, row) for line_number, row in rows)
+        stats = score_stream(rows, ResultWriter(output, output_format, fieldnames), rejects)
+    return output_path, rejects_path, stats.rows, stats.rejected, counter[0]
+
+def _prepend(first: str, lines: Iterable[str]) -> Iterator[str]:
+    yield first
+    yield from lines
+
+def _first_output_fields(path: str, fmt: str) -> Optional[List[str]]:
+    """CSV columns a serial run of the file would write, from its first scorable row"""
+    with open(path, 'r', newline='', encoding='utf-8') as f:
+        for _, row in read_rows(f, fmt):
+            try:
+                return output_fields(score_row(row))
+            except RowError:
+                continue
+    return None
+
+def score_file_parallel(input_path: str, output: Any, rejects: Optional[TextIO] = None,
+                        fmt: Optional[str] = None, output_format: Optional[str] = None,
+                        workers: Optional[int] = None, shards: Optional[int] = None,
+                        progress: Optional[Callable[[int, int, int], None]] = None,
+                        cancel: Any = None) -> ScoreStats:
+    """
+    Score a large file on several cores
+
+    The file is split into byte-range shards on line boundaries, each shard is
+    scored by score_stream in a worker process, and the results are written
+    to output in input order.
+
+    Args:
+        input_path: CSV or JSONL file (must be a regular file, not stdin)
+        output: Binary stream that receives the scored rows
+        rejects: Text stream for rejected rows, line numbers refer to the input
+        fmt: Input format (guessed from the file name if None)
+        output_format: Output format (same as the input if None)
+        workers: Number of worker processes (os.cpu_count() if None)
+        shards: Number of shards (4 per worker if None)
+        progress: Called as progress(shards_done, shards_total, rows_scored)
+        cancel: Object with is_set() (e.g. threading.Event) to stop early
+
+    Returns:
+        ScoreStats for the run
+
+    Raises:
+        ScoringCancelled: If cancel was set before all shards finished
+    """
+    # Process pool machinery is only imported when a parallel run starts
+    import shutil
+    import tempfile
+    from concurrent.futures import ProcessPoolExecutor, wait
+    
+    fmt = fmt or detect_format(input_path)
+    output_format = output_format or fmt
+    workers = workers or os.cpu_count() or 1
+    ranges = plan_shards(input_path, shards or workers * 4, fmt)
+    header = None
+    if fmt == "csv":
+        with open(input_path, 'rb') as f:
+            header = f.readline().decode('utf-8')
+
+    # Every shard writes the same columns, so their CSV parts line up
+    fieldnames = _first_output_fields(input_path, fmt) if output_format == "csv" else None
+
+    scored = rejected = 0
+    line_offset = 1 if fmt == "csv" else 0
+    header_written = False
+    start = time.perf_counter()
+    with tempfile.TemporaryDirectory() as directory, ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_score_shard, input_path, fmt, output_format, begin, end,
+                               header, fieldnames, directory, index)
+                   for index, (begin, end) in enumerate(ranges)]
+        try:
+            for done, future in enumerate(futures, 1):
+                while not future.done():
+                    if cancel is not None and cancel.is_set():
+                        raise ScoringCancelled(f"Cancelled after {done - 1} of {len(futures)} shards")
+                    wait([future], timeout=0.1)
+                output_path, rejects_path, rows, bad, lines = future.result()
+                with open(output_path, 'rb') as f:
+                    if output_format == "csv" and rows:
+                        if header_written:
+                            f.readline()
+                        header_written = True
+                    shutil.copyfileobj(f, output)
+                if rejects is not None and bad:
+                    with open(rejects_path, 'r', encoding='utf-8') as f:
+                        for line in f:
+                            record = json.loads(line)
+                            record["line"] += line_offset
+                            rejects.write(json.dumps(record) + "\n")
+                os.remove(output_path)
+                os.remove(rejects_path)
+                scored += rows
+                rejected += bad
+                line_offset += lines
+                if progress is not None:
+                    progress(done, len(futures), scored)
+        except BaseException:
+            for future in futures:
+                future.cancel()
+            raise
+    return ScoreStats(scored, rejected, time.perf_counter() - start)
@@ -0,0 +1,137 @@
+"""
+Table-driven BMI classification for BMI Calculator Pro
+
+A scheme is a list of ascending BMI cutoffs and one (name, color) category
+per band, so adding a cutoff table needs no new code. Scalar lookups use
+bisect; the GUI, whose BMIs are always rounded to 2 decimals, uses a
+precomputed table with an entry for every 2-decimal BMI.
+"""
+
+from bisect import bisect_right
+from functools import partial
+from typing import Dict, Sequence, Tuple
+
+# Quantized lookup tables cover BMIs 0.00-LOOKUP_MAX_BMI in 0.01 steps
+LOOKUP_MAX_BMI = 100
+
+def _make_classifier(cutoffs, categories):
+    # Closure with everything bound as defaults: no attribute lookups per call
+    def classify(bmi: float, _bisect=bisect_right, _cutoffs=cutoffs, _categories=categories):
+        return _categories[_bisect(_cutoffs, bmi)]
+    return classify
+
+class CutoffScheme:
+    """
+    A BMI classification defined by cutoff and category tables
+
+    Attributes:
+        code: code(bmi) -> index of the category (bisect on the cutoffs)
+        classify: classify(bmi) -> (category_name, color_hex)
+        display_labels: "Name (#color)" per category code, as shown by the GUI
+    """
+
+    __slots__ = ('key', 'label', 'cutoffs', 'categories', 'display_labels',
+                 'code', 'classify', '_codes', '_labels')
+
+    def __init__(self, key: str, label: str, cutoffs: Sequence[float],
+                 categories: Sequence[Tuple[str, str]]):
+        """
+        Args:
+            key: Identifier used in settings, e.g. "who"
+            label: Human-readable name
+            cutoffs: Ascending lower bounds of every category but the first
+            categories: (name, color_hex) per category, lowest BMI first
+        """
+        if len(categories) != len(cutoffs) + 1:
+            raise ValueError("A scheme needs exactly one more category than cutoffs")
+        if list(cutoffs) != sorted(cutoffs):
+            raise ValueError("Cutoffs must be in ascending order")
+        self.key = key
+        self.label = label
+        # Float cutoffs keep bisect on float/float comparisons
+        self.cutoffs = tuple(float(cutoff) for cutoff in cutoffs)
+        self.categories = tuple(tuple(category) for category in categories)
+        self.display_labels = tuple(f"{name} ({color})" for name, color in self.categories)
+        self.code = partial(bisect_right, self.cutoffs)
+        self.classify = _make_classifier(self.cutoffs, self.categories)
+        self._codes = None
+        self._labels = None
+
+    def lookup_table(self) -> Dict[float, int]:
+        """
+        Category code for every BMI from 0.00 to LOOKUP_MAX_BMI in 0.01 steps
+
+        Keys are the exact floats round(bmi, 2) produces, so any BMI rounded
+        like calculate_bmi's results hits the table. Built on first use.
+        """
+        if self._codes is None:
+            code = self.code
+            self._codes = {k / 100: code(k / 100) for k in range(LOOKUP_MAX_BMI * 100 + 1)}
+        return self._codes
+
+    def label_table(self) -> Dict[float, str]:
+        """Like lookup_table, but mapping to the GUI display label"""
+        if self._labels is None:
+            labels = self.display_labels
+            self._labels = {bmi: labels[code] for bmi, code in self.lookup_table().items()}
+        return self._labels
+
+    def code_rounded(self, bmi: float) -> int:
+        """Category code via the lookup table, falling back to bisect outside it"""
+        code = (self._codes or self.lookup_table()).get(bmi)
+        return self.code(bmi) if code is None else code
+
+    def describe(self) -> list:
+        """Lines like "Normal: 18.5 - 24.9" describing each band"""
+        lines = []
+        for i, (name, _) in enumerate(self.categories):
+            if i == 0:
+                lines.append(f"{name}: < {self.cutoffs[0]:g}")
+            elif i == len(self.cutoffs):
+                lines.append(f"{name}: ≥ {self.cutoffs[-1]:g}")
+            else:
+                lines.append(f"{name}: {self.cutoffs[i - 1]:g} - {self.cutoffs[i] - 0.1:g}")
+        return lines
+
+WHO_ADULT = CutoffScheme("who", "WHO adult", (18.5, 25, 30), (
+    ("Underweight", "#4A90E2"),  # Blue
+    ("Normal", "#7ED321"),  # Green
+    ("Overweight", "#F5A623"),  # Orange
+    ("Obese", "#D0021B"),  # Red
+))
+
+WHO_ASIAN = CutoffScheme("who_asian", "WHO Asian", (18.5, 23, 27.5), (
+    ("Underweight", "#4A90E2"),
+    ("Normal", "#7ED321"),
+    ("Overweight", "#F5A623"),
+    ("Obese", "#D0021B"),
+))
+
+WHO_OBESITY_CLASSES = CutoffScheme("who_classes", "WHO adult with obesity classes", (18.5, 25, 30, 35, 40), (
+    ("Underweight", "#4A90E2"),
+    ("Normal", "#7ED321"),
+    ("Overweight", "#F5A623"),
+    ("Obese Class I", "#D0021B"),
+    ("Obese Class II", "#A00115"),
+    ("Obese Class III", "#70010F"),
+))
+
+SCHEMES: Dict[str, CutoffScheme] = {
+    scheme.key: scheme for scheme in (WHO_ADULT, WHO_ASIAN, WHO_OBESITY_CLASSES)
+}
+DEFAULT_SCHEME = WHO_ADULT.key
+
+def get_scheme(key: str = None) -> CutoffScheme:
+    """
+    Look up a classification scheme
+
+    Raises:
+        ValueError: If the key is unknown
+    """
+    if key is None:
+        return WHO_ADULT
+    try:
+        return SCHEMES[key]
+    except KeyError:
+        raise ValueError(f"Unknown classification scheme: {key!r} "
+                         f"(available: {', '.join(SCHEMES)})")
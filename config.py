@@ -1,14 +1,28 @@
 """
 Configuration settings for BMI Calculator Pro
+
+Resolved dotted keys are cached until the configuration changes, and
+several changes can be grouped into one file write with transaction().
 """
 
+import copy
 import json
 import os
-from typing import Dict, Any
+from contextlib import contextmanager
+from typing import Callable, Dict, Any
+
+import metrics
+
+# Cached marker for keys that do not resolve, so misses are cached too
+_MISSING = object()
 
 class Config:
     def __init__(self, config_file: str = "config.json"):
         self.config_file = config_file
+        self._cache: Dict[str, Any] = {}
+        self._version = 0
+        self._transaction_depth = 0
+        self._dirty = False
         self.default_config = {
             "theme": {
                 "primary_color": "#50BFAB",
@@ -39,6 +53,9 @@ class Config:
                 "switch_font_size": 18,
                 "button_corner_radius": 17
             },
+            "classification": {
+                "scheme": "who"
+            },
             "features": {
                 "show_bmi_category": True,
                 "show_history": True,
@@ -48,41 +65,84 @@ class Config:
         }
         self.config = self.load_config()
     
+    def _changed(self):
+        """Invalidate cached lookups after any change to self.config"""
+        self._cache.clear()
+        self._version += 1
+    
+    @metrics.timed('config.load')
     def load_config(self) -> Dict[str, Any]:
         """Load configuration from file or create default"""
         try:
             if os.path.exists(self.config_file):
                 with open(self.config_file, 'r') as f:
-                    return json.load(f)
+                    loaded = json.load(f)
+                    metrics.count('config.bytes_read', f.tell())
+                    return loaded
             else:
-                return self.default_config.copy()
+                return copy.deepcopy(self.default_config)
         except Exception as e:
             print(f"Error loading config: {e}")
-            return self.default_config.copy()
+            return copy.deepcopy(self.default_config)
     
     def save_config(self) -> bool:
-        """Save current configuration to file"""
+        """Save current configuration to file (atomically, via a temp file)"""
+        temp_file = self.config_file + '.tmp'
         try:
-            with open(self.config_file, 'w') as f:
+            with open(temp_file, 'w') as f:
                 json.dump(self.config, f, indent=2)
+                metrics.count('config.bytes_written', f.tell())
+            os.replace(temp_file, self.config_file)
+            self._dirty = False
             return True
         except Exception as e:
             print(f"Error saving config: {e}")
             return False
     
-    def get(self, key: str, default=None):
-        """Get configuration value using dot notation (e.g., 'theme.primary_color')"""
-        keys = key.split('.')
+    def _resolve(self, key: str):
         value = self.config
         try:
-            for k in keys:
+            for k in key.split('.'):
                 value = value[k]
-            return value
         except (KeyError, TypeError):
-            return default
+            value = _MISSING
+        self._cache[key] = value
+        return value
+    
+    def get(self, key: str, default=None):
+        """Get configuration value using dot notation (e.g., 'theme.primary_color')"""
+        value = self._cache.get(key, _MISSING)
+        if value is _MISSING:
+            if key in self._cache:
+                return default
+            value = self._resolve(key)
+            if value is _MISSING:
+                return default
+        return value
+    
+    def accessor(self, key: str, default=None) -> Callable[[], Any]:
+        """
+        Compile a dotted key into a function returning its current value
+        
+        The resolved value is reused until the configuration changes, so
+        reading a hot key costs one integer comparison.
+        """
+        state = [-1, None]
+        
+        def read():
+            if state[0] != self._version:
+                value = self._resolve(key)
+                state[0], state[1] = self._version, default if value is _MISSING else value
+            return state[1]
+        return read
     
     def set(self, key: str, value: Any) -> bool:
-        """Set configuration value using dot notation"""
+        """
+        Set configuration value using dot notation
+        
+        Inside transaction() the value is applied immediately but the file is
+        only written when the outermost transaction ends.
+        """
         keys = key.split('.')
         config = self.config
         try:
@@ -91,15 +151,65 @@ class Config:
                     config[k] = {}
                 config = config[k]
             config[keys[-1]] = value
-            return self.save_config()
         except Exception as e:
             print(f"Error setting config: {e}")
             return False
+        finally:
+            self._changed()
+        self._dirty = True
+        if self._transaction_depth:
+            return True
+        return self.save_config()
+    
+    @contextmanager
+    def transaction(self):
+        """
+        Group several set() calls into a single file write
+        
+        The changes are written once when the outermost block exits. If the
+        block raises, the configuration is restored to its state before the
+        transaction and nothing is written.
+        
+            with config.transaction():
+                config.set('theme.primary_color', '#123456')
+                config.set('window.width', 800)
+        """
+        snapshot = copy.deepcopy(self.config) if not self._transaction_depth else None
+        self._transaction_depth += 1
+        try:
+            yield self
+        except BaseException:
+            self._transaction_depth -= 1
+            if snapshot is not None:
+                self.config = snapshot
+                self._dirty = False
+                self._changed()
+            raise
+        self._transaction_depth -= 1
+        if not self._transaction_depth and self._dirty:
+            self.save_config()
     
     def reset_to_defaults(self) -> bool:
         """Reset configuration to default values"""
-        self.config = self.default_config.copy()
+        self.config = copy.deepcopy(self.default_config)
+        self._changed()
+        self._dirty = True
+        if self._transaction_depth:
+            return True
         return self.save_config()
 
-# Global configuration instance
-config = Config() 
\ No newline at end of file
+_config = None
+
+def get_config() -> Config:
+    """Return the shared configuration, loading config.json on first use"""
+    global _config
+    if _config is None:
+        _config = Config()
+    return _config
+
+def __getattr__(name: str):
+    # `from config import config` still works, but config.json is only read
+    # when the global configuration is first used instead of at import time
+    if name == 'config':
+        return get_config()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,203 @@
+"""
+Streaming history export for BMI Calculator Pro
+
+Entries are read from each profile's history log one line at a time,
+filtered, and written to CSV or JSONL (optionally gzip-compressed) in
+chunks of a fixed number of entries, so memory use does not grow with the
+size of the history. Every exported entry carries the profile it came from.
+
+Only the lines present when a log is opened are exported, so appends made
+by the running app during an export are left for the next one; a line
+that is cut short or unreadable is skipped and counted.
+"""
+
+import csv
+import gzip
+import io
+import json
+import os
+import sys
+import time
+from datetime import datetime
+from typing import Callable, Iterable, Iterator, NamedTuple, Optional, TextIO, Tuple
+
+from profiles import ProfileStore, normalize_profile_id
+from records import DATE_FORMAT
+from utils import get_bmi_category
+
+EXPORT_FORMATS = ("csv", "jsonl")
+CSV_FIELDS = ('profile', 'date', 'weight', 'height', 'bmi', 'unit', 'category')
+# Entries per write; gzip compresses each chunk in one call
+CHUNK_ENTRIES = 4096
+READ_BUFFER = 1024 * 1024
+
+class ExportStats(NamedTuple):
+    """Counters for an export run"""
+    entries: int
+    skipped: int
+    seconds: float
+
+    @property
+    def entries_per_second(self) -> float:
+        return self.entries / self.seconds if self.seconds > 0 else 0.0
+
+def detect_export_format(path: str, default: str = "csv") -> Tuple[str, bool]:
+    """
+    Guess (format, gzip) from an output file name
+
+    "history.jsonl.gz" gives ("jsonl", True); unknown names use the default.
+    """
+    lowered = path.lower()
+    compressed = lowered.endswith(".gz")
+    if compressed:
+        lowered = lowered[:-3]
+    if lowered.endswith((".jsonl", ".ndjson", ".json")):
+        return "jsonl", compressed
+    if lowered.endswith(".csv"):
+        return "csv", compressed
+    return default, compressed
+
+def _log_lines(path: str) -> Iterator[bytes]:
+    """Lines of a history log up to its size when opened"""
+    try:
+        f = open(path, 'rb', buffering=READ_BUFFER)
+    except FileNotFoundError:
+        return
+    with f:
+        remaining = os.fstat(f.fileno()).st_size
+        for line in f:
+            remaining -= len(line)
+            if remaining < 0:
+                return  # appended after the export started
+            yield line
+
+def _date_bound(value) -> Optional[str]:
+    """A datetime as a history date string, which sorts like the dates themselves"""
+    if value is None:
+        return None
+    return value.strftime(DATE_FORMAT) if isinstance(value, datetime) else str(value)
+
+def export_history(output: TextIO, profiles: Optional[Iterable[str]] = None, fmt: str = "csv",
+                   start: Optional[datetime] = None, end: Optional[datetime] = None,
+                   categories: Optional[Iterable[str]] = None, store: Optional[ProfileStore] = None,
+                   chunk_entries: int = CHUNK_ENTRIES,
+                   progress: Optional[Callable[[int], None]] = None) -> ExportStats:
+    """
+    Stream history entries to a text stream
+
+    Args:
+        output: Destination text stream
+        profiles: Profile IDs to export (every profile with a history if None)
+        fmt: "csv" or "jsonl"
+        start: Export entries saved at or after this time
+        end: Export entries saved before this time
+        categories: Export only these categories (case-insensitive)
+        store: ProfileStore locating the logs (the default layout if None)
+        chunk_entries: Entries written per write call
+        progress: Called with the number of entries exported after every chunk
+
+    Returns:
+        ExportStats for the run
+
+    Raises:
+        ValueError: If the format or a profile ID is invalid
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown format: {fmt}")
+    store = store or ProfileStore()
+    profiles = store.profiles() if profiles is None else [normalize_profile_id(p) for p in profiles]
+    lower, upper = _date_bound(start), _date_bound(end)
+    wanted = {category.lower() for category in categories} if categories else None
+    csv_writer = csv.writer(output, lineterminator="\n") if fmt == "csv" else None
+    if csv_writer is not None:
+        csv_writer.writerow(CSV_FIELDS)
+
+    exported = skipped = 0
+    chunk = []
+    began = time.perf_counter()
+    for profile in profiles:
+        history = store.store(profile)
+        if (not os.path.exists(history.path) and history.legacy_path
+                and os.path.exists(history.legacy_path)):
+            history.load()  # migrates the legacy JSON file to the log
+        prefix = '{"profile":' + json.dumps(profile) + ','
+        for line in _log_lines(history.path):
+            try:
+                entry = json.loads(line)
+                date = entry['date']
+                if (lower is not None and date < lower) or (upper is not None and date >= upper):
+                    continue
+                category = entry.get('category')
+                if category is None:
+                    category = get_bmi_category(entry['bmi'])[0]
+                if wanted is not None and category.lower() not in wanted:
+                    continue
+                if csv_writer is not None:
+                    chunk.append((profile, date, entry['weight'], entry['height'], entry['bmi'],
+                                  entry.get('unit', 'metric'), category))
+                else:
+                    # The original line with the profile spliced in, not re-encoded
+                    chunk.append(prefix + line.decode('utf-8').strip()[1:] + "\n")
+            except (ValueError, KeyError, TypeError, AttributeError):
+                if line.strip():
+                    skipped += 1
+                continue
+            if len(chunk) >= chunk_entries:
+                exported += _write_chunk(output, csv_writer, chunk)
+                if progress is not None:
+                    progress(exported)
+    if chunk:
+        exported += _write_chunk(output, csv_writer, chunk)
+        if progress is not None:
+            progress(exported)
+    return ExportStats(exported, skipped, time.perf_counter() - began)
+
+def _write_chunk(output: TextIO, csv_writer, chunk: list) -> int:
+    count = len(chunk)
+    if csv_writer is not None:
+        csv_writer.writerows(chunk)
+    else:
+        output.write("".join(chunk))
+    chunk.clear()
+    return count
+
+def export_history_file(path: str, fmt: Optional[str] = None, compress: Optional[bool] = None,
+                        **options) -> ExportStats:
+    """
+    Export history to a file ("-" for stdout)
+
+    The file is written under a temporary name and renamed when complete, so
+    an interrupted export does not leave a truncated file behind.
+
+    Args:
+        path: Output file
+        fmt: "csv" or "jsonl" (guessed from the file name if None)
+        compress: gzip the output (true for names ending in .gz if None)
+        **options: Filters and settings passed to export_history
+
+    Returns:
+        ExportStats for the run
+    """
+    detected, gzipped = detect_export_format(path)
+    fmt = fmt or detected
+    compress = gzipped if compress is None else compress
+    if path == "-":
+        if compress:
+            with gzip.GzipFile(fileobj=sys.stdout.buffer, mode='wb') as raw, \
+                    io.TextIOWrapper(raw, encoding='utf-8', newline='') as output:
+                return export_history(output, fmt=fmt, **options)
+        return export_history(sys.stdout, fmt=fmt, **options)
+
+    temp_path = path + '.tmp'
+    try:
+        # Compression level 6 is several times faster than gzip's default 9
+        # for a few percent larger output
+        raw = gzip.open(temp_path, 'wb', compresslevel=6) if compress else open(temp_path, 'wb')
+        with raw, io.TextIOWrapper(raw, encoding='utf-8', newline='') as output:
+            stats = export_history(output, fmt=fmt, **options)
+        os.replace(temp_path, path)
+        return stats
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
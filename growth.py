@@ -0,0 +1,480 @@
+"""
+BMI-for-age percentiles and z-scores for BMI Calculator Pro
+
+Adult cutoffs do not apply to children and adolescents: their BMI is
+compared with a growth reference for their age and sex using the LMS
+method. A reference gives, per age, a Box-Cox power L, median M and
+coefficient of variation S, and a BMI X has the z-score
+
+    z = ((X / M) ** L - 1) / (L * S)    (log(X / M) / S when L is 0)
+
+The percentile is the standard normal CDF of z. Categories follow the CDC
+percentile cutoffs: underweight below the 5th, normal to the 85th,
+overweight to the 95th and obese from the 95th.
+
+LMS values are stored in a compact binary table (float32, one row per sex
+and whole month of age), built once from a published reference CSV such as
+the CDC's bmiagerev.csv or the WHO 2007 BMI-for-age tables:
+
+    python growth.py --build bmiagerev.csv
+
+Ages between whole months are interpolated linearly. The table is read on
+first use from BMI_LMS_TABLE or bmi_lms.bin next to this module. No
+reference data ships with the application, so the table must be built
+before use; until then scoring raises FileNotFoundError.
+"""
+
+import argparse
+import math
+import os
+import struct
+import sys
+from array import array
+from bisect import bisect_right
+from statistics import NormalDist
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+from classification import CutoffScheme, WHO_ADULT
+from utils import INVALID_CATEGORY, _is_buffer, _load_numpy
+
+LMS_TABLE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'bmi_lms.bin')
+MALE = 1
+FEMALE = 2
+SEXES = (MALE, FEMALE)
+SEX_CODES = {'1': MALE, 'm': MALE, 'male': MALE, 'boy': MALE, 'boys': MALE,
+             '2': FEMALE, 'f': FEMALE, 'female': FEMALE, 'girl': FEMALE, 'girls': FEMALE}
+
+# Percentile cutoffs with the adult category names and colors, so child
+# categories are stored and shown like adult ones
+PERCENTILE_SCHEME = CutoffScheme("cdc_percentiles", "CDC BMI-for-age percentiles",
+                                 (5, 85, 95), WHO_ADULT.categories)
+# The same cutoffs as z-scores; categories are assigned on z, so scalar and
+# batch results agree exactly
+Z_CUTOFFS = tuple(NormalDist().inv_cdf(cutoff / 100) for cutoff in PERCENTILE_SCHEME.cutoffs)
+
+# File layout: header, then float32 L, M and S columns for each sex in turn
+_MAGIC = b'BLMS'
+_VERSION = 1
+_HEADER = struct.Struct('<4sBBHH')  # magic, version, sexes, first month, months
+
+_table = None
+
+class LMSTable:
+    """
+    LMS values for every whole month of a reference's age range
+
+    Attributes:
+        first_month: Age in months of the first row
+        months: Number of rows per sex
+        columns: {sex: (L, M, S)} with one array('d') per parameter
+    """
+
+    __slots__ = ('first_month', 'months', 'columns', '_arrays')
+
+    def __init__(self, first_month: int, months: int,
+                 columns: Dict[int, Tuple[Sequence[float], Sequence[float], Sequence[float]]]):
+        if months < 2:
+            raise ValueError("An LMS table needs at least two months")
+        if sorted(columns) != list(SEXES):
+            raise ValueError("An LMS table needs columns for both sexes")
+        self.first_month = first_month
+        self.months = months
+        self.columns = {sex: tuple(array('d', column) for column in lms)
+                        for sex, lms in columns.items()}
+        if any(len(column) != months for lms in self.columns.values() for column in lms):
+            raise ValueError(f"Every LMS column must have {months} values")
+        self._arrays = None
+
+    @property
+    def last_month(self) -> int:
+        return self.first_month + self.months - 1
+
+    def lms(self, age_months: float, sex: int) -> Tuple[float, float, float]:
+        """
+        (L, M, S) at an age, interpolated between whole months
+
+        Raises:
+            ValueError: If the age is outside the table or sex is not MALE or FEMALE
+        """
+        columns = self.columns.get(sex)
+        if columns is None:
+            raise ValueError(f"Unknown sex code: {sex!r}")
+        position = age_months - self.first_month
+        if not 0 <= position <= self.months - 1:
+            raise ValueError(f"Age {age_months} months is outside the reference "
+                             f"({self.first_month}-{self.last_month} months)")
+        i = min(int(position), self.months - 2)
+        fraction = position - i
+        return tuple(column[i] + (column[i + 1] - column[i]) * fraction for column in columns)
+
+    def arrays(self, np):
+        """
+        Flattened LMS values and month-to-month deltas for NumPy lookups
+
+        Returns:
+            (values, deltas), each of length 6 * months: L, M and S for
+            boys, then for girls; deltas[i] is values[i + 1] - values[i]
+            within a column and 0 in its last month
+        """
+        if self._arrays is None:
+            values = np.array([column for sex in SEXES for column in self.columns[sex]], dtype=np.float64)
+            deltas = np.zeros_like(values)
+            deltas[:, :-1] = np.diff(values, axis=1)
+            self._arrays = (values.reshape(-1), deltas.reshape(-1))
+        return self._arrays
+
+    def to_bytes(self) -> bytes:
+        body = array('f')
+        for sex in SEXES:
+            for column in self.columns[sex]:
+                body.extend(array('f', column))
+        if sys.byteorder == 'big':
+            body.byteswap()
+        return _HEADER.pack(_MAGIC, _VERSION, len(SEXES), self.first_month, self.months) + body.tobytes()
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'LMSTable':
+        """
+        Raises:
+            ValueError: If data is not an LMS table file
+        """
+        if len(data) < _HEADER.size:
+            raise ValueError("Not an LMS table: file is too short")
+        magic, version, sexes, first_month, months = _HEADER.unpack_from(data)
+        if magic != _MAGIC or version != _VERSION or sexes != len(SEXES):
+            raise ValueError("Not an LMS table, or written by an unsupported version")
+        body = array('f')
+        body.frombytes(data[_HEADER.size:])
+        if len(body) != sexes * 3 * months:
+            raise ValueError("LMS table is truncated")
+        if sys.byteorder == 'big':
+            body.byteswap()
+        columns = {}
+        for s, sex in enumerate(SEXES):
+            start = s * 3 * months
+            columns[sex] = tuple(body[start + p * months:start + (p + 1) * months] for p in range(3))
+        return cls(first_month, months, columns)
+
+def load_table(path: Optional[str] = None) -> LMSTable:
+    """
+    Read an LMS table file
+
+    Args:
+        path: Table file (BMI_LMS_TABLE or bmi_lms.bin next to this module if None)
+
+    Raises:
+        FileNotFoundError: If there is no table; build one with ``python growth.py --build``
+        ValueError: If the file is not a valid table
+    """
+    path = path or os.environ.get('BMI_LMS_TABLE') or LMS_TABLE_FILE
+    try:
+        with open(path, 'rb') as f:
+            data = f.read()
+    except FileNotFoundError:
+        raise FileNotFoundError(f"No BMI-for-age reference table at {path}; build one from a "
+                                f"published LMS CSV with: python growth.py --build <file.csv>")
+    return LMSTable.from_bytes(data)
+
+def get_table() -> LMSTable:
+    """The reference table, loaded on first use"""
+    global _table
+    if _table is None:
+        _table = load_table()
+    return _table
+
+def set_table(table: Optional[LMSTable]):
+    """Use a table instead of the file (None reloads the file on next use)"""
+    global _table
+    _table = table
+
+def normalize_sex(sex: Any) -> int:
+    """
+    MALE or FEMALE from a code or name such as 1, "F" or "female"
+
+    Raises:
+        ValueError: If sex is not recognised
+    """
+    code = SEX_CODES.get(str(sex).strip().lower())
+    if code is None:
+        raise ValueError(f"Unknown sex: {sex!r} (use male/female, m/f or 1/2)")
+    return code
+
+def _z(bmi: float, l: float, m: float, s: float) -> float:
+    log_ratio = math.log(bmi / m)
+    if l == 0:
+        return log_ratio / s
+    # expm1(L * log(X / M)) is (X / M) ** L - 1 without cancellation near the median
+    return math.expm1(l * log_ratio) / (l * s)
+
+def bmi_z_score(bmi: float, age_months: float, sex: Any, table: Optional[LMSTable] = None) -> float:
+    """
+    BMI-for-age z-score
+
+    Args:
+        bmi: BMI in kg/m2
+        age_months: Age in months (e.g. 7 years 3 months is 87)
+        sex: MALE/FEMALE or a name accepted by normalize_sex
+        table: LMS table (the reference table if None)
+
+    Raises:
+        ValueError: If the BMI is not positive, the age is outside the
+            reference or sex is unknown
+    """
+    if not bmi > 0:
+        raise ValueError("BMI must be positive")
+    l, m, s = (table or _table or get_table()).lms(age_months, normalize_sex(sex))
+    return _z(bmi, l, m, s)
+
+def bmi_percentile(bmi: float, age_months: float, sex: Any, table: Optional[LMSTable] = None) -> float:
+    """BMI-for-age percentile (0-100); see bmi_z_score"""
+    return 50 * (1 + math.erf(bmi_z_score(bmi, age_months, sex, table) / math.sqrt(2)))
+
+def classify_bmi_for_age(bmi: float, age_months: float, sex: Any,
+                         table: Optional[LMSTable] = None) -> Tuple[str, str]:
+    """(category_name, color_hex) by BMI-for-age percentile; see bmi_z_score"""
+    return PERCENTILE_SCHEME.categories[bisect_right(Z_CUTOFFS, bmi_z_score(bmi, age_months, sex, table))]
+
+class AgeBatchResult(NamedTuple):
+    """
+    Result of bmi_for_age_batch
+
+    Attributes:
+        z: z-score per row, NaN where the row is invalid
+        percentile: Percentile per row, NaN where invalid
+        codes: Index into PERCENTILE_SCHEME.categories, INVALID_CATEGORY where invalid
+        invalid: Per-row mask, true where bmi_z_score would raise ValueError
+    """
+    z: Any
+    percentile: Any
+    codes: Any
+    invalid: Any
+
+    def categories(self) -> list:
+        """Category names per row ("" for invalid rows)"""
+        names = [name for name, _ in PERCENTILE_SCHEME.categories] + [""]
+        return [names[code] for code in self.codes]
+
+def bmi_for_age_batch(bmis, ages_months, sexes, table: Optional[LMSTable] = None) -> AgeBatchResult:
+    """
+    Score many children in one pass
+
+    Accepts the same column types as calculate_bmi_batch. Results match
+    bmi_z_score and classify_bmi_for_age row for row; percentiles from the
+    NumPy path use an erf approximation accurate to about 1e-5 percentile
+    points.
+
+    Args:
+        bmis: BMI per row
+        ages_months: Age in months per row
+        sexes: MALE (1) or FEMALE (2) per row
+        table: LMS table (the reference table if None)
+
+    Returns:
+        AgeBatchResult of (z, percentile, codes, invalid)
+    """
+    table = table or _table or get_table()
+    np = _load_numpy()
+    if np is not None:
+        return _bmi_for_age_numpy(np, bmis, ages_months, sexes, table)
+    return _bmi_for_age_python(bmis, ages_months, sexes, table)
+
+def _erf_numpy(np, x):
+    # Abramowitz and Stegun 7.1.26, absolute error below 1.5e-7
+    t = 1 / (1 + 0.3275911 * np.abs(x))
+    poly = t * (0.254829592 + t * (-0.284496736 + t * (1.421413741 + t * (-1.453152027
+                                                                          + t * 1.061405429))))
+    return np.copysign(1 - poly * np.exp(-x * x), x)
+
+def _bmi_for_age_numpy(np, bmis, ages_months, sexes, table: LMSTable) -> AgeBatchResult:
+    bmi = np.asarray(bmis, dtype=np.float64)
+    age = np.asarray(ages_months, dtype=np.float64)
+    sex = np.asarray(sexes)
+    if bmi.ndim != 1 or age.shape != bmi.shape or sex.shape != bmi.shape:
+        raise ValueError("input columns must be 1-d and of equal length")
+    months = table.months
+
+    position = age - table.first_month
+    female = sex == FEMALE
+    invalid = ~((bmi > 0) & (position >= 0) & (position <= months - 1) & (female | (sex == MALE)))
+    with np.errstate(invalid='ignore', divide='ignore', over='ignore'):
+        position[invalid] = 0
+        row = position.astype(np.intp)
+        np.minimum(row, months - 2, out=row)
+        fraction = position - row
+        # Index of the row's L in the flattened table; M and S follow a
+        # column (months entries) apart
+        row += female * (3 * months)
+        values, deltas = table.arrays(np)
+        l, m, s = (values.take(index) + deltas.take(index) * fraction
+                   for index in (row, row + months, row + 2 * months))
+        log_ratio = np.log(bmi / m)
+        z = np.expm1(l * log_ratio)
+        z /= l * s
+        zero_l = l == 0
+        if zero_l.any():
+            z[zero_l] = log_ratio[zero_l] / s[zero_l]
+        z[invalid] = np.nan
+        codes = (z >= Z_CUTOFFS[0]).view(np.int8)
+        for cutoff in Z_CUTOFFS[1:]:
+            codes += z >= cutoff
+        percentile = 50 * (1 + _erf_numpy(np, z * (1 / math.sqrt(2))))
+    codes[invalid] = INVALID_CATEGORY
+    return AgeBatchResult(z, percentile, codes, invalid)
+
+def _bmi_for_age_python(bmis, ages_months, sexes, table: LMSTable) -> AgeBatchResult:
+    bmi, age, sex = (memoryview(column) if _is_buffer(column) else column
+                     for column in (bmis, ages_months, sexes))
+    n = len(bmi)
+    if len(age) != n or len(sex) != n:
+        raise ValueError("input columns must be 1-d and of equal length")
+    z = array('d', bytes(8 * n))
+    percentile = array('d', bytes(8 * n))
+    codes = array('b', bytes(n))
+    invalid = array('B', bytes(n))
+    first, last = table.first_month, table.last_month
+    columns = table.columns
+    erf = math.erf
+    root2 = math.sqrt(2)
+    nan = float('nan')
+
+    last_row = table.months - 2
+    log, expm1 = math.log, math.expm1
+
+    for i in range(n):
+        lms = columns.get(sex[i])
+        x = bmi[i]
+        position = age[i] - first
+        if lms is None or not x > 0 or not 0 <= position <= last - first:
+            z[i] = percentile[i] = nan
+            codes[i] = INVALID_CATEGORY
+            invalid[i] = 1
+            continue
+        row = int(position)
+        if row > last_row:
+            row = last_row
+        fraction = position - row
+        l_column, m_column, s_column = lms
+        l = l_column[row] + (l_column[row + 1] - l_column[row]) * fraction
+        m = m_column[row] + (m_column[row + 1] - m_column[row]) * fraction
+        s = s_column[row] + (s_column[row + 1] - s_column[row]) * fraction
+        log_ratio = log(x / m)
+        value = log_ratio / s if l == 0 else expm1(l * log_ratio) / (l * s)
+        z[i] = value
+        percentile[i] = 50 * (1 + erf(value / root2))
+        codes[i] = bisect_right(Z_CUTOFFS, value)
+    return AgeBatchResult(z, percentile, codes, invalid)
+
+def read_reference_csv(path: str, sex: Any = None) -> Dict[int, List[Tuple[float, float, float, float]]]:
+    """
+    Rows of a published LMS reference CSV
+
+    Columns are matched by name, ignoring case: the age in months (Agemos,
+    Month, Months or age_months), L, M, S and, unless sex is given, Sex
+    (1/2 or male/female). Other columns, such as the CDC's percentiles, and
+    repeated header rows are ignored.
+
+    Args:
+        path: CSV file
+        sex: Sex of every row, for files with one sex per file
+
+    Returns:
+        {sex: [(age_months, L, M, S), ...]} sorted by age
+
+    Raises:
+        ValueError: If a column is missing or a value is not a number
+    """
+    import csv
+
+    rows: Dict[int, List[Tuple[float, float, float, float]]] = {}
+    with open(path, 'r', newline='', encoding='utf-8-sig') as f:
+        reader = csv.DictReader(f)
+        fields = {name.strip().lower(): name for name in reader.fieldnames or ()}
+        age_field = next((fields[name] for name in ('agemos', 'month', 'months', 'age_months')
+                          if name in fields), None)
+        missing = [name for name in ('l', 'm', 's') if name not in fields]
+        if age_field is None or missing or (sex is None and 'sex' not in fields):
+            raise ValueError(f"{path}: needs age in months, L, M, S"
+                             + (" and Sex columns" if sex is None else " columns"))
+        fixed = None if sex is None else normalize_sex(sex)
+        for record in reader:
+            age = record.get(age_field, '').strip()
+            # The CDC files repeat the header row where the second sex starts
+            if not age or age.lower() == age_field.strip().lower():
+                continue
+            code = fixed or normalize_sex(record[fields['sex']])
+            try:
+                values = tuple(float(record[field]) for field in
+                               (age_field, fields['l'], fields['m'], fields['s']))
+            except ValueError:
+                raise ValueError(f"{path}, line {reader.line_num}: not a number")
+            rows.setdefault(code, []).append(values)
+    for values in rows.values():
+        values.sort()
+    return rows
+
+def build_table(rows: Dict[int, Iterable[Tuple[float, float, float, float]]]) -> LMSTable:
+    """
+    Interpolate reference rows to every whole month both sexes cover
+
+    Args:
+        rows: {sex: [(age_months, L, M, S), ...]} as from read_reference_csv
+
+    Raises:
+        ValueError: If a sex is missing or the ages do not cover two whole months
+    """
+    rows = {sex: sorted(values) for sex, values in rows.items()}
+    if sorted(rows) != list(SEXES) or any(len(values) < 2 for values in rows.values()):
+        raise ValueError("The reference needs at least two ages for each sex")
+    first = max(math.ceil(values[0][0]) for values in rows.values())
+    last = min(math.floor(values[-1][0]) for values in rows.values())
+    if last - first < 1:
+        raise ValueError("The reference does not cover two whole months for both sexes")
+
+    columns = {}
+    for sex, values in rows.items():
+        ages = [age for age, *_ in values]
+        lms = ([], [], [])
+        for month in range(first, last + 1):
+            i = min(max(bisect_right(ages, month) - 1, 0), len(ages) - 2)
+            (age0, *low), (age1, *high) = values[i], values[i + 1]
+            fraction = (month - age0) / (age1 - age0)
+            for column, a, b in zip(lms, low, high):
+                column.append(a + (b - a) * fraction)
+        columns[sex] = lms
+    return LMSTable(first, last - first + 1, columns)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="BMI-for-age reference table and lookups")
+    parser.add_argument("--build", nargs='+', metavar="CSV",
+                        help="build the table from one LMS CSV with a Sex column, "
+                             "or from a male and a female CSV")
+    parser.add_argument("-o", "--output", default=None,
+                        help="table file to write (default: BMI_LMS_TABLE or bmi_lms.bin)")
+    parser.add_argument("--score", nargs=3, metavar=("BMI", "AGE_MONTHS", "SEX"),
+                        help="print the z-score, percentile and category of one child")
+    args = parser.parse_args(argv)
+
+    if args.build:
+        if len(args.build) > 2:
+            parser.error("--build takes one or two CSV files")
+        if len(args.build) == 1:
+            rows = read_reference_csv(args.build[0])
+        else:
+            rows = {**read_reference_csv(args.build[0], MALE), **read_reference_csv(args.build[1], FEMALE)}
+        table = build_table(rows)
+        output = args.output or os.environ.get('BMI_LMS_TABLE') or LMS_TABLE_FILE
+        with open(output, 'wb') as f:
+            f.write(table.to_bytes())
+        print(f"Wrote {output}: {table.first_month}-{table.last_month} months, "
+              f"{os.path.getsize(output)} bytes")
+    if args.score:
+        bmi, age, sex = float(args.score[0]), float(args.score[1]), args.score[2]
+        table = load_table(args.output) if args.output else get_table()
+        z = bmi_z_score(bmi, age, sex, table)
+        print(f"z-score {z:.2f}, percentile {bmi_percentile(bmi, age, sex, table):.1f}, "
+              f"{classify_bmi_for_age(bmi, age, sex, table)[0]}")
+    if not args.build and not args.score:
+        parser.print_help()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,612 @@
+"""
+Append-only BMI history storage for BMI Calculator Pro
+
+History is kept as JSON lines: saving an entry appends one line instead of
+rewriting the whole file. Lines that cannot be parsed (e.g. a save cut short
+by a crash) are skipped on load and dropped by compaction. An existing
+``bmi_history.json`` from older versions is migrated on first load.
+Entries are loaded as compact records.HistoryRecord mappings; lines that
+are valid JSON but not complete entries are kept as plain dicts.
+
+TimeIndex keeps entry positions sorted by time so date-range queries are a
+pair of binary searches instead of a scan that parses every date.
+HistorySummary holds running statistics that are updated on every append
+and saved next to the log, so they are not recomputed at startup.
+"""
+
+import json
+import os
+import threading
+from bisect import bisect_left, bisect_right
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, List, Optional
+
+import metrics
+from records import HistoryRecord, json_default, parse_date, to_record
+from utils import get_bmi_category
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+HISTORY_FILE = 'bmi_history.jsonl'
+LEGACY_HISTORY_FILE = 'bmi_history.json'
+SUMMARY_VERSION = 1
+
+def entry_timestamp(entry: Dict[str, Any]) -> Optional[int]:
+    """
+    Epoch seconds of an entry's "%Y-%m-%d %H:%M" date, in local time
+
+    Returns:
+        None if the entry has no readable date
+    """
+    if entry.__class__ is HistoryRecord:
+        return entry.timestamp
+    try:
+        return parse_date(entry.get('date'))
+    except (TypeError, ValueError):
+        return None
+
+class TimeIndex:
+    """
+    Sorted epoch-second index over a list of history entries
+
+    Positions refer to the entries' indexes in the history list. Appending
+    an entry that is not older than the newest one is O(1); range queries
+    are O(log n + matches).
+    """
+
+    def __init__(self, entries: Iterable[Dict[str, Any]] = ()):
+        pairs = []
+        for position, entry in enumerate(entries):
+            timestamp = entry_timestamp(entry)
+            if timestamp is not None:
+                pairs.append((timestamp, position))
+        pairs.sort()
+        self._times = [timestamp for timestamp, _ in pairs]
+        self._positions = [position for _, position in pairs]
+
+    def __len__(self) -> int:
+        return len(self._times)
+
+    def add(self, entry: Dict[str, Any], position: int) -> bool:
+        """
+        Index an entry stored at position in the history list
+
+        Returns:
+            False if the entry has no readable date and was not indexed
+        """
+        timestamp = entry_timestamp(entry)
+        if timestamp is None:
+            return False
+        if not self._times or timestamp >= self._times[-1]:
+            self._times.append(timestamp)
+            self._positions.append(position)
+        else:
+            i = bisect_right(self._times, timestamp)
+            self._times.insert(i, timestamp)
+            self._positions.insert(i, position)
+        return True
+
+    def clear(self):
+        self._times.clear()
+        self._positions.clear()
+
+    def between(self, start: Optional[float] = None, end: Optional[float] = None) -> List[int]:
+        """
+        Positions of entries with start <= timestamp < end, oldest first
+
+        Args:
+            start: Epoch seconds, or None for no lower bound
+            end: Epoch seconds (exclusive), or None for no upper bound
+        """
+        low = 0 if start is None else bisect_left(self._times, start)
+        high = len(self._times) if end is None else bisect_left(self._times, end)
+        return self._positions[low:high]
+
+    def count_between(self, start: Optional[float] = None, end: Optional[float] = None) -> int:
+        """Number of entries with start <= timestamp < end"""
+        low = 0 if start is None else bisect_left(self._times, start)
+        high = len(self._times) if end is None else bisect_left(self._times, end)
+        return max(0, high - low)
+
+class _FileLock:
+    """Exclusive advisory lock held on a side file while the block runs"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = None
+
+    def __enter__(self):
+        self._file = open(self.path, 'a+b')
+        try:
+            if fcntl is not None:
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_EX)
+            else:
+                self._file.seek(0)
+                while True:
+                    try:
+                        # LK_LOCK gives up after about 10 seconds
+                        msvcrt.locking(self._file.fileno(), msvcrt.LK_LOCK, 1)
+                        break
+                    except OSError:
+                        pass
+        except BaseException:
+            self._file.close()
+            raise
+        return self
+
+    def __exit__(self, *exc):
+        try:
+            if fcntl is not None:
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+            else:
+                self._file.seek(0)
+                msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+        finally:
+            self._file.close()
+
+class HistorySummary:
+    """
+    Running statistics over history entries, updated in O(1) per entry
+
+    The mean and variance use Welford's algorithm. Time in a category is
+    the time from an entry to the next one, credited to the earlier entry's
+    category, so it assumes entries are added in chronological order.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min_bmi = None
+        self.max_bmi = None
+        self.latest_bmi = None
+        self.previous_bmi = None
+        self.category_counts: Dict[str, int] = {}
+        self.category_seconds: Dict[str, int] = {}
+        self.last_timestamp = None
+        self.last_category = None
+
+    @classmethod
+    def from_entries(cls, entries: Iterable[Dict[str, Any]]) -> 'HistorySummary':
+        summary = cls()
+        for entry in entries:
+            summary.add(entry)
+        return summary
+
+    def add(self, entry: Dict[str, Any]):
+        """Fold one entry into the statistics"""
+        try:
+            bmi = float(entry['bmi'])
+        except (KeyError, TypeError, ValueError):
+            return
+        category = entry.get('category') or get_bmi_category(bmi)[0]
+
+        self.count += 1
+        delta = bmi - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (bmi - self.mean)
+        self.min_bmi = bmi if self.min_bmi is None else min(self.min_bmi, bmi)
+        self.max_bmi = bmi if self.max_bmi is None else max(self.max_bmi, bmi)
+        self.previous_bmi, self.latest_bmi = self.latest_bmi, bmi
+        self.category_counts[category] = self.category_counts.get(category, 0) + 1
+
+        timestamp = entry_timestamp(entry)
+        if timestamp is not None:
+            if self.last_timestamp is not None and timestamp >= self.last_timestamp:
+                self.category_seconds[self.last_category] = (
+                    self.category_seconds.get(self.last_category, 0) + timestamp - self.last_timestamp)
+            self.last_timestamp = timestamp
+            self.last_category = category
+
+    @property
+    def variance(self) -> float:
+        """Sample variance of the BMIs (0 for fewer than two entries)"""
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def stdev(self) -> float:
+        return self.variance ** 0.5
+
+    @property
+    def latest_change(self) -> Optional[float]:
+        """BMI change between the last two entries, or None"""
+        if self.previous_bmi is None:
+            return None
+        return self.latest_bmi - self.previous_bmi
+
+    def describe(self) -> List[str]:
+        """Short human-readable lines, as shown by the console and the GUI"""
+        if not self.count:
+            return []
+        lines = [f"Entries: {self.count} | Average BMI: {self.mean:.2f} (sd {self.stdev:.2f})",
+                 f"Range: {self.min_bmi:.2f} - {self.max_bmi:.2f}"]
+        if self.latest_change is not None:
+            lines[1] += f" | Latest change: {self.latest_change:+.2f}"
+        categories = []
+        for name, count in self.category_counts.items():
+            days = self.category_seconds.get(name, 0) / 86400
+            categories.append(f"{name}: {count}" + (f" ({days:.1f} days)" if days else ""))
+        lines.append(", ".join(categories))
+        return lines
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'count': self.count, 'mean': self.mean, 'm2': self.m2,
+            'min': self.min_bmi, 'max': self.max_bmi,
+            'latest': self.latest_bmi, 'previous': self.previous_bmi,
+            'categories': self.category_counts, 'category_seconds': self.category_seconds,
+            'last_timestamp': self.last_timestamp, 'last_category': self.last_category,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'HistorySummary':
+        summary = cls()
+        summary.count, summary.mean, summary.m2 = int(data['count']), float(data['mean']), float(data['m2'])
+        summary.min_bmi, summary.max_bmi = data['min'], data['max']
+        summary.latest_bmi, summary.previous_bmi = data['latest'], data['previous']
+        summary.category_counts = dict(data['categories'])
+        summary.category_seconds = dict(data['category_seconds'])
+        summary.last_timestamp, summary.last_category = data['last_timestamp'], data['last_category']
+        return summary
+
+class HistoryStore:
+    """
+    Append-only JSON-lines history file
+
+    Every operation holds an advisory lock on ``path + '.lock'``, so several
+    processes (e.g. the GUI and the console) can share one history. Each
+    append is first written to a small journal; if a writer dies mid-append,
+    the next load or append finishes it. Whole-file rewrites go through a
+    temporary file and os.replace, so the log is never left half-written.
+
+    After load(), ``summary`` holds a HistorySummary that append() keeps up
+    to date. It is saved to ``summary_path`` together with the size of the
+    log it describes; a summary whose size does not match the log (e.g. the
+    log was edited or written by an older version) is rebuilt on load.
+    """
+
+    def __init__(self, path: str = HISTORY_FILE, legacy_path: Optional[str] = LEGACY_HISTORY_FILE,
+                 summary_path: Optional[str] = None, durable: bool = False):
+        """
+        Args:
+            path: History log file
+            legacy_path: Pre-JSONL history file to migrate, or None
+            summary_path: Summary file (default: next to the log)
+            durable: fsync the journal and log on every append, so entries
+                also survive power loss (several times slower)
+        """
+        self.path = path
+        self.legacy_path = legacy_path
+        self.summary_path = summary_path or os.path.splitext(path)[0] + '.summary.json'
+        self.lock_path = path + '.lock'
+        self.journal_path = path + '.journal'
+        self.rollback_path = path + '.rollback'
+        self.durable = durable
+        self.summary: Optional[HistorySummary] = None
+        self.skipped_lines = 0
+        self.recovered_entries = 0
+        self._known_size = 0
+        self._lock = threading.Lock()
+        self._compactor = None
+
+    @contextmanager
+    def _locked(self):
+        with self._lock, _FileLock(self.lock_path):
+            yield
+
+    def load(self) -> List[Dict[str, Any]]:
+        """Load all entries, migrating the legacy JSON file if needed"""
+        with self._locked():
+            self._recover()
+            if not os.path.exists(self.path) and self.legacy_path and os.path.exists(self.legacy_path):
+                self._migrate_legacy()
+            entries, self.skipped_lines = self._read_entries()
+            self._known_size = self._log_size()
+            metrics.count('history.bytes_read', self._known_size)
+            self.summary = self._read_summary()
+            if self.summary is None:
+                self.summary = HistorySummary.from_entries(entries)
+                if os.path.exists(self.path):
+                    self._write_summary()
+            return entries
+
+    def append(self, entry: Dict[str, Any]):
+        """Append a single entry to the log"""
+        line = (json.dumps(entry, separators=(',', ':'), default=json_default) + "\n").encode('utf-8')
+        with self._locked():
+            self._recover()
+            with open(self.path, 'a+b') as f:
+                size = f.seek(0, os.SEEK_END)
+                if self.summary is not None and size != self._known_size:
+                    self._catch_up(f, size)
+                # Start on a fresh line if a previous write was cut short
+                if size > 0:
+                    f.seek(-1, os.SEEK_END)
+                    if f.read(1) != b"\n":
+                        line = b"\n" + line
+                self._write_journal(size, line)
+                f.write(line)
+                self._sync(f)
+            os.remove(self.journal_path)
+            metrics.count('history.bytes_written', len(line))
+            self._known_size = size + len(line)
+            if self.summary is not None:
+                self.summary.add(entry)
+                self._write_summary()
+
+    def append_many(self, entries: Iterable[Dict[str, Any]], chunk_entries: int = 4096) -> int:
+        """
+        Append entries to the log as one all-or-nothing write
+
+        Entries are encoded and written in chunks, so they can come from a
+        generator without being held in memory. The log size before the
+        write is saved to ``rollback_path`` first: if the entries raise, or
+        the writer dies, the log is truncated back to that size and none of
+        them are kept.
+
+        Returns:
+            Number of entries appended
+        """
+        # One encoder for the whole batch; json.dumps with options builds one per call
+        encode = json.JSONEncoder(separators=(',', ':'), default=json_default).encode
+        with self._locked():
+            self._recover()
+            with open(self.path, 'a+b') as f:
+                size = f.seek(0, os.SEEK_END)
+                if self.summary is not None and size != self._known_size:
+                    self._catch_up(f, size)
+                summary = self.summary if self.summary is not None else self._read_summary(size)
+                with open(self.rollback_path, 'w', encoding='utf-8') as marker:
+                    marker.write(str(size))
+                    self._sync(marker)
+                written = count = 0
+                try:
+                    if size > 0:
+                        f.seek(-1, os.SEEK_END)
+                        if f.read(1) != b"\n":
+                            written += f.write(b"\n")
+                    lines = []
+                    for entry in entries:
+                        lines.append(encode(entry))
+                        if summary is not None:
+                            summary.add(entry)
+                        if len(lines) >= chunk_entries:
+                            written += f.write(("\n".join(lines) + "\n").encode('utf-8'))
+                            count += len(lines)
+                            lines.clear()
+                    if lines:
+                        written += f.write(("\n".join(lines) + "\n").encode('utf-8'))
+                        count += len(lines)
+                    self._sync(f)
+                except BaseException:
+                    f.truncate(size)
+                    os.remove(self.rollback_path)
+                    if self.summary is not None:
+                        # Entries were folded in as they were written
+                        self.summary = self._read_summary(size)
+                    raise
+            os.remove(self.rollback_path)
+            metrics.count('history.bytes_written', written)
+            self._known_size = size + written
+            if summary is not None:
+                self.summary = summary
+                self._write_summary()
+            return count
+
+    def clear(self):
+        """Remove all entries"""
+        with self._locked():
+            self._write_entries([])
+            for path in (self.journal_path, self.rollback_path):
+                if os.path.exists(path):
+                    os.remove(path)
+            self.skipped_lines = 0
+            self._known_size = 0
+            self.summary = HistorySummary()
+            self._write_summary()
+
+    def compact(self, background: bool = False):
+        """
+        Rewrite the log without unreadable lines
+
+        Args:
+            background: Run in a daemon thread and return immediately
+
+        Returns:
+            The compaction thread when background is True, otherwise None
+        """
+        if not background:
+            self._compact()
+            return None
+        if self._compactor is None or not self._compactor.is_alive():
+            self._compactor = threading.Thread(target=self._compact, daemon=True)
+            self._compactor.start()
+        return self._compactor
+
+    def _compact(self):
+        with self._locked():
+            self._recover()
+            if not os.path.exists(self.path):
+                return
+            entries, _ = self._read_entries()
+            self._write_entries(entries)
+            self.skipped_lines = 0
+            self._known_size = self._log_size()
+            if self.summary is not None:
+                # Other processes may have appended since our load
+                self.summary = HistorySummary.from_entries(entries)
+                self._write_summary()
+
+    def _sync(self, f):
+        if self.durable:
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _write_journal(self, offset: int, line: bytes):
+        """Journal the bytes about to be written at offset (the log size before the append)"""
+        with open(self.journal_path, 'wb') as journal:
+            journal.write(b"%d\n" % offset + line)
+            self._sync(journal)
+
+    def _recover(self):
+        """Finish an append that a crashed writer left in the journal"""
+        self._roll_back()
+        try:
+            with open(self.journal_path, 'rb') as journal:
+                data = journal.read()
+        except FileNotFoundError:
+            return
+        header, _, line = data.partition(b"\n")
+        if not header.isdigit():
+            # Journal of an older version: the entry line alone
+            header, line = None, data
+        try:
+            complete = line.endswith(b"\n") and isinstance(json.loads(line), dict)
+        except ValueError:
+            complete = False
+        if complete and header is not None:
+            # Everything past the offset was written by the crashed append, so
+            # compare by position: an identical earlier entry is not this one
+            with open(self.path, 'a+b') as f:
+                offset = min(int(header), f.seek(0, os.SEEK_END))
+                f.seek(offset)
+                if f.read() != line:
+                    f.truncate(offset)
+                    f.write(line)
+                    self._sync(f)
+                    self.recovered_entries += 1
+        elif complete:
+            self._recover_legacy(line)
+        # An incomplete journal means the crash came before the log was touched
+        os.remove(self.journal_path)
+
+    def _recover_legacy(self, line: bytes):
+        """Finish a journaled append without an offset, comparing the log's tail"""
+        with open(self.path, 'a+b') as f:
+            size = f.seek(0, os.SEEK_END)
+            f.seek(max(0, size - len(line) - 1))
+            tail = f.read()
+            if not tail.endswith(line):
+                if tail and not tail.endswith(b"\n"):
+                    # Drop the torn start of this line, which holds no
+                    # newline, then write the line whole
+                    cut = tail.rfind(b"\n")
+                    if cut >= 0:
+                        f.truncate(size - len(tail) + cut + 1)
+                    else:
+                        line = b"\n" + line
+                f.write(line)
+                self._sync(f)
+                self.recovered_entries += 1
+
+    def _roll_back(self):
+        """Undo an append_many that a crashed writer left unfinished"""
+        try:
+            with open(self.rollback_path, 'r', encoding='utf-8') as marker:
+                size = int(marker.read())
+        except FileNotFoundError:
+            return
+        except ValueError:
+            # The marker is written before the log, so the log is untouched
+            size = None
+        if size is not None and self._log_size() > size:
+            with open(self.path, 'r+b') as f:
+                f.truncate(size)
+        os.remove(self.rollback_path)
+
+    def _catch_up(self, f, size: int):
+        """Bring the summary up to date with changes made by other processes"""
+        summary = self._read_summary(size)
+        if summary is not None:
+            self.summary = summary
+            return
+        # No saved summary matches: fold in lines appended since we last
+        # looked, or rescan the whole log if it shrank (cleared or compacted)
+        start = self._known_size
+        if size < start:
+            start = 0
+            self.summary = HistorySummary()
+        f.seek(start)
+        for line in f.read(size - start).splitlines():
+            try:
+                self.summary.add(json.loads(line))
+            except (ValueError, AttributeError):
+                pass
+
+    def _read_entries(self):
+        entries, skipped = [], 0
+        if not os.path.exists(self.path):
+            return entries, skipped
+        # Undecodable bytes become U+FFFD, so such a line is skipped like any
+        # other unreadable line instead of failing the whole load
+        with open(self.path, 'r', encoding='utf-8', errors='replace') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    entries.append(to_record(json.loads(line)))
+                except ValueError:
+                    skipped += 1
+        return entries, skipped
+
+    def _write_entries(self, entries: List[Dict[str, Any]]):
+        temp_path = self.path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            for entry in entries:
+                f.write(json.dumps(entry, separators=(',', ':'), default=json_default) + "\n")
+            self._sync(f)
+        os.replace(temp_path, self.path)
+
+    def _log_size(self) -> int:
+        try:
+            return os.path.getsize(self.path)
+        except OSError:
+            return 0
+
+    def _read_summary(self, log_size: Optional[int] = None) -> Optional[HistorySummary]:
+        try:
+            with open(self.summary_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if log_size is None:
+                log_size = self._log_size()
+            if data.get('version') != SUMMARY_VERSION or data.get('log_size') != log_size:
+                return None
+            return HistorySummary.from_dict(data)
+        except (OSError, ValueError, KeyError, TypeError, AttributeError):
+            return None
+
+    def _write_summary(self):
+        data = self.summary.to_dict()
+        data['version'] = SUMMARY_VERSION
+        data['log_size'] = self._known_size
+        payload = json.dumps(data, separators=(',', ':')).encode('utf-8')
+        # Overwritten in place and padded with whitespace instead of truncated:
+        # truncating costs several times more than the append itself. log_size
+        # is written last, so a torn write fails to parse or to match the log
+        # and the summary is rebuilt from the log on the next load.
+        try:
+            try:
+                f = open(self.summary_path, 'r+b')
+            except FileNotFoundError:
+                f = open(self.summary_path, 'wb')
+            with f:
+                size = f.seek(0, os.SEEK_END)
+                f.seek(0)
+                f.write(payload.ljust(size))
+        except OSError:
+            pass
+
+    def _migrate_legacy(self):
+        try:
+            with open(self.legacy_path, 'r', encoding='utf-8') as f:
+                entries = json.load(f)
+        except (OSError, ValueError):
+            return
+        if not isinstance(entries, list):
+            return
+        self._write_entries(entries)
+        os.replace(self.legacy_path, self.legacy_path + '.bak')
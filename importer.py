@@ -0,0 +1,268 @@
+"""
+Bulk history import for BMI Calculator Pro
+
+Records from another system are read from CSV or JSONL (see bulk.read_rows)
+in batches. Each batch is parsed into columns, range-checked and converted
+to kg/cm with normalize_units_batch, and scored with calculate_bmi_batch;
+valid rows become history entries and the whole import is appended to the
+history log in one all-or-nothing write. Rows that cannot be imported are
+written to a JSON-lines report with machine-readable reasons.
+
+Each row needs ``weight`` and ``height`` and may carry ``unit`` ("metric"
+for kg/cm, "imperial" for lbs/feet, "stones" for stones/feet; metric when
+omitted), ``pounds`` and ``inches`` added to stones weights and feet
+heights, and ``date`` ("YYYY-MM-DD HH:MM" or ISO 8601; the import time when
+omitted). Rows are appended in file order, so files should be sorted by date
+for the history summary's time-in-category figures.
+"""
+
+import json
+import re
+import sys
+import time
+from array import array
+from datetime import datetime
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, TextIO, Tuple
+
+from bulk import RowError, detect_format, read_rows
+from profiles import DEFAULT_PROFILE, ProfileStore
+from records import DATE_FORMAT, parse_date
+from utils import (
+    calculate_bmi_batch, normalize_units_batch, UNIT_CODES, INVALID_WEIGHT, INVALID_HEIGHT
+)
+
+# Rows validated and scored per batch; memory is a few KB per row of a batch
+BATCH_ROWS = 8192
+
+# Reject reasons, as written to the report, and their messages
+REASONS = {
+    'invalid_json': "Invalid JSON",
+    'not_an_object': "Row is not an object",
+    'invalid_unit': "Unit must be metric, imperial or stones",
+    'missing_weight': "Missing weight",
+    'invalid_weight': "Weight is not a number",
+    'missing_height': "Missing height",
+    'invalid_height': "Height is not a number",
+    'invalid_pounds': "Pounds is not a number",
+    'invalid_inches': "Inches is not a number",
+    'invalid_date': "Date is not YYYY-MM-DD HH:MM or ISO 8601",
+    'weight_out_of_range': "Weight out of range for the unit",
+    'height_out_of_range': "Height out of range for the unit",
+}
+
+_HISTORY_DATE = re.compile(r'\d{4}-\d\d-\d\d \d\d:\d\d\Z')
+
+# History entries record the display unit; stones rows are shown in imperial
+_ENTRY_UNITS = ("metric", "imperial", "imperial")
+
+class ImportStats(NamedTuple):
+    """Counters for an import run"""
+    imported: int
+    rejected: int
+    seconds: float
+
+    @property
+    def rows_per_second(self) -> float:
+        rows = self.imported + self.rejected
+        return rows / self.seconds if self.seconds > 0 else 0.0
+
+def _number(row: Dict[str, Any], key: str, reasons: List[str], required: bool = True) -> float:
+    value = row.get(key)
+    if value is None or value == "":
+        if required:
+            reasons.append('missing_' + key)
+        return 0.0
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        reasons.append('invalid_' + key)
+        return 0.0
+
+def _date(value: Any, now: str, reasons: List[str]) -> str:
+    """A row's date as a history date string"""
+    if value is None or value == "":
+        return now
+    try:
+        if _HISTORY_DATE.match(value):
+            parse_date(value)  # checks the fields are in range
+            return value
+        return datetime.fromisoformat(value).strftime(DATE_FORMAT)
+    except (TypeError, ValueError):
+        reasons.append('invalid_date')
+        return now
+
+def write_reject(stream: TextIO, line_number: int, reasons: List[str], row: Any):
+    """Write a rejected row to the report as one JSON line"""
+    record = {"line": line_number, "reasons": reasons,
+              "error": "; ".join(REASONS[reason] for reason in reasons)}
+    if not isinstance(row, Exception):
+        record["row"] = row
+    stream.write(json.dumps(record) + "\n")
+
+class _Batch:
+    """Columns of the parseable rows of one batch"""
+
+    def __init__(self):
+        self.lines: List[int] = []
+        self.rows: List[Any] = []
+        self.dates: List[str] = []
+        self.weights = array('d')
+        self.heights = array('d')
+        self.units = array('b')
+        self.pounds = array('d')
+        self.inches = array('d')
+        # (line_number, reasons, row) of the rows that cannot be imported
+        self.rejected: List[Tuple[int, List[str], Any]] = []
+
+def _parse_batch(rows: Iterable[Tuple[int, Any]], now: str) -> _Batch:
+    batch = _Batch()
+    rejected = batch.rejected
+    for line_number, row in rows:
+        if isinstance(row, RowError):
+            rejected.append((line_number, ['invalid_json'], row))
+            continue
+        if not isinstance(row, dict):
+            rejected.append((line_number, ['not_an_object'], row))
+            continue
+        reasons = []
+        unit = UNIT_CODES.get(str(row.get('unit') or 'metric').strip().lower())
+        if unit is None:
+            reasons.append('invalid_unit')
+        weight = _number(row, 'weight', reasons)
+        height = _number(row, 'height', reasons)
+        pounds = _number(row, 'pounds', reasons, required=False)
+        inches = _number(row, 'inches', reasons, required=False)
+        date = _date(row.get('date'), now, reasons)
+        if reasons:
+            rejected.append((line_number, reasons, row))
+            continue
+        batch.lines.append(line_number)
+        batch.rows.append(row)
+        batch.dates.append(date)
+        batch.weights.append(weight)
+        batch.heights.append(height)
+        batch.units.append(unit)
+        batch.pounds.append(pounds)
+        batch.inches.append(inches)
+    return batch
+
+def _score_batch(batch: _Batch) -> List[Dict[str, Any]]:
+    """History entries of a batch's rows; out-of-range rows are added to batch.rejected"""
+    normalized = normalize_units_batch(batch.weights, batch.heights, batch.units,
+                                       batch.pounds, batch.inches)
+    scored = calculate_bmi_batch(normalized.weight_kg, normalized.height_cm)
+    names = [name for name, _ in scored.scheme.categories]
+    weight_kg = normalized.weight_kg.tolist()
+    height_cm = normalized.height_cm.tolist()
+    bmi = scored.bmi.tolist()
+    codes = scored.codes.tolist()
+    units = batch.units
+    dates = batch.dates
+    entries = []
+    for i, error in enumerate(normalized.errors.tolist()):
+        if error:
+            reasons = []
+            if error & INVALID_WEIGHT:
+                reasons.append('weight_out_of_range')
+            if error & INVALID_HEIGHT:
+                reasons.append('height_out_of_range')
+            batch.rejected.append((batch.lines[i], reasons, batch.rows[i]))
+            continue
+        entries.append({
+            'date': dates[i],
+            'weight': round(weight_kg[i], 2),
+            'height': round(height_cm[i], 2),
+            'bmi': bmi[i],
+            'unit': _ENTRY_UNITS[units[i]],
+            'category': names[codes[i]],
+        })
+    return entries
+
+def import_entries(rows: Iterable[Tuple[int, Any]], rejects: Optional[TextIO] = None,
+                   batch_rows: int = BATCH_ROWS, counts: Optional[List[int]] = None,
+                   progress: Optional[Callable[[int, int], None]] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Validate and score rows in batches, yielding history entries
+
+    Args:
+        rows: (line_number, row) pairs, e.g. from bulk.read_rows
+        rejects: Stream for the reject report, in input order (rejects are
+            only counted when None)
+        batch_rows: Rows validated and scored together
+        counts: Optional [imported, rejected] list updated as rows are processed
+        progress: Called as progress(imported, rejected) after every batch
+
+    Yields:
+        History entries in input order
+    """
+    counts = counts if counts is not None else [0, 0]
+    now = datetime.now().strftime(DATE_FORMAT)
+    rows = iter(rows)
+    while True:
+        batch = _parse_batch(islice(rows, batch_rows), now)
+        if not batch.lines and not batch.rejected:
+            return
+        entries = _score_batch(batch) if batch.lines else []
+        counts[0] += len(entries)
+        counts[1] += len(batch.rejected)
+        if rejects is not None:
+            batch.rejected.sort(key=lambda rejected: rejected[0])
+            for line_number, reasons, row in batch.rejected:
+                write_reject(rejects, line_number, reasons, row)
+        del batch
+        yield from entries
+        if progress is not None:
+            progress(counts[0], counts[1])
+
+def import_history(source: TextIO, fmt: str = "csv", profile: str = DEFAULT_PROFILE,
+                   store: Optional[ProfileStore] = None, rejects: Optional[TextIO] = None,
+                   batch_rows: int = BATCH_ROWS,
+                   progress: Optional[Callable[[int, int], None]] = None) -> ImportStats:
+    """
+    Import rows from a CSV/JSONL stream into a profile's history
+
+    Valid rows are appended in one write; if the import fails part way
+    (e.g. an unreadable input), no entries are added.
+
+    Args:
+        source: Input text stream
+        fmt: "csv" or "jsonl"
+        profile: Profile whose history receives the entries
+        store: ProfileStore locating the history (the default layout if None)
+        rejects: Stream for the reject report, one JSON line per rejected row
+        batch_rows: Rows validated and scored together
+        progress: Called as progress(imported, rejected) after every batch
+
+    Returns:
+        ImportStats for the run
+    """
+    store = store or ProfileStore()
+    counts = [0, 0]
+    start = time.perf_counter()
+    store.append_many(profile, import_entries(read_rows(source, fmt), rejects, batch_rows,
+                                              counts, progress))
+    return ImportStats(counts[0], counts[1], time.perf_counter() - start)
+
+def import_history_file(path: str, fmt: Optional[str] = None, rejects_path: Optional[str] = None,
+                        **options) -> ImportStats:
+    """
+    Import a CSV/JSONL file ("-" for stdin) into a profile's history
+
+    Args:
+        path: Input file
+        fmt: "csv" or "jsonl" (guessed from the file name if None)
+        rejects_path: File that receives the reject report
+        **options: Profile, store and settings passed to import_history
+
+    Returns:
+        ImportStats for the run
+    """
+    source = sys.stdin if path == "-" else open(path, 'r', newline='', encoding='utf-8')
+    rejects = open(rejects_path, 'w', encoding='utf-8') if rejects_path else None
+    try:
+        return import_history(source, fmt or detect_format(path), rejects=rejects, **options)
+    finally:
+        for stream in (source, rejects):
+            if stream not in (None, sys.stdin):
+                stream.close()
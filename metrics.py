@@ -0,0 +1,232 @@
+"""
+Opt-in instrumentation for BMI Calculator Pro
+
+Set BMI_METRICS=1 to record call counts and latency histograms for the hot
+paths (BMI calculation, GUI updates, history and config I/O) plus bytes
+read and written. Instrumentation is decided when a module is imported:
+with metrics disabled, @timed returns the function itself, so disabled
+metrics cost nothing per call. BMI_METRICS must therefore be set in the
+environment before the first import of an instrumented module (utils,
+history, config, ...); setting it, or calling enable(), afterwards does not
+time functions that were already decorated.
+
+When enabled, the GUI, console and server append a snapshot of all metrics
+to BMI_METRICS_FILE (default bmi_metrics.jsonl) every BMI_METRICS_INTERVAL
+seconds (default 60) and on exit; ``python status.py --metrics`` prints the
+latest one.
+"""
+
+import os
+import time
+from bisect import bisect_left
+from functools import wraps
+from typing import Any, Callable, Dict, List, Optional
+
+METRICS_FILE = 'bmi_metrics.jsonl'
+DEFAULT_INTERVAL = 60.0
+# Snapshot files are rotated to <file>.1 past this size
+MAX_SNAPSHOT_BYTES = 1024 * 1024
+
+# Histogram bucket upper bounds: 1us doubling up to about 16.8s
+BUCKET_BOUNDS = tuple(2 ** k / 1_000_000 for k in range(25))
+
+_enabled = os.environ.get('BMI_METRICS', '') not in ('', '0')
+_counters: Dict[str, int] = {}
+_histograms: Dict[str, 'Histogram'] = {}
+_snapshots = None
+
+class Histogram:
+    """Latency histogram with power-of-two buckets"""
+
+    __slots__ = ('counts', 'count', 'total', 'max')
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.counts = [0] * (len(BUCKET_BOUNDS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float):
+        self.counts[bisect_left(BUCKET_BOUNDS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, fraction: float) -> float:
+        """Upper bound of the bucket holding the given fraction of samples (max for the last)"""
+        rank = fraction * self.count
+        seen = 0
+        for bound, count in zip(BUCKET_BOUNDS, self.counts):
+            seen += count
+            if seen >= rank and seen:
+                return min(bound, self.max)
+        return self.max
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'count': self.count,
+            'mean': self.total / self.count if self.count else 0.0,
+            'p50': self.percentile(0.5),
+            'p90': self.percentile(0.9),
+            'p99': self.percentile(0.99),
+            'max': self.max,
+            # Non-empty buckets by upper bound in microseconds ("inf" for the overflow)
+            'buckets': {(f"{bound * 1_000_000:g}" if i < len(BUCKET_BOUNDS) else "inf"): count
+                        for i, (bound, count) in enumerate(zip(BUCKET_BOUNDS + (0,), self.counts))
+                        if count},
+        }
+
+def enabled() -> bool:
+    return _enabled
+
+def enable():
+    """
+    Turn metrics on
+
+    Counters start recording, but only functions decorated after this call
+    are timed: modules imported earlier with metrics disabled keep their
+    undecorated functions. Set BMI_METRICS before importing them instead.
+    """
+    global _enabled
+    _enabled = True
+
+def disable():
+    """Stop recording (timed functions then only pay a flag check)"""
+    global _enabled
+    _enabled = False
+
+def reset():
+    """Zero all counters and histograms"""
+    for name in _counters:
+        _counters[name] = 0
+    for histogram in _histograms.values():
+        histogram.reset()
+
+def count(name: str, amount: int = 1):
+    """Add to a counter, e.g. count('history.bytes_written', len(line))"""
+    if _enabled:
+        _counters[name] = _counters.get(name, 0) + amount
+
+def histogram(name: str) -> Histogram:
+    found = _histograms.get(name)
+    if found is None:
+        found = _histograms[name] = Histogram()
+    return found
+
+def timed(name: str) -> Callable[[Callable], Callable]:
+    """
+    Decorator recording calls and latency of a function in histogram ``name``
+
+    Returns the function unchanged when metrics are disabled at decoration time.
+    """
+    def decorate(fn: Callable) -> Callable:
+        if not _enabled:
+            return fn
+        latency = histogram(name)
+        perf_counter = time.perf_counter
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            start = perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                latency.observe(perf_counter() - start)
+        return wrapper
+    return decorate
+
+def snapshot() -> Dict[str, Any]:
+    """All metrics as a JSON-serializable dict"""
+    return {
+        'time': time.time(),
+        'pid': os.getpid(),
+        'counters': dict(_counters),
+        'histograms': {name: found.to_dict() for name, found in list(_histograms.items())
+                       if found.count},
+    }
+
+def write_snapshot(path: Optional[str] = None):
+    """Append a snapshot to the metrics file as one JSON line"""
+    import json
+    path = path or os.environ.get('BMI_METRICS_FILE') or METRICS_FILE
+    try:
+        if os.path.getsize(path) > MAX_SNAPSHOT_BYTES:
+            os.replace(path, path + '.1')
+    except OSError:
+        pass
+    line = json.dumps(snapshot(), separators=(',', ':')) + "\n"
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write(line)
+
+def read_snapshots(path: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Snapshots from a metrics file, oldest first (unreadable lines are skipped)"""
+    import json
+    path = path or os.environ.get('BMI_METRICS_FILE') or METRICS_FILE
+    snapshots = []
+    with open(path, 'r', encoding='utf-8', errors='replace') as f:
+        for line in f:
+            try:
+                snapshots.append(json.loads(line))
+            except ValueError:
+                pass
+    return snapshots
+
+def start_snapshots(path: Optional[str] = None, interval: Optional[float] = None):
+    """
+    Write snapshots every interval seconds and at exit, if metrics are enabled
+
+    Args:
+        path: Metrics file (BMI_METRICS_FILE or bmi_metrics.jsonl if None)
+        interval: Seconds between snapshots (BMI_METRICS_INTERVAL or 60 if None)
+
+    Returns:
+        The snapshot thread, or None when metrics are disabled
+    """
+    global _snapshots
+    if not _enabled:
+        return None
+    if _snapshots is not None:
+        return _snapshots[0]
+    import atexit
+    import threading
+    if interval is None:
+        try:
+            interval = float(os.environ.get('BMI_METRICS_INTERVAL', DEFAULT_INTERVAL))
+        except ValueError:
+            interval = DEFAULT_INTERVAL
+    stop = threading.Event()
+
+    def run():
+        while not stop.wait(interval):
+            try:
+                write_snapshot(path)
+            except OSError:
+                pass
+
+    thread = threading.Thread(target=run, name='metrics-snapshots', daemon=True)
+    _snapshots = (thread, stop, path)
+    thread.start()
+    atexit.register(stop_snapshots)
+    return thread
+
+def stop_snapshots():
+    """Stop periodic snapshots and write a final one"""
+    global _snapshots
+    if _snapshots is None:
+        return
+    import atexit
+    thread, stop, path = _snapshots
+    _snapshots = None
+    atexit.unregister(stop_snapshots)
+    stop.set()
+    thread.join()
+    try:
+        write_snapshot(path)
+    except OSError:
+        pass
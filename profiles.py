@@ -0,0 +1,225 @@
+"""
+Per-profile BMI history for BMI Calculator Pro
+
+Each profile (e.g. a patient at a shared kiosk) has its own history log,
+sharded on disk as ``<root>/<xx>/<profile>.jsonl`` where ``xx`` is derived
+from the profile ID, so no directory grows to thousands of files. The
+"default" profile keeps using ``bmi_history.jsonl`` in the working
+directory, so existing histories are not moved; a store with any other root
+keeps the default profile's log in that root instead.
+
+Loaded profiles stay in an LRU cache bounded by total entries and,
+optionally, estimated bytes, so switching back to a recent profile does not
+touch the disk while memory stays capped however many profiles exist.
+"""
+
+import os
+import re
+import sys
+import zlib
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional
+
+from history import HistoryStore, HISTORY_FILE, LEGACY_HISTORY_FILE
+from records import HistoryRecord
+
+PROFILES_DIR = 'profiles'
+DEFAULT_PROFILE = 'default'
+_PROFILE_ID = re.compile(r'[a-z0-9][a-z0-9_.-]{0,63}\Z')
+
+def normalize_profile_id(profile_id: str) -> str:
+    """
+    Validate a profile ID; IDs are case-insensitive and stored in lower case
+
+    Raises:
+        ValueError: If the ID is not 1-64 letters, digits, '_', '.' or '-'
+            starting with a letter or digit
+    """
+    normalized = str(profile_id).strip().lower()
+    if not _PROFILE_ID.match(normalized):
+        raise ValueError(f"Invalid profile ID: {profile_id!r} (use letters, digits, '_', '.' "
+                         f"or '-', starting with a letter or digit)")
+    return normalized
+
+def _estimate_entry_bytes(entries: List[Dict[str, Any]], sample: int = 64) -> int:
+    """Average memory of an entry dict and its values, from a sample of entries"""
+    if not entries:
+        return 0
+    step = max(1, len(entries) // sample)
+    sampled = entries[::step]
+    total = sum(entry.memory_size() if entry.__class__ is HistoryRecord else
+                sys.getsizeof(entry) + sum(sys.getsizeof(value) for value in entry.values())
+                for entry in sampled)
+    return total // len(sampled)
+
+class _CachedProfile:
+    __slots__ = ('store', 'entries', 'entry_bytes')
+
+    def __init__(self, store: HistoryStore, entries: List[Dict[str, Any]]):
+        self.store = store
+        self.entries = entries
+        self.entry_bytes = _estimate_entry_bytes(entries)
+
+    @property
+    def size_bytes(self) -> int:
+        return self.entry_bytes * len(self.entries)
+
+class ProfileStore:
+    """
+    Sharded per-profile histories with an LRU cache of loaded profiles
+
+    The most recently used profile is never evicted, so the entry list
+    returned by load() for the current profile stays the live list that
+    append() and clear() update. Cached lists must only be changed through
+    those methods, which keep the cache totals in step.
+    """
+
+    def __init__(self, root: str = PROFILES_DIR, max_entries: int = 200_000,
+                 max_bytes: Optional[int] = None):
+        """
+        Args:
+            root: Directory holding the sharded profile logs. With a root
+                other than PROFILES_DIR the default profile's log is
+                ``<root>/bmi_history.jsonl`` rather than the working directory's
+            max_entries: Cached entries across all profiles
+            max_bytes: Estimated memory of cached entries, or None for no limit
+        """
+        self.root = root
+        # Only the standard layout uses (and migrates) the working directory's history
+        self._default_layout = root == PROFILES_DIR
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._cache: 'OrderedDict[str, _CachedProfile]' = OrderedDict()
+        self._entries = 0
+        self._bytes = 0
+
+    def path(self, profile_id: str) -> str:
+        """History log file of a profile"""
+        profile_id = normalize_profile_id(profile_id)
+        if profile_id == DEFAULT_PROFILE:
+            return HISTORY_FILE if self._default_layout else os.path.join(self.root, HISTORY_FILE)
+        shard = f"{zlib.crc32(profile_id.encode('utf-8')) & 0xff:02x}"
+        return os.path.join(self.root, shard, profile_id + '.jsonl')
+
+    def store(self, profile_id: str) -> HistoryStore:
+        """HistoryStore of a profile (the cached one if the profile is loaded)"""
+        profile_id = normalize_profile_id(profile_id)
+        cached = self._cache.get(profile_id)
+        if cached is not None:
+            return cached.store
+        if profile_id == DEFAULT_PROFILE and self._default_layout:
+            return HistoryStore()
+        return HistoryStore(self.path(profile_id), legacy_path=None)
+
+    def load(self, profile_id: str) -> List[Dict[str, Any]]:
+        """Entries of a profile, from the cache or from disk"""
+        profile_id = normalize_profile_id(profile_id)
+        cached = self._cache.get(profile_id)
+        if cached is not None:
+            self.hits += 1
+            self._cache.move_to_end(profile_id)
+            return cached.entries
+
+        self.misses += 1
+        store = self._writable_store(profile_id)
+        cached = self._cache[profile_id] = _CachedProfile(store, store.load())
+        self._entries += len(cached.entries)
+        self._bytes += cached.size_bytes
+        self._evict()
+        return cached.entries
+
+    def append(self, profile_id: str, entry: Dict[str, Any]):
+        """
+        Append an entry to a profile's log and, if loaded, to its cached entries
+
+        Raises:
+            OSError: If the log cannot be written; the cached entries are unchanged
+        """
+        profile_id = normalize_profile_id(profile_id)
+        cached = self._cache.get(profile_id)
+        if cached is None:
+            self._writable_store(profile_id).append(entry)
+            return
+        # Written first: if the write fails, the cache still matches the log
+        cached.store.append(entry)
+        self._bytes -= cached.size_bytes
+        cached.entries.append(entry)
+        if not cached.entry_bytes:
+            cached.entry_bytes = _estimate_entry_bytes(cached.entries)
+        self._entries += 1
+        self._bytes += cached.size_bytes
+        self._cache.move_to_end(profile_id)
+        self._evict()
+
+    def append_many(self, profile_id: str, entries: Iterable[Dict[str, Any]]) -> int:
+        """
+        Append entries to a profile's log in one write (see HistoryStore.append_many)
+
+        A cached profile is dropped from the cache and reloaded on next use,
+        rather than holding every appended entry in memory.
+
+        Returns:
+            Number of entries appended
+        """
+        profile_id = normalize_profile_id(profile_id)
+        store = self._writable_store(profile_id)
+        self.evict(profile_id)
+        return store.append_many(entries)
+
+    def clear(self, profile_id: str):
+        """Remove all entries of a profile"""
+        profile_id = normalize_profile_id(profile_id)
+        cached = self._cache.get(profile_id)
+        if cached is not None:
+            self._forget(cached)
+            cached.entries.clear()
+            cached.store.clear()
+        elif os.path.exists(self.path(profile_id)):
+            self.store(profile_id).clear()
+
+    def evict(self, profile_id: str):
+        """Drop a profile from the cache"""
+        cached = self._cache.pop(normalize_profile_id(profile_id), None)
+        if cached is not None:
+            self._forget(cached)
+
+    def profiles(self) -> List[str]:
+        """IDs of all profiles with a history on disk, sorted"""
+        default_path = self.path(DEFAULT_PROFILE)
+        found = {DEFAULT_PROFILE} if (os.path.exists(default_path) or (
+            self._default_layout and os.path.exists(LEGACY_HISTORY_FILE))) else set()
+        if os.path.isdir(self.root):
+            for shard in os.scandir(self.root):
+                if shard.is_dir():
+                    found.update(name[:-6] for name in os.listdir(shard.path) if name.endswith('.jsonl'))
+        return sorted(found)
+
+    def cached_profiles(self) -> List[str]:
+        """Loaded profile IDs, least recently used first"""
+        return list(self._cache)
+
+    def cached_entries(self) -> int:
+        return self._entries
+
+    def cached_bytes(self) -> int:
+        """Estimated memory of the cached entries"""
+        return self._bytes
+
+    def _writable_store(self, profile_id: str) -> HistoryStore:
+        store = self.store(profile_id)
+        directory = os.path.dirname(store.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        return store
+
+    def _forget(self, cached: _CachedProfile):
+        self._entries -= len(cached.entries)
+        self._bytes -= cached.size_bytes
+
+    def _evict(self):
+        while len(self._cache) > 1 and (
+                self._entries > self.max_entries
+                or (self.max_bytes is not None and self._bytes > self.max_bytes)):
+            self._forget(self._cache.popitem(last=False)[1])
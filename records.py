@@ -0,0 +1,182 @@
+"""
+Compact history records for BMI Calculator Pro
+
+A history entry as a JSON dict costs several hundred bytes: a dict, a
+formatted date string and separate unit and category strings per entry.
+HistoryRecord keeps the same data in __slots__, with the date as epoch
+seconds and the unit and category as small ints, and formats them only
+when they are read. Records are read-only mappings with the same keys as
+the JSON entries, so code that reads entry['date'] or entry.get('category')
+works unchanged, and to_dict() gives back the JSON layout.
+"""
+
+import sys
+from collections.abc import Mapping
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Dict, Optional
+
+from classification import SCHEMES
+from utils import get_bmi_category
+
+DATE_FORMAT = "%Y-%m-%d %H:%M"
+UNITS = ("metric", "imperial")
+# Category names of every scheme, so any saved category fits in a small int
+CATEGORY_NAMES = tuple(dict.fromkeys(name for scheme in SCHEMES.values()
+                                     for name, _ in scheme.categories))
+FIELDS = ('date', 'weight', 'height', 'bmi', 'unit', 'category')
+_FIELD_SET = frozenset(FIELDS)
+
+_UNIT_CODES = {unit: code for code, unit in enumerate(UNITS)}
+_CATEGORY_CODES = {name: code for code, name in enumerate(CATEGORY_NAMES)}
+
+@lru_cache(maxsize=4096)
+def _hour_timestamp(hour: str) -> int:
+    """Epoch seconds of a local "%Y-%m-%d %H" hour; entries share hours, so this is cached"""
+    return int(datetime(int(hour[0:4]), int(hour[5:7]), int(hour[8:10]), int(hour[11:13])).timestamp())
+
+def parse_date(date: str) -> int:
+    """
+    Epoch seconds of a "%Y-%m-%d %H:%M" local date
+
+    Raises:
+        ValueError: If the date is not in that format
+    """
+    if len(date) == 16 and date[4] == '-' and date[7] == '-' and date[10] == ' ' and date[13] == ':':
+        minute = int(date[14:16])
+        if 0 <= minute < 60:
+            return _hour_timestamp(date[:13]) + minute * 60
+    return int(datetime.strptime(date, DATE_FORMAT).timestamp())
+
+class HistoryRecord(Mapping):
+    """
+    One history entry stored in slots
+
+    Attributes:
+        timestamp: Epoch seconds (minute resolution, like the JSON date)
+        weight, height, bmi: Floats as saved
+        unit: Index into UNITS, or the unit string if it is not a known unit
+        category: Index into CATEGORY_NAMES, or the name if it is not known
+        extra: Dict of any other keys the JSON entry had, or None
+    """
+
+    __slots__ = ('timestamp', 'weight', 'height', 'bmi', 'unit', 'category', 'extra')
+
+    def __init__(self, timestamp: int, weight: float, height: float, bmi: float,
+                 unit: Any = 0, category: Any = None, extra: Optional[Dict[str, Any]] = None):
+        self.timestamp = timestamp
+        self.weight = weight
+        self.height = height
+        self.bmi = bmi
+        self.unit = unit
+        if category is None:
+            category = _CATEGORY_CODES[get_bmi_category(bmi)[0]]
+        self.category = category
+        self.extra = extra
+
+    @classmethod
+    def create(cls, weight: float, height: float, bmi: float, unit: str,
+               scheme: Optional[str] = None) -> 'HistoryRecord':
+        """
+        Record for a calculation made now, like utils.create_history_entry
+
+        The category is the one shown to the user, from the classification
+        scheme key in use (WHO adult cutoffs if None).
+        """
+        now = datetime.now().replace(second=0, microsecond=0)
+        return cls(int(now.timestamp()), float(weight), float(height), float(bmi),
+                   _UNIT_CODES.get(unit, unit), _CATEGORY_CODES[get_bmi_category(bmi, scheme)[0]])
+
+    @classmethod
+    def from_dict(cls, entry: Dict[str, Any]) -> 'HistoryRecord':
+        """
+        Build a record from a JSON history entry
+
+        Raises:
+            KeyError, TypeError, ValueError: If the entry has no valid date,
+                weight, height or BMI
+        """
+        unit = entry.get('unit', 'metric')
+        category = entry.get('category')
+        extra = None
+        # Six keys including unit and category (and the required four) is
+        # exactly FIELDS, the common case; only other entries pay for a set test
+        if (len(entry) != 6 or category is None or 'unit' not in entry) and not entry.keys() <= _FIELD_SET:
+            extra = {key: value for key, value in entry.items() if key not in _FIELD_SET}
+        return cls(parse_date(entry['date']), float(entry['weight']), float(entry['height']),
+                   float(entry['bmi']), _UNIT_CODES.get(unit, unit),
+                   None if category is None else _CATEGORY_CODES.get(category, category), extra)
+
+    @property
+    def date(self) -> str:
+        return datetime.fromtimestamp(self.timestamp).strftime(DATE_FORMAT)
+
+    @property
+    def unit_name(self) -> str:
+        return UNITS[self.unit] if self.unit.__class__ is int else self.unit
+
+    @property
+    def category_name(self) -> str:
+        return CATEGORY_NAMES[self.category] if self.category.__class__ is int else self.category
+
+    def __getitem__(self, key: str):
+        if key == 'bmi':
+            return self.bmi
+        if key == 'date':
+            return self.date
+        if key == 'weight':
+            return self.weight
+        if key == 'height':
+            return self.height
+        if key == 'unit':
+            return self.unit_name
+        if key == 'category':
+            return self.category_name
+        if self.extra is not None and key in self.extra:
+            return self.extra[key]
+        raise KeyError(key)
+
+    def __iter__(self):
+        yield from FIELDS
+        if self.extra:
+            yield from self.extra
+
+    def __len__(self) -> int:
+        return 6 + (len(self.extra) if self.extra else 0)
+
+    def __repr__(self) -> str:
+        return f"HistoryRecord({self.to_dict()!r})"
+
+    def to_dict(self) -> Dict[str, Any]:
+        """The entry in the JSON layout written by create_history_entry"""
+        entry = {
+            'date': self.date,
+            'weight': self.weight,
+            'height': self.height,
+            'bmi': self.bmi,
+            'unit': self.unit_name,
+            'category': self.category_name,
+        }
+        if self.extra:
+            entry.update(self.extra)
+        return entry
+
+    def memory_size(self) -> int:
+        """Bytes used by the record and the values it holds"""
+        return sys.getsizeof(self) + sum(sys.getsizeof(getattr(self, slot)) for slot in
+                                         ('timestamp', 'weight', 'height', 'bmi'))
+
+def to_record(entry: Any) -> Any:
+    """Convert a JSON entry to a HistoryRecord, or return it unchanged if it is not a valid entry"""
+    if entry.__class__ is HistoryRecord:
+        return entry
+    try:
+        return HistoryRecord.from_dict(entry)
+    except (KeyError, TypeError, ValueError, AttributeError):
+        return entry
+
+def json_default(value: Any) -> Dict[str, Any]:
+    """``default`` for json.dump(s) so records serialize as their JSON entry"""
+    if isinstance(value, HistoryRecord):
+        return value.to_dict()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
@@ -8,6 +8,12 @@ import os
 
 def main():
     """Launch the BMI Calculator application"""
+    if "--console" in sys.argv[1:]:
+        # Console version: never import the GUI toolkit
+        sys.argv.remove("--console")
+        from bmi_console import main as console_main
+        return console_main()
+    
     print("🚀 Starting BMI Calculator Pro...")
     
     try:
@@ -0,0 +1,375 @@
+#!/usr/bin/env python3
+"""
+Local HTTP scoring service for BMI Calculator Pro
+
+A small stdlib-only asyncio HTTP/1.1 server that exposes the utils
+functions to other processes without starting a Python interpreter per
+record. Connections are kept alive, at most ``max_concurrency`` requests are
+processed at once, and the batch endpoint reads and writes NDJSON
+incrementally so neither side has to buffer a whole batch.
+
+Endpoints:
+    GET  /health
+    GET  /bmi?weight=70&height=175[&scheme=who]    BMI and category
+    GET  /category?bmi=22.9[&scheme=who]           Category for a BMI
+    GET  /convert/kg_to_lbs?value=70               Also lbs_to_kg,
+    GET  /convert/cm_to_feet_inches?value=175      feet_inches_to_cm
+    GET  /convert/feet_inches_to_cm?feet=5&inches=9    (feet, inches)
+    POST /batch                                    NDJSON rows in, NDJSON results out
+
+Batch rows use the same columns as the console's --score mode (weight,
+height, optional unit); each output line is the scored row or
+{"line": n, "error": "..."}.
+
+    python server.py --port 8080
+"""
+
+import argparse
+import asyncio
+import json
+import math
+from typing import Any, AsyncIterator, Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+import metrics
+
+from utils import (
+    calculate_bmi, get_bmi_category, convert_kg_to_lbs, convert_lbs_to_kg,
+    convert_cm_to_feet_inches, convert_feet_inches_to_cm
+)
+
+MAX_HEADER_BYTES = 16 * 1024
+MAX_LINE_BYTES = 64 * 1024
+FLUSH_BYTES = 16 * 1024
+REASONS = {
+    200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+    411: "Length Required", 413: "Payload Too Large", 431: "Request Header Fields Too Large",
+    500: "Internal Server Error",
+}
+
+class HTTPError(Exception):
+    """Error that is reported to the client with a status code"""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+def _number(params: Dict[str, list], name: str) -> float:
+    try:
+        value = float(params[name][0])
+    except KeyError:
+        raise HTTPError(400, f"Missing parameter: {name}")
+    except ValueError:
+        raise HTTPError(400, f"Invalid number for {name}: {params[name][0]!r}")
+    # float() accepts "nan" and "inf", which have no JSON encoding
+    if not math.isfinite(value):
+        raise HTTPError(400, f"Invalid number for {name}: {params[name][0]!r}")
+    return value
+
+def _scheme(params: Dict[str, list]) -> Optional[str]:
+    return params.get("scheme", [None])[0]
+
+def handle_bmi(params):
+    weight, height = _number(params, "weight"), _number(params, "height")
+    try:
+        bmi = calculate_bmi(weight, height)
+        category, color = get_bmi_category(bmi, _scheme(params))
+    except ValueError as e:
+        raise HTTPError(400, str(e))
+    return {"bmi": bmi, "category": category, "color": color}
+
+def handle_category(params):
+    try:
+        category, color = get_bmi_category(_number(params, "bmi"), _scheme(params))
+    except ValueError as e:
+        raise HTTPError(400, str(e))
+    return {"category": category, "color": color}
+
+def _convert_cm_to_feet_inches(params):
+    feet, inches = convert_cm_to_feet_inches(_number(params, "value"))
+    return {"feet": feet, "inches": inches}
+
+CONVERSIONS = {
+    "kg_to_lbs": lambda params: {"value": convert_kg_to_lbs(_number(params, "value"))},
+    "lbs_to_kg": lambda params: {"value": convert_lbs_to_kg(_number(params, "value"))},
+    "cm_to_feet_inches": _convert_cm_to_feet_inches,
+    "feet_inches_to_cm": lambda params: {
+        "value": convert_feet_inches_to_cm(int(_number(params, "feet")), _number(params, "inches"))
+    },
+}
+
+ROUTES = {
+    "/health": lambda params: {"status": "ok"},
+    "/bmi": handle_bmi,
+    "/category": handle_category,
+}
+
+class BMIServer:
+    """asyncio HTTP server for BMI scoring"""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 8080, max_concurrency: int = 64,
+                 idle_timeout: float = 30.0, max_body_bytes: int = 256 * 1024 * 1024):
+        self.host = host
+        self.port = port
+        self.idle_timeout = idle_timeout
+        self.max_body_bytes = max_body_bytes
+        self.max_concurrency = max_concurrency
+        self._slots = None
+        self._server = None
+
+    async def start(self):
+        """Start listening; the bound port is available as self.port"""
+        self._slots = asyncio.Semaphore(self.max_concurrency)
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port,
+                                                  limit=MAX_LINE_BYTES)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self):
+        if self._server is None:
+            await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                try:
+                    request = await asyncio.wait_for(self._read_head(reader), self.idle_timeout)
+                except asyncio.TimeoutError:
+                    break
+                if request is None:
+                    break
+                method, target, version, headers = request
+                keep_alive = self._keep_alive(version, headers)
+                # Requests beyond max_concurrency wait here; their connections
+                # are not read further, so TCP flow control pushes back on clients
+                async with self._slots:
+                    try:
+                        keep_alive = await self._dispatch(method, target, headers,
+                                                          reader, writer, keep_alive)
+                    except HTTPError as e:
+                        keep_alive = keep_alive and e.status < 500 and e.status != 413
+                        await self._send_json(writer, e.status, {"error": str(e)}, keep_alive)
+                    except (ConnectionError, asyncio.IncompleteReadError):
+                        break
+                    except Exception as e:
+                        keep_alive = False
+                        await self._send_json(writer, 500, {"error": str(e)}, keep_alive)
+                if not keep_alive:
+                    break
+        except HTTPError as e:
+            await self._send_json(writer, e.status, {"error": str(e)}, False)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _read_head(self, reader) -> Optional[Tuple[str, str, str, Dict[str, str]]]:
+        try:
+            head = await reader.readuntil(b"\r\n\r\n")
+        except asyncio.IncompleteReadError as e:
+            if not e.partial.strip():
+                return None  # client closed the connection between requests
+            raise HTTPError(400, "Incomplete request")
+        except asyncio.LimitOverrunError:
+            raise HTTPError(431, "Request headers too large")
+        if len(head) > MAX_HEADER_BYTES:
+            raise HTTPError(431, "Request headers too large")
+        lines = head.decode("latin-1").split("\r\n")
+        try:
+            method, target, version = lines[0].split(" ", 2)
+        except ValueError:
+            raise HTTPError(400, "Malformed request line")
+        headers = {}
+        for line in lines[1:]:
+            if line:
+                name, _, value = line.partition(":")
+                headers[name.strip().lower()] = value.strip()
+        return method.upper(), target, version, headers
+
+    @staticmethod
+    def _keep_alive(version: str, headers: Dict[str, str]) -> bool:
+        connection = headers.get("connection", "").lower()
+        if version == "HTTP/1.0":
+            return connection == "keep-alive"
+        return connection != "close"
+
+    async def _dispatch(self, method, target, headers, reader, writer, keep_alive):
+        url = urlsplit(target)
+        params = parse_qs(url.query)
+        if url.path == "/batch":
+            if method != "POST":
+                await self._discard_body(headers, reader)
+                raise HTTPError(405, "Use POST for /batch")
+            return await self._batch(headers, reader, writer, keep_alive)
+
+        await self._discard_body(headers, reader)
+        if method != "GET":
+            raise HTTPError(405, f"Use GET for {url.path}")
+        if url.path in ROUTES:
+            handler = ROUTES[url.path]
+        elif url.path.startswith("/convert/") and url.path[9:] in CONVERSIONS:
+            handler = CONVERSIONS[url.path[9:]]
+        else:
+            raise HTTPError(404, f"No such endpoint: {url.path}")
+        await self._send_json(writer, 200, handler(params), keep_alive)
+        return keep_alive
+
+    async def _discard_body(self, headers, reader):
+        async for _ in self._body_chunks(headers, reader, required=False):
+            pass
+
+    async def _body_chunks(self, headers, reader, required=True) -> AsyncIterator[bytes]:
+        """Yield the request body piece by piece (Content-Length or chunked)"""
+        if headers.get("transfer-encoding", "").lower() == "chunked":
+            total = 0
+            while True:
+                size_line = await self._read_line(reader)
+                try:
+                    size = int(size_line.split(b";")[0], 16)
+                except ValueError:
+                    raise HTTPError(400, "Malformed chunk size")
+                if size == 0:
+                    # Skip trailers up to the terminating blank line
+                    while (await self._read_line(reader)) != b"\r\n":
+                        pass
+                    return
+                total += size
+                if total > self.max_body_bytes:
+                    raise HTTPError(413, "Request body too large")
+                yield await reader.readexactly(size)
+                await reader.readexactly(2)
+        elif "content-length" in headers:
+            try:
+                remaining = int(headers["content-length"])
+            except ValueError:
+                raise HTTPError(400, "Invalid Content-Length")
+            if remaining > self.max_body_bytes:
+                raise HTTPError(413, "Request body too large")
+            while remaining > 0:
+                chunk = await reader.read(min(remaining, FLUSH_BYTES))
+                if not chunk:
+                    raise asyncio.IncompleteReadError(b"", remaining)
+                remaining -= len(chunk)
+                yield chunk
+        elif required:
+            raise HTTPError(411, "Content-Length or chunked encoding required")
+
+    @staticmethod
+    async def _read_line(reader) -> bytes:
+        """A CRLF-terminated line of a chunked body"""
+        try:
+            return await reader.readuntil(b"\r\n")
+        except asyncio.LimitOverrunError:
+            raise HTTPError(413, "Chunk size line too long")
+
+    async def _batch(self, headers, reader, writer, keep_alive) -> bool:
+        """
+        Score an NDJSON body, writing results as chunks while it is read
+
+        Returns:
+            Whether the connection can be reused. An error after the response
+            has started is reported as a final {"error": ...} line and the
+            connection is closed, since the rest of the body was not read.
+        """
+        from bulk import score_row
+
+        if headers.get("transfer-encoding", "").lower() != "chunked":
+            if "content-length" not in headers:
+                raise HTTPError(411, "Content-Length or chunked encoding required")
+            if headers["content-length"].isdigit() and int(headers["content-length"]) > self.max_body_bytes:
+                raise HTTPError(413, "Request body too large")
+        writer.write(self._head(200, "application/x-ndjson",
+                                {"Transfer-Encoding": "chunked"}, keep_alive))
+        output = []
+        pending = 0
+        line_number = 0
+        partial = b""
+        try:
+            async for chunk in self._body_chunks(headers, reader):
+                lines = (partial + chunk).split(b"\n")
+                partial = lines.pop()
+                if len(partial) > MAX_LINE_BYTES:
+                    raise HTTPError(413, "NDJSON line too long")
+                for line in lines:
+                    line_number += 1
+                    pending += self._score_line(line, line_number, output, score_row)
+                if pending >= FLUSH_BYTES:
+                    await self._write_chunk(writer, output)
+                    pending = 0
+            if partial.strip():
+                line_number += 1
+                self._score_line(partial, line_number, output, score_row)
+        except HTTPError as e:
+            output.append(json.dumps({"error": str(e)}) + "\n")
+            keep_alive = False
+        await self._write_chunk(writer, output)
+        writer.write(b"0\r\n\r\n")
+        await writer.drain()
+        return keep_alive
+
+    @staticmethod
+    def _score_line(line, line_number, output, score_row) -> int:
+        if not line.strip():
+            return 0
+        try:
+            result = score_row(json.loads(line))
+        except ValueError as e:  # RowError or invalid JSON
+            result = {"line": line_number, "error": str(e)}
+        text = json.dumps(result) + "\n"
+        output.append(text)
+        return len(text)
+
+    @staticmethod
+    async def _write_chunk(writer, output):
+        if not output:
+            return
+        data = "".join(output).encode("utf-8")
+        output.clear()
+        writer.write(b"%x\r\n%s\r\n" % (len(data), data))
+        # Wait for the client to read before producing more output
+        await writer.drain()
+
+    @staticmethod
+    def _head(status: int, content_type: str, extra: Dict[str, Any], keep_alive: bool) -> bytes:
+        lines = [f"HTTP/1.1 {status} {REASONS.get(status, 'Unknown')}",
+                 f"Content-Type: {content_type}",
+                 f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+        lines += [f"{name}: {value}" for name, value in extra.items()]
+        return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+    async def _send_json(self, writer, status: int, body: Dict[str, Any], keep_alive: bool):
+        data = json.dumps(body).encode("utf-8")
+        writer.write(self._head(status, "application/json", {"Content-Length": len(data)}, keep_alive) + data)
+        await writer.drain()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="BMI Calculator Pro scoring service")
+    parser.add_argument("--host", default="127.0.0.1", help="address to bind (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--max-concurrency", type=int, default=64,
+                        help="requests processed at once; others wait (default: 64)")
+    parser.add_argument("--idle-timeout", type=float, default=30.0,
+                        help="seconds before an idle keep-alive connection is closed")
+    args = parser.parse_args(argv)
+
+    server = BMIServer(args.host, args.port, args.max_concurrency, args.idle_timeout)
+    metrics.start_snapshots()
+
+    async def run():
+        await server.start()
+        print(f"BMI scoring service listening on http://{server.host}:{server.port}")
+        await server.serve_forever()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
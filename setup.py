@@ -2,7 +2,7 @@
 Setup script for BMI Calculator Pro
 """
 
-from setuptools import setup, find_packages
+from setuptools import setup
 import os
 
 # Read the README file
@@ -24,7 +24,11 @@ setup(
     long_description=read_readme(),
     long_description_content_type="text/markdown",
     url="https://github.com/1cbyc/bmi-calculator",
-    packages=find_packages(),
+    py_modules=[
+        "bmi", "bmi_console", "binary_history", "bulk", "classification",
+        "config", "export", "growth", "history", "importer", "metrics", "profiles",
+        "records", "run", "server", "settings", "status", "utils", "viewmodel",
+    ],
     classifiers=[
         "Development Status :: 4 - Beta",
         "Intended Audience :: End Users/Desktop",
@@ -54,7 +58,9 @@ setup(
     },
     entry_points={
         "console_scripts": [
-            "bmi-calculator=bmi:main",
+            "bmi-calculator=run:main",
+            "bmi-console=bmi_console:main",
+            "bmi-server=server:main",
         ],
     },
     include_package_data=True,
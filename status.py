@@ -3,26 +3,42 @@
 BMI Calculator Pro - Status Check
 """
 
-def check_status():
-    """Check if all components are working"""
+import argparse
+import importlib.util
+import os
+import sys
+
+def check_status(gui=False):
+    """
+    Check if all components are working
+    
+    Args:
+        gui: Import CustomTkinter to check the GUI; otherwise only check
+             that it is installed, which keeps the check fast
+    """
     print("🔍 BMI Calculator Pro - Status Check")
     print("=" * 40)
     
     # Check Python
-    import sys
-    print(f"✅ Python {sys.version[:3]} detected")
+    import platform
+    print(f"✅ Python {platform.python_version()} detected")
     
     # Check CustomTkinter
-    try:
-        import customtkinter as ctk
-        print("✅ CustomTkinter imported successfully")
-    except ImportError as e:
-        print(f"❌ CustomTkinter import failed: {e}")
-        return False
+    if gui:
+        try:
+            import customtkinter as ctk
+            print("✅ CustomTkinter imported successfully")
+        except ImportError as e:
+            print(f"❌ CustomTkinter import failed: {e}")
+            return False
+    elif importlib.util.find_spec("customtkinter") is not None:
+        print("✅ CustomTkinter installed (use --gui to import it)")
+    else:
+        print("⚠️ CustomTkinter not installed - only the console version is available")
     
     # Check our modules
     try:
-        from settings import *
+        import settings
         print("✅ Settings module working")
     except ImportError as e:
         print(f"❌ Settings import failed: {e}")
@@ -63,8 +79,55 @@ def check_status():
     print("✅ BMI Calculator Pro is ready to use!")
     return True
 
+def show_metrics(path=None, count=1):
+    """
+    Print metrics snapshots written by an instrumented run (BMI_METRICS=1)
+    
+    Args:
+        path: Metrics file, BMI_METRICS_FILE or bmi_metrics.jsonl if None
+        count: Number of most recent snapshots to print
+    """
+    from datetime import datetime
+    import metrics
+    
+    path = path or os.environ.get('BMI_METRICS_FILE') or metrics.METRICS_FILE
+    try:
+        snapshots = metrics.read_snapshots(path)
+    except OSError as e:
+        print(f"❌ No metrics in {path}: {e.strerror}")
+        print("   Run the app with BMI_METRICS=1 to record them")
+        return False
+    if not snapshots:
+        print(f"❌ No metrics snapshots in {path}")
+        return False
+    
+    for snapshot in snapshots[-count:]:
+        taken = datetime.fromtimestamp(snapshot.get('time', 0)).strftime("%Y-%m-%d %H:%M:%S")
+        print(f"📈 Metrics at {taken} (pid {snapshot.get('pid')})")
+        print("=" * 40)
+        for name, value in sorted(snapshot.get('counters', {}).items()):
+            print(f"  {name:<28} {value:>12,}")
+        histograms = snapshot.get('histograms', {})
+        if histograms:
+            print(f"  {'latency (ms)':<22} {'calls':>8} {'mean':>9} {'p50':>9} {'p99':>9} {'max':>9}")
+        for name, values in sorted(histograms.items()):
+            print(f"  {name:<22} {values['count']:>8,}" + "".join(
+                f" {values[key] * 1000:>9.3f}" for key in ('mean', 'p50', 'p99', 'max')))
+        print()
+    return True
+
 if __name__ == "__main__":
-    success = check_status()
+    parser = argparse.ArgumentParser(description="BMI Calculator Pro - Status Check")
+    parser.add_argument("--gui", action="store_true", help="also import the GUI toolkit")
+    parser.add_argument("--metrics", nargs="?", const=1, type=int, metavar="N",
+                        help="print the last N (default 1) metrics snapshots instead of checking")
+    parser.add_argument("--metrics-file", help="metrics file (default: $BMI_METRICS_FILE or bmi_metrics.jsonl)")
+    args = parser.parse_args()
+    if args.metrics is not None:
+        if args.metrics < 1:
+            parser.error("--metrics N needs N >= 1")
+        sys.exit(0 if show_metrics(args.metrics_file, args.metrics) else 1)
+    success = check_status(gui=args.gui)
     if success:
         print("\n🚀 To run the application:")
         print("  python bmi.py")
@@ -0,0 +1,88 @@
+"""
+Tests for the memory-mapped binary history format
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from binary_history import BinaryHistory, write_binary_history, append_binary_history
+from utils import create_history_entry, _load_numpy
+
+class TestBinaryHistory(unittest.TestCase):
+    """Test conversion and column access"""
+    
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'history.bin')
+        self.entries = [create_history_entry(60 + i, 170, 20.76 + i, "metric") for i in range(10)]
+        self.entries.append({'date': '2025-03-01 08:30', 'weight': 90, 'height': 170,
+                             'bmi': 31.14, 'unit': 'imperial'})
+        write_binary_history(self.path, self.entries)
+    
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+    
+    def test_round_trip(self):
+        """Test entries convert back to the create_history_entry layout"""
+        with BinaryHistory(self.path) as history:
+            entries = list(history.entries())
+        self.assertEqual(entries[:10], self.entries[:10])
+        self.assertEqual(entries[10]['category'], "Obese")
+        self.assertEqual(entries[10]['unit'], "imperial")
+        self.assertEqual(entries[10]['date'], "2025-03-01 08:30")
+    
+    def test_other_scheme_categories(self):
+        """Test categories of every classification scheme survive the round trip"""
+        entries = [create_history_entry(120, 170, 41.52, "metric", "who_classes"),
+                   create_history_entry(70, 170, 24.22, "metric", "who_asian")]
+        write_binary_history(self.path, entries)
+        with BinaryHistory(self.path) as history:
+            self.assertEqual(list(history.entries()), entries)
+        self.assertEqual([entry['category'] for entry in entries], ["Obese Class III", "Overweight"])
+    
+    def test_tail(self):
+        """Test reading the last entries"""
+        with BinaryHistory(self.path) as history:
+            self.assertEqual(len(history), 11)
+            self.assertEqual([e['bmi'] for e in history.tail(2)], [29.76, 31.14])
+            self.assertEqual(len(history.tail(100)), 11)
+    
+    def test_columns(self):
+        """Test zero-copy column views"""
+        with BinaryHistory(self.path) as history:
+            bmi = history.column('bmi')
+            self.assertEqual(list(bmi), [e['bmi'] for e in self.entries])
+            self.assertEqual(bmi[-1], 31.14)
+            self.assertEqual(history.column('category')[0], 1)
+            self.assertEqual(history.column('unit')[10], 1)
+            del bmi
+    
+    def test_append(self):
+        """Test appending records to an existing file"""
+        append_binary_history(self.path, self.entries[:2])
+        with BinaryHistory(self.path) as history:
+            self.assertEqual(len(history), 13)
+            self.assertEqual(history.tail(1)[0], self.entries[1])
+    
+    @unittest.skipIf(_load_numpy() is None, "NumPy not installed")
+    def test_numpy_column(self):
+        """Test NumPy column views"""
+        with BinaryHistory(self.path) as history:
+            bmi = history.numpy_column('bmi')
+            self.assertEqual(bmi.tolist(), [e['bmi'] for e in self.entries])
+            del bmi
+    
+    def test_rejects_other_files(self):
+        """Test non-history files are rejected"""
+        with open(self.path, 'wb') as f:
+            f.write(b'not a history file')
+        with self.assertRaises(ValueError):
+            BinaryHistory(self.path)
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
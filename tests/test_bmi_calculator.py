@@ -2,9 +2,12 @@
 Test suite for BMI Calculator Pro
 """
 
+import math
 import unittest
 import sys
 import os
+from array import array
+from unittest import mock
 
 # Add parent directory to path to import modules
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -12,8 +15,12 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from utils import (
     calculate_bmi, get_bmi_category, convert_kg_to_lbs, convert_lbs_to_kg,
     convert_cm_to_feet_inches, convert_feet_inches_to_cm,
-    validate_weight, validate_height, format_height_display, format_weight_display
+    validate_weight, validate_height, format_height_display, format_weight_display,
+    calculate_bmi_batch, BMI_CATEGORIES, INVALID_CATEGORY,
+    normalize_units_batch, UNIT_CODES, INVALID_UNIT, INVALID_WEIGHT, INVALID_HEIGHT,
+    weight_bands, healthy_weight_range, format_healthy_weight, weight_bands_batch
 )
+import utils
 
 class TestBMICalculations(unittest.TestCase):
     """Test BMI calculation functions"""
@@ -70,6 +77,117 @@ class TestBMICategories(unittest.TestCase):
         self.assertEqual(category, "Obese")
         self.assertEqual(color, "#D0021B")
 
+class TestBatchCalculations(unittest.TestCase):
+    """Test the batch BMI engine against the scalar functions"""
+    
+    weights = [70, 50, 90, 65.3, 120.25, 20, 300, 81.5, 70, 70]
+    heights = [170, 170, 170, 181, 199.5, 100, 250, 180, 0, -170]
+    
+    def assert_matches_scalar(self, result):
+        for i, (weight, height) in enumerate(zip(self.weights, self.heights)):
+            if height <= 0:
+                self.assertTrue(result.invalid[i])
+                self.assertEqual(result.codes[i], INVALID_CATEGORY)
+                continue
+            bmi = calculate_bmi(weight, height)
+            self.assertFalse(result.invalid[i])
+            self.assertEqual(result.bmi[i], bmi)
+            self.assertEqual(BMI_CATEGORIES[result.codes[i]], get_bmi_category(bmi))
+    
+    def test_batch_matches_scalar(self):
+        """Test batch results equal calculate_bmi/get_bmi_category"""
+        self.assert_matches_scalar(calculate_bmi_batch(self.weights, self.heights))
+    
+    def test_batch_without_numpy(self):
+        """Test the pure Python fallback on array('d') inputs"""
+        with mock.patch.object(utils, '_load_numpy', return_value=None):
+            result = calculate_bmi_batch(array('d', self.weights), array('d', self.heights))
+        self.assert_matches_scalar(result)
+    
+    def test_batch_rounding_boundaries(self):
+        """Test values next to a .5 rounding boundary round like round()"""
+        weights = [k / 100 + 0.005 for k in range(1800, 3200)]
+        heights = [100.0] * len(weights)
+        for load_numpy in (utils._load_numpy, lambda: None):
+            with mock.patch.object(utils, '_load_numpy', load_numpy):
+                result = calculate_bmi_batch(weights, heights)
+            self.assertEqual(list(result.bmi), [calculate_bmi(w, 100.0) for w in weights])
+    
+    def test_batch_output_buffers(self):
+        """Test results are written into caller-provided buffers"""
+        n = len(self.weights)
+        for load_numpy in (utils._load_numpy, lambda: None):
+            out_bmi, out_codes = array('d', [0.0] * n), array('b', [0] * n)
+            with mock.patch.object(utils, '_load_numpy', load_numpy):
+                calculate_bmi_batch(self.weights, self.heights, out_bmi, out_codes)
+            self.assertEqual(out_bmi[0], calculate_bmi(70, 170))
+            self.assertEqual(out_codes[2], 3)
+            self.assertEqual(out_codes[8], INVALID_CATEGORY)
+    
+    def test_batch_colors(self):
+        """Test per-row colors, empty for invalid rows"""
+        colors = calculate_bmi_batch(self.weights, self.heights).colors()
+        self.assertEqual(colors[0], "#7ED321")
+        self.assertEqual(colors[8], "")
+    
+    def test_batch_length_mismatch(self):
+        """Test mismatched input lengths raise ValueError"""
+        with self.assertRaises(ValueError):
+            calculate_bmi_batch([70, 80], [170])
+
+class TestUnitNormalization(unittest.TestCase):
+    """Test batch unit normalization against the per-row helpers"""
+    
+    METRIC, IMPERIAL, STONES = UNIT_CODES["metric"], UNIT_CODES["imperial"], UNIT_CODES["stones"]
+    weights = [70, 154.3, 11, 65.5, 10, 700, 70, 70]
+    pounds = [0, 0, 3, 0, 0, 0, 0, 0]
+    heights = [175, 5, 5, 5.75, 5, 5, 90, 175]
+    inches = [0, 9.5, 10, 0, 0, 0, 0, 0]
+    units = [METRIC, IMPERIAL, STONES, IMPERIAL, STONES, IMPERIAL, METRIC, 7]
+    
+    def normalize(self, load_numpy):
+        with mock.patch.object(utils, '_load_numpy', load_numpy):
+            return normalize_units_batch(self.weights, self.heights, self.units,
+                                         pounds=self.pounds, inches=self.inches)
+    
+    def test_matches_per_row_conversion(self):
+        """Test valid rows convert exactly like the scalar helpers"""
+        expected = [
+            (70, 175),
+            (convert_lbs_to_kg(154.3), convert_feet_inches_to_cm(5, 9.5)),
+            (convert_lbs_to_kg(11 * 14 + 3), convert_feet_inches_to_cm(5, 10)),
+            (convert_lbs_to_kg(65.5), convert_feet_inches_to_cm(0, 5.75 * 12)),
+            (convert_lbs_to_kg(140), convert_feet_inches_to_cm(5, 0)),
+        ]
+        for load_numpy in (utils._load_numpy, lambda: None):
+            result = self.normalize(load_numpy)
+            for i, (weight_kg, height_cm) in enumerate(expected):
+                self.assertEqual(result.errors[i], 0)
+                self.assertEqual(result.weight_kg[i], weight_kg)
+                self.assertEqual(result.height_cm[i], height_cm)
+    
+    def test_range_and_unit_errors(self):
+        """Test invalid rows are flagged and set to NaN"""
+        for load_numpy in (utils._load_numpy, lambda: None):
+            result = self.normalize(load_numpy)
+            self.assertEqual(list(result.errors[5:]), [INVALID_WEIGHT, INVALID_HEIGHT, INVALID_UNIT])
+            self.assertTrue(all(math.isnan(value) for value in result.weight_kg[5:]))
+            self.assertTrue(all(math.isnan(value) for value in result.height_cm[5:]))
+    
+    def test_feeds_batch_scoring(self):
+        """Test normalized columns score like calculate_bmi on the converted values"""
+        result = normalize_units_batch(self.weights[:5], self.heights[:5], self.units[:5],
+                                       pounds=self.pounds[:5], inches=self.inches[:5])
+        scored = calculate_bmi_batch(result.weight_kg, result.height_cm)
+        self.assertEqual(scored.bmi[1], calculate_bmi(result.weight_kg[1], result.height_cm[1]))
+    
+    def test_length_mismatch(self):
+        """Test mismatched columns raise ValueError"""
+        for load_numpy in (utils._load_numpy, lambda: None):
+            with mock.patch.object(utils, '_load_numpy', load_numpy):
+                with self.assertRaises(ValueError):
+                    normalize_units_batch([70, 80], [170, 180], [0])
+
 class TestUnitConversions(unittest.TestCase):
     """Test unit conversion functions"""
     
@@ -144,6 +262,78 @@ class TestFormatting(unittest.TestCase):
         display = format_weight_display(70, "imperial")
         self.assertEqual(display, "154.3lbs")
 
+    def test_label_tables_match_formatting(self):
+        """Test table lookups give the same labels as direct formatting"""
+        for unit in ("metric", "imperial"):
+            for cm in range(100, 251):
+                feet, inches = convert_cm_to_feet_inches(cm)
+                expected = f"{cm // 100}.{cm % 100:02d}m" if unit == "metric" else f"{feet}'{inches:.1f}\""
+                self.assertEqual(format_height_display(cm, unit), expected)
+        self.assertEqual(format_height_display(175.5, "imperial"), "5'9.1\"")
+        self.assertEqual(format_height_display(255, "metric"), "2.55m")
+
+    def test_weight_labels_tolerate_step_drift(self):
+        """Test weights reached by repeated 0.1 kg steps use the step's label"""
+        weight = 65.0
+        for _ in range(7):
+            weight += 0.1
+        self.assertEqual(format_weight_display(weight, "metric"), "65.7kg")
+        self.assertEqual(format_weight_display(weight, "imperial"), "144.8lbs")
+        self.assertEqual(format_weight_display(70.25, "metric"), f"{70.25:.1f}kg")
+        self.assertEqual(format_weight_display(400, "metric"), "400.0kg")
+
+class TestWeightBands(unittest.TestCase):
+    """Test the inverse solver, its label tables and the batch version"""
+    
+    def test_limits_classify_into_band(self):
+        """Test each limit is in its band and the next 0.1 kg step is not"""
+        for scheme in (None, "who_asian"):
+            for cm in (100, 150.5, 170, 199, 250):
+                for name, _, low, high in weight_bands(cm, scheme):
+                    if low is not None:
+                        self.assertEqual(get_bmi_category(calculate_bmi(low, cm), scheme)[0], name)
+                        self.assertNotEqual(get_bmi_category(calculate_bmi(round(low - 0.1, 1), cm), scheme)[0], name)
+                    if high is not None:
+                        self.assertEqual(get_bmi_category(calculate_bmi(high, cm), scheme)[0], name)
+                        self.assertNotEqual(get_bmi_category(calculate_bmi(round(high + 0.1, 1), cm), scheme)[0], name)
+    
+    def test_healthy_weight(self):
+        """Test the healthy range and its labels in both units"""
+        self.assertEqual(healthy_weight_range(170), (53.5, 72.2))
+        self.assertEqual(format_healthy_weight(170), "Healthy weight: 53.5 - 72.2kg")
+        self.assertEqual(format_healthy_weight(170, "imperial"), "Healthy weight: 117.9 - 159.2lbs")
+        self.assertEqual(format_healthy_weight(0), "")
+        with self.assertRaises(ValueError):
+            weight_bands(0)
+    
+    def test_label_tables_match_solver(self):
+        """Test table lookups give the same labels as solving, in and out of the slider range"""
+        for unit in ("metric", "imperial"):
+            for cm in list(range(100, 251)) + [99, 180.5, 260]:
+                low, high = healthy_weight_range(cm, "who_asian")
+                if unit == "imperial":
+                    low, high = convert_kg_to_lbs(low), convert_kg_to_lbs(high)
+                expected = f"Healthy weight: {low:.1f} - {high:.1f}{'kg' if unit == 'metric' else 'lbs'}"
+                self.assertEqual(format_healthy_weight(cm, unit, "who_asian"), expected)
+    
+    def test_batch_matches_scalar(self):
+        """Test batch limits match weight_bands with and without NumPy"""
+        heights = [100, 150.5, 163.37, 170, 250, 0, -1]
+        for load_numpy in (utils._load_numpy, lambda: None):
+            with mock.patch.object(utils, '_load_numpy', load_numpy):
+                result = weight_bands_batch(array('d', heights))
+            self.assertIsNone(result.lows[0])
+            self.assertIsNone(result.highs[-1])
+            for i, cm in enumerate(heights[:5]):
+                for code, band in enumerate(weight_bands(cm)):
+                    if band.low_kg is not None:
+                        self.assertEqual(result.lows[code][i], band.low_kg)
+                    if band.high_kg is not None:
+                        self.assertEqual(result.highs[code][i], band.high_kg)
+            low, high = result.band()
+            self.assertEqual((low[3], high[3]), (53.5, 72.2))
+            self.assertTrue(math.isnan(low[5]) and math.isnan(high[6]))
+
 class TestIntegration(unittest.TestCase):
     """Test integration scenarios"""
     
@@ -0,0 +1,163 @@
+"""
+Tests for bulk CSV/JSONL scoring
+"""
+
+import csv
+import io
+import json
+import shutil
+import tempfile
+import threading
+import unittest
+from unittest import mock
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bulk import (
+    read_rows, score_row, score_stream, score_file_parallel, plan_shards,
+    ResultWriter, RowError, ScoringCancelled
+)
+from utils import calculate_bmi
+
+class TestScoreRow(unittest.TestCase):
+    """Test scoring of single rows"""
+    
+    def test_metric_row(self):
+        """Test a metric row is scored and passed through"""
+        result = score_row({"id": "7", "weight": "70", "height": "170"})
+        self.assertEqual(result["id"], "7")
+        self.assertEqual(result["bmi"], calculate_bmi(70, 170))
+        self.assertEqual(result["category"], "Normal")
+    
+    def test_imperial_row(self):
+        """Test imperial rows are converted to kg/cm"""
+        result = score_row({"weight": 154.32, "height": 5.5, "unit": "imperial"})
+        self.assertAlmostEqual(result["weight_kg"], 70, places=1)
+        self.assertAlmostEqual(result["height_cm"], 167.64, places=2)
+    
+    def test_invalid_rows(self):
+        """Test malformed and out-of-range rows raise RowError"""
+        for row in ({"weight": "x", "height": 170}, {"weight": 70}, {"weight": 10, "height": 170},
+                    {"weight": 70, "height": 170, "unit": "stone"}, [70, 170]):
+            with self.assertRaises(RowError):
+                score_row(row)
+
+class TestScoreStream(unittest.TestCase):
+    """Test streaming a whole file"""
+    
+    def test_csv_to_jsonl_with_rejects(self):
+        """Test good rows are written and bad rows rejected"""
+        source = io.StringIO("weight,height\n70,170\nabc,170\n90,170\n")
+        output, rejects = io.StringIO(), io.StringIO()
+        stats = score_stream(read_rows(source, "csv"), ResultWriter(output, "jsonl"), rejects)
+        self.assertEqual((stats.rows, stats.rejected), (2, 1))
+        results = [json.loads(line) for line in output.getvalue().splitlines()]
+        self.assertEqual([r["category"] for r in results], ["Normal", "Obese"])
+        reject = json.loads(rejects.getvalue())
+        self.assertEqual(reject["line"], 3)
+    
+    def test_jsonl_to_csv(self):
+        """Test JSONL input, including a malformed line, to CSV output"""
+        source = io.StringIO('{"weight": 50, "height": 170}\nnot json\n')
+        output, rejects = io.StringIO(), io.StringIO()
+        stats = score_stream(read_rows(source, "jsonl"), ResultWriter(output, "csv"), rejects)
+        self.assertEqual((stats.rows, stats.rejected), (1, 1))
+        lines = output.getvalue().splitlines()
+        self.assertEqual(lines[0], "weight,height,unit,weight_kg,height_cm,bmi,category")
+        self.assertTrue(lines[1].endswith("17.3,Underweight"))
+
+    def test_mixed_jsonl_to_csv(self):
+        """Test later JSONL rows with other columns are kept or rejected, never truncated"""
+        source = io.StringIO('{"weight": 50, "height": 170}\n'
+                             '{"weight": 150, "height": 5.9, "unit": "imperial"}\n'
+                             '{"id": 7, "weight": 70, "height": 175}\n')
+        output, rejects = io.StringIO(), io.StringIO()
+        stats = score_stream(read_rows(source, "jsonl"), ResultWriter(output, "csv"), rejects)
+        self.assertEqual((stats.rows, stats.rejected), (2, 1))
+        rows = list(csv.DictReader(io.StringIO(output.getvalue())))
+        self.assertEqual(rows[1]["unit"], "imperial")
+        self.assertEqual(json.loads(rejects.getvalue())["line"], 3)
+        self.assertIn("id", json.loads(rejects.getvalue())["error"])
+
+class TestParallelScoring(unittest.TestCase):
+    """Test sharded scoring with a process pool"""
+    
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'input.csv')
+        with open(self.path, 'w') as f:
+            f.write("id,weight,height\n")
+            for i in range(500):
+                weight = "bad" if i % 50 == 0 else 40 + i % 120
+                f.write(f"{i},{weight},{150 + i % 50}\n")
+    
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+    
+    def test_shards_align_to_lines(self):
+        """Test shard boundaries fall on line starts and cover the data"""
+        ranges = plan_shards(self.path, 7)
+        with open(self.path, 'rb') as f:
+            data = f.read()
+        self.assertEqual(ranges[0][0], data.index(b"\n") + 1)
+        self.assertEqual(ranges[-1][1], len(data))
+        for (_, end), (start, _) in zip(ranges, ranges[1:]):
+            self.assertEqual(end, start)
+            self.assertEqual(data[start - 1:start], b"\n")
+    
+    def test_matches_sequential(self):
+        """Test parallel output and rejects equal the sequential run"""
+        expected, expected_rejects = io.StringIO(), io.StringIO()
+        with open(self.path, newline='') as f:
+            score_stream(read_rows(f, "csv"), ResultWriter(expected, "csv"), expected_rejects)
+        output, rejects = io.BytesIO(), io.StringIO()
+        progress = []
+        stats = score_file_parallel(self.path, output, rejects, workers=2, shards=5,
+                                    progress=lambda *args: progress.append(args))
+        self.assertEqual(output.getvalue().decode(), expected.getvalue())
+        self.assertEqual(rejects.getvalue(), expected_rejects.getvalue())
+        self.assertEqual((stats.rows, stats.rejected), (490, 10))
+        self.assertEqual(progress[-1], (5, 5, 490))
+    
+    def test_mixed_jsonl_matches_sequential(self):
+        """Test every shard of a mixed-shape JSONL file writes the serial run's CSV columns"""
+        path = os.path.join(self.directory, 'input.jsonl')
+        with open(path, 'w') as f:
+            f.write('not json\n')
+            for i in range(300):
+                row = {"weight": 40 + i % 120, "height": 150 + i % 50}
+                if i % 3 == 1:
+                    row["unit"] = "metric"
+                if i % 7 == 6:
+                    row["note"] = "extra"
+                f.write(json.dumps(row) + "\n")
+        expected, expected_rejects = io.StringIO(), io.StringIO()
+        with open(path, newline='') as f:
+            score_stream(read_rows(f, "jsonl"), ResultWriter(expected, "csv"), expected_rejects)
+        output, rejects = io.BytesIO(), io.StringIO()
+        stats = score_file_parallel(path, output, rejects, output_format="csv", workers=2, shards=5)
+        self.assertEqual(output.getvalue().decode(), expected.getvalue())
+        self.assertEqual(rejects.getvalue(), expected_rejects.getvalue())
+        self.assertEqual((stats.rows, stats.rejected), (258, 43))
+    
+    def test_cancel(self):
+        """Test a set cancel event stops the run"""
+        cancel = threading.Event()
+        cancel.set()
+        with self.assertRaises(ScoringCancelled):
+            score_file_parallel(self.path, io.BytesIO(), workers=1, cancel=cancel)
+    
+    def test_workers_need_a_file(self):
+        """Test --workers with stdin is rejected instead of silently using one process"""
+        from bmi_console import parse_args, score_file
+        with self.assertRaises(ValueError):
+            score_file("-", workers=2)
+        with mock.patch('sys.stderr', io.StringIO()) as stderr, self.assertRaises(SystemExit):
+            parse_args(["--score", "-", "--workers", "4"])
+        self.assertIn("--workers needs an input file", stderr.getvalue())
+        self.assertEqual(parse_args(["--score", "-"]).workers, 1)
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
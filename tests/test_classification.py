@@ -0,0 +1,85 @@
+"""
+Tests for table-driven BMI classification
+"""
+
+import unittest
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from classification import (
+    CutoffScheme, SCHEMES, WHO_ADULT, WHO_ASIAN, WHO_OBESITY_CLASSES, LOOKUP_MAX_BMI, get_scheme
+)
+from utils import get_bmi_category, calculate_bmi_batch
+
+class TestSchemes(unittest.TestCase):
+    """Test the bundled cutoff tables"""
+    
+    def test_who_adult_boundaries(self):
+        """Test cutoffs are lower bounds of their category"""
+        self.assertEqual(WHO_ADULT.classify(18.49)[0], "Underweight")
+        self.assertEqual(WHO_ADULT.classify(18.5)[0], "Normal")
+        self.assertEqual(WHO_ADULT.classify(25)[0], "Overweight")
+        self.assertEqual(WHO_ADULT.classify(30)[0], "Obese")
+    
+    def test_who_asian(self):
+        """Test the lower WHO Asian cutoffs"""
+        self.assertEqual(WHO_ASIAN.classify(22.99)[0], "Normal")
+        self.assertEqual(WHO_ASIAN.classify(23)[0], "Overweight")
+        self.assertEqual(WHO_ASIAN.classify(27.5)[0], "Obese")
+    
+    def test_obesity_classes(self):
+        """Test obesity classes I/II/III"""
+        names = [WHO_OBESITY_CLASSES.classify(bmi)[0] for bmi in (32, 37.5, 40, 55)]
+        self.assertEqual(names, ["Obese Class I", "Obese Class II", "Obese Class III", "Obese Class III"])
+    
+    def test_get_bmi_category_scheme(self):
+        """Test utils.get_bmi_category goes through the scheme tables"""
+        self.assertEqual(get_bmi_category(24), ("Normal", "#7ED321"))
+        self.assertEqual(get_bmi_category(24, "who_asian"), ("Overweight", "#F5A623"))
+    
+    def test_batch_scheme(self):
+        """Test batch scoring with a non-default scheme"""
+        result = calculate_bmi_batch([70, 120], [170, 170], scheme="who_classes")
+        self.assertEqual(result.categories(), ["Normal", "Obese Class III"])
+    
+    def test_unknown_scheme(self):
+        """Test unknown scheme keys raise ValueError"""
+        with self.assertRaises(ValueError):
+            get_scheme("nope")
+    
+    def test_invalid_tables(self):
+        """Test malformed tables are rejected"""
+        with self.assertRaises(ValueError):
+            CutoffScheme("x", "x", (25, 18.5), (("a", ""), ("b", ""), ("c", "")))
+        with self.assertRaises(ValueError):
+            CutoffScheme("x", "x", (18.5,), (("a", ""),))
+    
+    def test_describe(self):
+        """Test band descriptions"""
+        self.assertEqual(WHO_ADULT.describe(), [
+            "Underweight: < 18.5", "Normal: 18.5 - 24.9", "Overweight: 25 - 29.9", "Obese: ≥ 30"
+        ])
+
+class TestQuantizedLookup(unittest.TestCase):
+    """Test the lookup table used for rounded BMIs"""
+    
+    def test_lookup_matches_bisect(self):
+        """Test every 2-decimal BMI in the table agrees with bisect"""
+        for scheme in SCHEMES.values():
+            for k in range(LOOKUP_MAX_BMI * 100 + 1):
+                bmi = round(k / 100, 2)
+                self.assertEqual(scheme.code_rounded(bmi), scheme.code(bmi))
+    
+    def test_outside_table(self):
+        """Test values outside the table fall back to bisect"""
+        self.assertEqual(WHO_ADULT.code_rounded(150.5), 3)
+        self.assertEqual(WHO_ADULT.code_rounded(-1), 0)
+    
+    def test_display_labels(self):
+        """Test precomputed GUI labels"""
+        self.assertEqual(WHO_ADULT.display_labels[WHO_ADULT.code_rounded(22.5)], "Normal (#7ED321)")
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
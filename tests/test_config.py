@@ -0,0 +1,87 @@
+"""
+Tests for configuration management
+"""
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config
+
+class TestConfig(unittest.TestCase):
+    """Test cached lookups and transactional writes"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'config.json')
+        self.config = Config(self.path)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def saved(self):
+        with open(self.path) as f:
+            return json.load(f)
+
+    def test_get_and_cached_misses(self):
+        """Test dotted lookups, including repeated lookups of missing keys"""
+        self.assertEqual(self.config.get('theme.primary_color'), "#50BFAB")
+        self.assertEqual(self.config.get('theme.primary_color'), "#50BFAB")
+        self.assertIsNone(self.config.get('theme.missing'))
+        self.assertEqual(self.config.get('theme.missing', 'fallback'), 'fallback')
+        self.assertEqual(self.config.get('window.width.deeper', 1), 1)
+
+    def test_set_invalidates_cache(self):
+        """Test cached values and accessors see later changes"""
+        width = self.config.accessor('window.width')
+        missing = self.config.accessor('demo.value', 'unset')
+        self.assertEqual((self.config.get('window.width'), width(), missing()), (700, 700, 'unset'))
+        self.config.set('window.width', 900)
+        self.config.set('demo.value', 'set')
+        self.assertEqual((self.config.get('window.width'), width(), missing()), (900, 900, 'set'))
+        self.config.set('window', {'width': 1000})
+        self.assertEqual(width(), 1000)
+        self.assertEqual(self.saved()['window'], {'width': 1000})
+
+    def test_transaction_writes_once(self):
+        """Test a transaction applies every set and writes the file once"""
+        writes = []
+        save_config = self.config.save_config
+        self.config.save_config = lambda: writes.append(1) or save_config()
+        with self.config.transaction():
+            for i in range(10):
+                self.config.set(f'demo.key{i}', i)
+            self.assertEqual(self.config.get('demo.key9'), 9)
+            self.assertFalse(os.path.exists(self.path))
+        self.assertEqual(len(writes), 1)
+        self.assertEqual(self.saved()['demo'], {f'key{i}': i for i in range(10)})
+
+    def test_transaction_rollback(self):
+        """Test a failing transaction restores the previous values and writes nothing"""
+        self.config.set('window.width', 800)
+        with self.assertRaises(RuntimeError):
+            with self.config.transaction():
+                self.config.set('window.width', 1200)
+                with self.config.transaction():
+                    self.config.set('demo.value', 1)
+                raise RuntimeError("abort")
+        self.assertEqual(self.config.get('window.width'), 800)
+        self.assertIsNone(self.config.get('demo.value'))
+        self.assertEqual(self.saved()['window']['width'], 800)
+        self.assertNotIn('demo', self.saved())
+
+    def test_reset_does_not_share_defaults(self):
+        """Test changes after a reset do not leak into the defaults"""
+        self.config.reset_to_defaults()
+        self.config.set('theme.primary_color', '#000000')
+        self.assertEqual(self.config.default_config['theme']['primary_color'], "#50BFAB")
+        self.config.reset_to_defaults()
+        self.assertEqual(self.config.get('theme.primary_color'), "#50BFAB")
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
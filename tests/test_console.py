@@ -0,0 +1,66 @@
+"""
+Tests for the interactive console menu
+"""
+
+import io
+import os
+import shutil
+import tempfile
+import unittest
+import sys
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bmi_console import ConsoleBMICalculator
+
+class TestConsoleMenu(unittest.TestCase):
+    """Test menu choices as a piped script would send them"""
+
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.directory = tempfile.mkdtemp()
+        os.chdir(self.directory)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        shutil.rmtree(self.directory)
+
+    def run_script(self, *lines):
+        calculator = ConsoleBMICalculator()
+        with mock.patch('builtins.input', side_effect=lines), \
+                mock.patch.object(calculator, 'clear_screen'), \
+                mock.patch('sys.stdout', io.StringIO()) as stdout:
+            calculator.run()
+        return calculator, stdout.getvalue()
+
+    def test_exit_keeps_its_number(self):
+        """Test 5 exits, as it did before options were added"""
+        _, output = self.run_script("5")
+        self.assertIn("5. Exit", output)
+        self.assertIn("Thanks for using", output)
+
+    def test_quit_words(self):
+        """Test q, quit and exit also leave the menu"""
+        for word in ("q", "QUIT", "exit"):
+            self.assertIn("Thanks for using", self.run_script(word)[1])
+
+    def test_original_flow(self):
+        """Test a 1.0 script: calculate and save, view history, exit"""
+        calculator, output = self.run_script("1", "70", "175", "y", "", "2", "", "5")
+        self.assertEqual(len(calculator.history), 1)
+        self.assertIn("BMI 22.86", output)
+
+    def test_failed_save_is_reported(self):
+        """Test a history write error is shown and the in-memory history is unchanged"""
+        calculator = ConsoleBMICalculator()
+        with mock.patch.object(calculator.profiles.store("default"), 'append',
+                               side_effect=OSError("disk full")), \
+                mock.patch('sys.stdout', io.StringIO()) as stdout:
+            calculator.save_to_history(70, 175, 22.86, "Normal")
+        self.assertIn("Could not save to history: disk full", stdout.getvalue())
+        self.assertNotIn("Saved to history", stdout.getvalue())
+        self.assertEqual((len(calculator.history), len(calculator.time_index)), (0, 0))
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
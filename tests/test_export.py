@@ -0,0 +1,109 @@
+"""
+Tests for streaming history export
+"""
+
+import csv
+import gzip
+import io
+import json
+import os
+import shutil
+import tempfile
+import unittest
+import sys
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from export import detect_export_format, export_history, export_history_file, _log_lines
+from history import HISTORY_FILE
+from profiles import ProfileStore
+
+def entry(date, weight, bmi, category=None):
+    row = {'date': date, 'weight': weight, 'height': 170, 'bmi': bmi, 'unit': 'metric'}
+    if category:
+        row['category'] = category
+    return row
+
+class TestExport(unittest.TestCase):
+    """Test filters, formats and chunked writes"""
+
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.directory = tempfile.mkdtemp()
+        os.chdir(self.directory)
+        self.store = ProfileStore()
+        for row in (entry("2024-01-05 09:00", 50, 17.3, "Underweight"),
+                    entry("2024-02-10 10:30", 70, 24.22, "Normal"),
+                    entry("2024-03-15 18:45", 90, 31.14)):
+            self.store.append("default", row)
+        self.store.append("alice", entry("2024-02-01 08:00", 60, 20.76, "Normal"))
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        shutil.rmtree(self.directory)
+
+    def export(self, **options):
+        output = io.StringIO()
+        stats = export_history(output, store=self.store, **options)
+        return stats, output.getvalue()
+
+    def test_csv_with_filters(self):
+        """Test date and category filters and the CSV layout"""
+        stats, text = self.export(profiles=["default"], start=datetime(2024, 2, 1),
+                                  end=datetime(2024, 4, 1), categories=["obese", "NORMAL"])
+        rows = list(csv.DictReader(io.StringIO(text)))
+        self.assertEqual(stats.entries, 2)
+        self.assertEqual([row['date'] for row in rows], ["2024-02-10 10:30", "2024-03-15 18:45"])
+        # A missing category is derived from the BMI
+        self.assertEqual(rows[1]['category'], "Obese")
+        self.assertEqual(rows[0]['profile'], "default")
+
+    def test_jsonl_all_profiles(self):
+        """Test every profile is exported with its ID added to each entry"""
+        stats, text = self.export(fmt="jsonl")
+        rows = [json.loads(line) for line in text.splitlines()]
+        self.assertEqual(stats.entries, 4)
+        self.assertEqual(sorted(row['profile'] for row in rows), ["alice"] + ["default"] * 3)
+        self.assertEqual(rows[0]['weight'], 60)
+
+    def test_unreadable_lines_are_skipped(self):
+        """Test torn or invalid lines are counted, not exported"""
+        with open(HISTORY_FILE, 'a') as f:
+            f.write('{"date": "2024-05-01 1\n[1, 2]\n\n')
+        stats, text = self.export(profiles=["default"], fmt="jsonl")
+        self.assertEqual((stats.entries, stats.skipped), (3, 2))
+
+    def test_chunks_and_progress(self):
+        """Test entries are written in chunks with progress after each"""
+        seen = []
+        stats, _ = self.export(chunk_entries=2, progress=seen.append)
+        self.assertEqual(seen, [2, 4])
+
+    def test_only_lines_present_at_open(self):
+        """Test appends made during an export are left out"""
+        lines = _log_lines(HISTORY_FILE)
+        first = next(lines)
+        self.store.append("default", entry("2024-06-01 12:00", 80, 27.68))
+        self.assertEqual(len([first] + list(lines)), 3)
+
+    def test_gzip_file(self):
+        """Test .gz names are compressed and written whole"""
+        stats = export_history_file("out.csv.gz", store=self.store, profiles=["alice"])
+        with gzip.open("out.csv.gz", 'rt', encoding='utf-8') as f:
+            self.assertEqual(len(f.read().splitlines()), 2)
+        self.assertEqual(stats.entries, 1)
+        self.assertFalse(os.path.exists("out.csv.gz.tmp"))
+        with self.assertRaises(ValueError):
+            export_history_file("bad.csv", fmt="xml", store=self.store)
+        self.assertEqual(sorted(name for name in os.listdir('.') if name.startswith(('bad', 'out'))),
+                         ["out.csv.gz"])
+
+    def test_detect_export_format(self):
+        """Test format and compression are guessed from the file name"""
+        self.assertEqual(detect_export_format("a.JSONL.gz"), ("jsonl", True))
+        self.assertEqual(detect_export_format("a.csv"), ("csv", False))
+        self.assertEqual(detect_export_format("a.txt"), ("csv", False))
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
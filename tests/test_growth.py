@@ -0,0 +1,179 @@
+"""
+Tests for BMI-for-age z-scores and percentiles
+
+The LMS values here are synthetic, chosen to make results easy to check by
+hand; they are not a growth reference.
+"""
+
+import math
+import os
+import shutil
+import tempfile
+import unittest
+import sys
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import growth
+from growth import (
+    LMSTable, build_table, read_reference_csv, load_table, bmi_z_score, bmi_percentile,
+    classify_bmi_for_age, bmi_for_age_batch, MALE, FEMALE
+)
+from utils import INVALID_CATEGORY
+
+def synthetic_table():
+    """Months 24-36: L = -1 (boys) or 0 (girls), M rising 0.1 a month from 16, S = 0.1"""
+    months = 13
+    return LMSTable(24, months, {
+        MALE: ([-1.0] * months, [16 + 0.1 * i for i in range(months)], [0.1] * months),
+        FEMALE: ([0.0] * months, [16 + 0.1 * i for i in range(months)], [0.1] * months),
+    })
+
+class TestLMS(unittest.TestCase):
+    """Test scalar z-scores, percentiles and categories"""
+
+    def setUp(self):
+        self.table = synthetic_table()
+
+    def test_median_is_fiftieth_percentile(self):
+        """Test the median BMI scores z = 0 at every age, including between months"""
+        self.assertAlmostEqual(bmi_z_score(16.0, 24, MALE, self.table), 0)
+        self.assertAlmostEqual(bmi_z_score(16.05, 24.5, "f", self.table), 0)
+        self.assertAlmostEqual(bmi_percentile(16.6, 30, "male", self.table), 50)
+
+    def test_lms_formula(self):
+        """Test the Box-Cox z-score and its L = 0 limit"""
+        self.assertAlmostEqual(bmi_z_score(20, 24, MALE, self.table), ((20 / 16) ** -1 - 1) / -0.1)
+        self.assertAlmostEqual(bmi_z_score(20, 24, FEMALE, self.table), math.log(20 / 16) / 0.1)
+        self.assertAlmostEqual(bmi_percentile(20, 24, FEMALE, self.table),
+                               100 * growth.NormalDist().cdf(math.log(1.25) / 0.1))
+
+    def test_categories(self):
+        """Test the 5th, 85th and 95th percentile cutoffs"""
+        def bmi_at(z):  # girls: z = log(bmi / 16) / 0.1 at 24 months
+            return 16 * math.exp(0.1 * z)
+        cases = [(-1.7, "Underweight"), (-1.6, "Normal"), (1.0, "Normal"),
+                 (1.1, "Overweight"), (1.6, "Overweight"), (1.7, "Obese")]
+        for z, expected in cases:
+            self.assertEqual(classify_bmi_for_age(bmi_at(z), 24, FEMALE, self.table)[0], expected)
+
+    def test_invalid_input(self):
+        """Test ages outside the reference, unknown sexes and bad BMIs raise ValueError"""
+        for args in ((16, 23.9, MALE), (16, 36.5, MALE), (16, 30, "x"), (0, 30, MALE), (-3, 30, MALE)):
+            with self.assertRaises(ValueError):
+                bmi_z_score(*args, table=self.table)
+
+class TestBatch(unittest.TestCase):
+    """Test batch scoring against the scalar functions"""
+
+    def setUp(self):
+        self.table = synthetic_table()
+        self.bmis = [16.0, 20.0, 13.5, 25.0, 18.0, 16.0, 0.0]
+        self.ages = [24, 30.5, 36, 24, 50, 30, 30]
+        self.sexes = [MALE, FEMALE, MALE, FEMALE, MALE, 3, MALE]
+
+    def check(self, result):
+        self.assertEqual([bool(flag) for flag in result.invalid], [False] * 4 + [True] * 3)
+        for i in range(4):
+            args = (self.bmis[i], self.ages[i], self.sexes[i], self.table)
+            self.assertAlmostEqual(result.z[i], bmi_z_score(*args), places=9)
+            self.assertAlmostEqual(result.percentile[i], bmi_percentile(*args), places=4)
+            self.assertEqual(result.categories()[i], classify_bmi_for_age(*args)[0])
+        self.assertTrue(all(math.isnan(result.z[i]) for i in range(4, 7)))
+        self.assertEqual(list(result.codes[4:]), [INVALID_CATEGORY] * 3)
+
+    def test_numpy(self):
+        """Test the default path matches the scalar functions"""
+        self.check(bmi_for_age_batch(self.bmis, self.ages, self.sexes, self.table))
+
+    def test_pure_python(self):
+        """Test the pure Python path matches the scalar functions"""
+        with mock.patch.object(growth, '_load_numpy', return_value=None):
+            self.check(bmi_for_age_batch(self.bmis, self.ages, self.sexes, self.table))
+
+class TestReferenceTable(unittest.TestCase):
+    """Test building, writing and loading reference tables"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+        growth.set_table(None)
+
+    def write(self, name, text):
+        path = os.path.join(self.directory, name)
+        with open(path, 'w') as f:
+            f.write(text)
+        return path
+
+    def write_bytes(self, name, content):
+        path = os.path.join(self.directory, name)
+        with open(path, 'wb') as f:
+            f.write(content)
+        return path
+
+    def test_build_from_half_month_rows(self):
+        """Test CDC-style half-month rows are interpolated to whole months"""
+        path = self.write("ref.csv", "Sex,Agemos,L,M,S,P50\n"
+                          "1,24,-1,16,0.1,16\n1,24.5,-1,16.2,0.1,16.2\n1,25.5,-1,16.6,0.1,16.6\n"
+                          "2,24,0,15,0.1,15\n2,25.5,0,15.3,0.1,15.3\n")
+        table = build_table(read_reference_csv(path))
+        self.assertEqual((table.first_month, table.months), (24, 2))
+        self.assertAlmostEqual(table.lms(25, MALE)[1], 16.4)
+        self.assertAlmostEqual(table.lms(25, FEMALE)[1], 15.2)
+
+    def test_build_from_cdc_layout(self):
+        """Test a file laid out like the CDC's bmiagerev.csv: both sexes, half-month ages, header repeated"""
+        header = "Sex,Agemos,L,M,S,P3,P5,P10,P25,P50,P75,P85,P90,P95,P97\n"
+        ages = [24] + [24.5 + i for i in range(7)]  # 24, 24.5, 25.5, ..., 30.5
+
+        def rows(sex):
+            # L, M and S linear in age, so whole-month values are known exactly
+            return "".join(f"{sex},{age},{-2 + 0.01 * age / sex:.6f},{15 + 0.1 * age / sex:.6f},"
+                           f"{0.08 + 0.001 * age:.6f}" + ",0" * 10 + "\n" for age in ages)
+        path = self.write("bmiagerev.csv", header + rows(MALE) + header + rows(FEMALE))
+        reference = read_reference_csv(path)
+        self.assertEqual({sex: len(values) for sex, values in reference.items()}, {MALE: 8, FEMALE: 8})
+        table = build_table(reference)
+        self.assertEqual((table.first_month, table.last_month), (24, 30))
+        for month in (24, 27, 30):
+            for sex in (MALE, FEMALE):
+                expected = (-2 + 0.01 * month / sex, 15 + 0.1 * month / sex, 0.08 + 0.001 * month)
+                for value, want in zip(table.lms(month, sex), expected):
+                    self.assertAlmostEqual(value, want, places=6)
+        self.assertAlmostEqual(bmi_z_score(15 + 0.1 * 27 / 2, 27, "female", table), 0, places=5)
+
+    def test_build_from_files_per_sex(self):
+        """Test WHO-style files without a Sex column"""
+        boys = self.write("boys.csv", "Month,L,M,S\n61,-0.7,15.3,0.08\n62,-0.7,15.3,0.08\n")
+        girls = self.write("girls.csv", "Month,L,M,S\n61,-0.9,15.2,0.09\n62,-0.9,15.2,0.09\n")
+        output = os.path.join(self.directory, "lms.bin")
+        with mock.patch('sys.stdout'):
+            growth.main(["--build", boys, girls, "-o", output])
+        table = load_table(output)
+        self.assertEqual((table.first_month, table.last_month), (61, 62))
+        self.assertAlmostEqual(table.lms(61.5, FEMALE)[0], -0.9, places=6)
+
+    def test_file_round_trip(self):
+        """Test the compact file holds the table in float32"""
+        path = os.path.join(self.directory, "lms.bin")
+        with open(path, 'wb') as f:
+            f.write(synthetic_table().to_bytes())
+        self.assertEqual(os.path.getsize(path), 10 + 2 * 3 * 13 * 4)
+        with mock.patch.dict(os.environ, {'BMI_LMS_TABLE': path}):
+            growth.set_table(None)
+            self.assertAlmostEqual(bmi_z_score(16.6, 30, MALE), 0, places=5)
+
+    def test_bad_files(self):
+        """Test missing, foreign and truncated files are reported"""
+        with self.assertRaises(FileNotFoundError):
+            load_table(os.path.join(self.directory, "missing.bin"))
+        data = synthetic_table().to_bytes()
+        for name, content in (("foreign.bin", b"PK\x03\x04" + data[4:]), ("short.bin", data[:-4])):
+            with self.assertRaises(ValueError):
+                load_table(self.write_bytes(name, content))
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,351 @@
+"""
+Tests for history storage
+"""
+
+import json
+import multiprocessing
+import os
+import statistics
+import shutil
+import tempfile
+import unittest
+import sys
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from history import HistoryStore, HistorySummary, TimeIndex, entry_timestamp
+from utils import create_history_entry
+
+def append_worker(path, writer, count):
+    """Append count entries tagged with the writer id (run in a child process)"""
+    store = HistoryStore(path, None)
+    store.load()
+    for seq in range(count):
+        store.append({'date': "2024-03-01 08:00", 'weight': 70, 'height': 175,
+                      'bmi': 22.86, 'unit': 'metric', 'writer': writer, 'seq': seq})
+
+def compact_worker(path, rounds):
+    store = HistoryStore(path, None)
+    for _ in range(rounds):
+        store.load()
+        store.compact()
+
+class TestHistoryStore(unittest.TestCase):
+    """Test the append-only history store"""
+    
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'bmi_history.jsonl')
+        self.legacy_path = os.path.join(self.directory, 'bmi_history.json')
+        self.store = HistoryStore(self.path, self.legacy_path)
+    
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+    
+    def test_append_and_load(self):
+        """Test appended entries are loaded back in order"""
+        entries = [create_history_entry(70 + i, 170, 24.2, "metric") for i in range(3)]
+        for entry in entries:
+            self.store.append(entry)
+        self.assertEqual(HistoryStore(self.path, self.legacy_path).load(), entries)
+    
+    def test_append_writes_one_line(self):
+        """Test each append adds exactly one line"""
+        self.store.append({'bmi': 24.22})
+        self.store.append({'bmi': 25.0})
+        with open(self.path) as f:
+            self.assertEqual(len(f.readlines()), 2)
+    
+    def test_legacy_migration(self):
+        """Test bmi_history.json is migrated on first load"""
+        entries = [{'date': '2025-01-01 10:00', 'bmi': 22.5}]
+        with open(self.legacy_path, 'w') as f:
+            json.dump(entries, f, indent=2)
+        self.assertEqual(self.store.load(), entries)
+        self.assertTrue(os.path.exists(self.path))
+        self.assertFalse(os.path.exists(self.legacy_path))
+        self.assertTrue(os.path.exists(self.legacy_path + '.bak'))
+    
+    def test_torn_line_skipped_and_compacted(self):
+        """Test a partial line is skipped on load and removed by compaction"""
+        self.store.append({'bmi': 24.22})
+        with open(self.path, 'a') as f:
+            f.write('{"bmi": 2')
+        self.store.append({'bmi': 25.0})
+        self.assertEqual(self.store.load(), [{'bmi': 24.22}, {'bmi': 25.0}])
+        self.assertEqual(self.store.skipped_lines, 1)
+        self.store.compact(background=True).join()
+        with open(self.path) as f:
+            self.assertEqual(f.read(), '{"bmi":24.22}\n{"bmi":25.0}\n')
+    
+    def test_clear(self):
+        """Test clearing removes all entries"""
+        self.store.append({'bmi': 24.22})
+        self.store.clear()
+        self.assertEqual(self.store.load(), [])
+
+class TestCrashSafety(unittest.TestCase):
+    """Test journal recovery and concurrent writers"""
+    
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'bmi_history.jsonl')
+        self.store = HistoryStore(self.path, None)
+        self.entries = [create_history_entry(70 + i, 170, 24.2, "metric") for i in range(3)]
+        for entry in self.entries[:2]:
+            self.store.append(entry)
+        self.line = (json.dumps(self.entries[2], separators=(',', ':')) + "\n").encode()
+    
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+    
+    def crash(self, journal, log_tail=b"", legacy=False):
+        """Leave the files as a writer that died mid-append would"""
+        with open(self.store.journal_path, 'wb') as f:
+            if not legacy:
+                f.write(b"%d\n" % os.path.getsize(self.path))
+            f.write(journal)
+        with open(self.path, 'ab') as f:
+            f.write(log_tail)
+    
+    def test_recover_unwritten_entry(self):
+        """Test a journaled entry that never reached the log is appended"""
+        self.crash(self.line)
+        store = HistoryStore(self.path, None)
+        self.assertEqual(store.load(), self.entries)
+        self.assertEqual(store.recovered_entries, 1)
+        self.assertFalse(os.path.exists(store.journal_path))
+    
+    def test_recover_torn_entry(self):
+        """Test a torn append is replaced by the journaled entry"""
+        self.crash(self.line, self.line[:20])
+        store = HistoryStore(self.path, None)
+        self.assertEqual(store.load(), self.entries)
+        self.assertEqual(store.skipped_lines, 0)
+    
+    def test_recover_completed_entry(self):
+        """Test an entry that reached the log is not written twice"""
+        self.crash(self.line, self.line)
+        self.assertEqual(HistoryStore(self.path, None).load(), self.entries)
+    
+    def test_recover_repeated_entry(self):
+        """Test a crashed append identical to the previous entry is still recovered"""
+        line = (json.dumps(self.entries[1], separators=(',', ':')) + "\n").encode()
+        self.crash(line)
+        store = HistoryStore(self.path, None)
+        self.assertEqual(store.load(), self.entries[:2] + self.entries[1:2])
+        self.assertEqual(store.recovered_entries, 1)
+    
+    def test_recover_legacy_journal(self):
+        """Test a journal without an offset, as older versions wrote it, is still finished"""
+        self.crash(self.line, self.line[:20], legacy=True)
+        self.assertEqual(HistoryStore(self.path, None).load(), self.entries)
+    
+    def test_incomplete_journal_is_discarded(self):
+        """Test a journal cut short leaves the log unchanged"""
+        self.crash(self.line[:-5])
+        self.assertEqual(HistoryStore(self.path, None).load(), self.entries[:2])
+        self.assertFalse(os.path.exists(self.store.journal_path))
+    
+    def test_append_recovers_first(self):
+        """Test an append after a crash keeps both entries in order"""
+        self.crash(self.line, self.line[:10])
+        self.store.append(self.entries[0])
+        self.assertEqual(self.store.load(), self.entries + self.entries[:1])
+
+    def test_append_many(self):
+        """Test a batch append writes every entry and keeps the summary in step"""
+        store = HistoryStore(self.path, None)
+        store.load()
+        self.assertEqual(store.append_many(iter(self.entries), chunk_entries=2), 3)
+        self.assertEqual(store.summary.count, 5)
+        reloaded = HistoryStore(self.path, None)
+        self.assertEqual(reloaded.load(), self.entries[:2] + self.entries)
+        self.assertEqual(reloaded.summary.to_dict(), store.summary.to_dict())
+        self.assertFalse(os.path.exists(store.rollback_path))
+
+    def test_append_many_is_all_or_nothing(self):
+        """Test a batch append that fails part way leaves the log unchanged"""
+        store = HistoryStore(self.path, None)
+        store.load()
+        with open(self.path, 'rb') as f:
+            before = f.read()
+
+        def entries():
+            yield from self.entries
+            raise OSError("input went away")
+
+        with self.assertRaises(OSError):
+            store.append_many(entries(), chunk_entries=1)
+        with open(self.path, 'rb') as f:
+            self.assertEqual(f.read(), before)
+        self.assertEqual(store.summary.count, 2)
+
+    def test_unfinished_append_many_is_rolled_back(self):
+        """Test a batch append left behind by a dead writer is undone"""
+        with open(self.store.rollback_path, 'w') as f:
+            f.write(str(os.path.getsize(self.path)))
+        self.crash(b"", self.line * 2 + self.line[:10])
+        store = HistoryStore(self.path, None)
+        self.assertEqual(store.load(), self.entries[:2])
+        self.assertFalse(os.path.exists(store.rollback_path))
+    
+    def test_concurrent_writers(self):
+        """Test several processes appending and compacting lose or tear nothing"""
+        writers, count = 4, 150
+        processes = [multiprocessing.Process(target=append_worker, args=(self.path, writer, count))
+                     for writer in range(writers)]
+        processes.append(multiprocessing.Process(target=compact_worker, args=(self.path, 5)))
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join(60)
+            self.assertEqual(process.exitcode, 0)
+        
+        store = HistoryStore(self.path, None)
+        entries = store.load()[2:]
+        self.assertEqual(store.skipped_lines, 0)
+        self.assertEqual(len(entries), writers * count)
+        self.assertEqual({(entry['writer'], entry['seq']) for entry in entries},
+                         {(writer, seq) for writer in range(writers) for seq in range(count)})
+        for writer in range(writers):
+            self.assertEqual([entry['seq'] for entry in entries if entry['writer'] == writer],
+                             list(range(count)))
+        self.assertEqual(store.summary.count, writers * count + 2)
+
+class TestHistorySummary(unittest.TestCase):
+    """Test the incrementally maintained history statistics"""
+    
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'bmi_history.jsonl')
+        self.entries = [
+            {'date': "2024-03-01 08:00", 'weight': 70, 'height': 175, 'bmi': 22.86, 'unit': 'metric'},
+            {'date': "2024-03-03 08:00", 'weight': 80, 'height': 175, 'bmi': 26.12, 'unit': 'metric'},
+            {'date': "2024-03-04 08:00", 'weight': 72, 'height': 175, 'bmi': 23.51, 'unit': 'metric',
+             'category': 'Normal'},
+        ]
+    
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+    
+    def test_statistics(self):
+        """Test the running statistics match a full recomputation"""
+        summary = HistorySummary.from_entries(self.entries)
+        bmis = [entry['bmi'] for entry in self.entries]
+        self.assertEqual(summary.count, 3)
+        self.assertAlmostEqual(summary.mean, statistics.mean(bmis))
+        self.assertAlmostEqual(summary.variance, statistics.variance(bmis))
+        self.assertEqual((summary.min_bmi, summary.max_bmi), (22.86, 26.12))
+        self.assertAlmostEqual(summary.latest_change, 23.51 - 26.12)
+        self.assertEqual(summary.category_counts, {'Normal': 2, 'Overweight': 1})
+        self.assertEqual(summary.category_seconds, {'Normal': 2 * 86400, 'Overweight': 86400})
+    
+    def test_round_trip(self):
+        """Test a summary survives to_dict/from_dict"""
+        summary = HistorySummary.from_entries(self.entries)
+        restored = HistorySummary.from_dict(json.loads(json.dumps(summary.to_dict())))
+        self.assertEqual(restored.to_dict(), summary.to_dict())
+        self.assertEqual(restored.describe(), summary.describe())
+    
+    def test_store_maintains_summary(self):
+        """Test appends update the persisted summary, which is reused on load"""
+        store = HistoryStore(self.path, None)
+        store.load()
+        for entry in self.entries:
+            store.append(entry)
+        self.assertEqual(store.summary.count, 3)
+        
+        reloaded = HistoryStore(self.path, None)
+        reloaded.load()
+        self.assertEqual(reloaded.summary.to_dict(), store.summary.to_dict())
+        with open(store.summary_path) as f:
+            self.assertEqual(json.load(f)['count'], 3)
+    
+    def test_stale_summary_is_rebuilt(self):
+        """Test a summary that does not match the log is recomputed"""
+        store = HistoryStore(self.path, None)
+        store.load()
+        store.append(self.entries[0])
+        # Written behind the store's back: the saved summary is now stale
+        with open(self.path, 'a') as f:
+            f.write(json.dumps(self.entries[1]) + "\n")
+        reloaded = HistoryStore(self.path, None)
+        reloaded.load()
+        self.assertEqual(reloaded.summary.count, 2)
+    
+    def test_summary_rebuilt_after_log_shrinks(self):
+        """Test a log shrunk by another store, with no matching summary file, is rescanned"""
+        store = HistoryStore(self.path, None)
+        store.load()
+        for entry in self.entries:
+            store.append(entry)
+        # A second store with its own summary file rewrites the log shorter
+        other = HistoryStore(self.path, None, summary_path=os.path.join(self.directory, 'other.json'))
+        other.load()
+        other.clear()
+        other.append(self.entries[1])
+        store.append(self.entries[2])
+        self.assertEqual(store.summary.count, 2)
+        self.assertEqual(store.summary.category_counts, {'Overweight': 1, 'Normal': 1})
+        self.assertEqual(store.summary.to_dict(),
+                         HistorySummary.from_entries(self.entries[1:]).to_dict())
+    
+    def test_clear_resets_summary(self):
+        """Test clearing the history resets the summary"""
+        store = HistoryStore(self.path, None)
+        store.load()
+        store.append(self.entries[0])
+        store.clear()
+        self.assertEqual(store.summary.count, 0)
+        self.assertEqual(HistoryStore(self.path, None).load(), [])
+        # The shorter summary overwrote the old one in place
+        with open(store.summary_path) as f:
+            self.assertEqual(json.load(f)['count'], 0)
+
+class TestTimeIndex(unittest.TestCase):
+    """Test the sorted time index over history entries"""
+    
+    def entry(self, date):
+        return {'date': date, 'weight': 70, 'height': 175, 'bmi': 22.86, 'unit': 'metric'}
+    
+    def epoch(self, date):
+        return datetime.strptime(date, "%Y-%m-%d %H:%M").timestamp()
+    
+    def test_entry_timestamp(self):
+        """Test dates are parsed as local time and bad dates are rejected"""
+        self.assertEqual(entry_timestamp(self.entry("2024-03-05 14:30")), self.epoch("2024-03-05 14:30"))
+        self.assertIsNone(entry_timestamp(self.entry("yesterday")))
+        self.assertIsNone(entry_timestamp(self.entry("2024-13-05 14:30")))
+        self.assertIsNone(entry_timestamp({'bmi': 22.0}))
+    
+    def test_range_query(self):
+        """Test between returns positions in time order with an exclusive end"""
+        dates = ["2024-01-10 09:00", "2024-03-01 00:00", "2024-03-15 12:00",
+                 "2024-03-31 23:59", "2024-04-01 00:00"]
+        index = TimeIndex(self.entry(date) for date in dates)
+        start, end = self.epoch("2024-03-01 00:00"), self.epoch("2024-04-01 00:00")
+        self.assertEqual(index.between(start, end), [1, 2, 3])
+        self.assertEqual(index.count_between(start, end), 3)
+        self.assertEqual(index.between(None, start), [0])
+        self.assertEqual(index.between(end), [4])
+        self.assertEqual(index.between(end, start), [])
+    
+    def test_add_keeps_order(self):
+        """Test appended entries are indexed even when out of order"""
+        history = [self.entry("2024-03-01 10:00"), self.entry("2024-03-03 10:00")]
+        index = TimeIndex(history)
+        for entry in (self.entry("2024-03-04 10:00"), self.entry("2024-03-02 10:00"), self.entry("bad")):
+            history.append(entry)
+            index.add(entry, len(history) - 1)
+        self.assertEqual(len(index), 4)
+        self.assertEqual(index.between(), [0, 3, 1, 2])
+    
+    def test_unsorted_load(self):
+        """Test an unsorted history is sorted when the index is built"""
+        index = TimeIndex([self.entry("2024-05-01 08:00"), self.entry("2024-01-01 08:00")])
+        self.assertEqual(index.between(), [1, 0])
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
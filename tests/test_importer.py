@@ -0,0 +1,108 @@
+"""
+Tests for bulk history import
+"""
+
+import io
+import json
+import os
+import shutil
+import tempfile
+import unittest
+import sys
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import utils
+from importer import import_entries, import_history
+from bulk import read_rows
+from profiles import ProfileStore
+from utils import calculate_bmi
+
+CSV = """date,weight,height,unit,pounds,inches
+2024-01-05 09:00,70,175,metric,,
+2024-01-06T10:30,154.32,5,imperial,,9
+2024-01-07,11,5.5,stones,0,
+2024-01-08 10:00,900,175,metric,,
+2024-01-09 10:00,abc,,metric,,
+2024-02-30 10:00,70,175,metric,,
+2024-01-10 10:00,70,175,kelvin,,
+"""
+
+class TestImportEntries(unittest.TestCase):
+    """Test batched validation, scoring and the reject report"""
+
+    def run_import(self, text, fmt="csv", batch_rows=3):
+        rejects = io.StringIO()
+        counts = [0, 0]
+        entries = list(import_entries(read_rows(io.StringIO(text), fmt), rejects, batch_rows, counts))
+        return entries, [json.loads(line) for line in rejects.getvalue().splitlines()], counts
+
+    def test_valid_rows_become_entries(self):
+        """Test rows in every unit are converted to kg/cm and scored"""
+        entries, _, counts = self.run_import(CSV)
+        self.assertEqual(counts, [3, 4])
+        self.assertEqual(entries[0], {'date': "2024-01-05 09:00", 'weight': 70.0, 'height': 175.0,
+                                      'bmi': calculate_bmi(70, 175), 'unit': "metric",
+                                      'category': "Normal"})
+        self.assertEqual([entry['date'] for entry in entries[1:]],
+                         ["2024-01-06 10:30", "2024-01-07 00:00"])
+        self.assertAlmostEqual(entries[1]['height'], 175.26, places=2)
+        self.assertAlmostEqual(entries[2]['weight'], 69.85, places=2)
+        self.assertEqual(entries[2]['unit'], "imperial")
+
+    def test_reject_report(self):
+        """Test rejected rows are reported with their line, reasons and row"""
+        _, rejects, _ = self.run_import(CSV)
+        self.assertEqual([(reject['line'], reject['reasons']) for reject in rejects], [
+            (5, ['weight_out_of_range']),
+            (6, ['invalid_weight', 'missing_height']),
+            (7, ['invalid_date']),
+            (8, ['invalid_unit']),
+        ])
+        self.assertEqual(rejects[0]['row']['weight'], "900")
+        self.assertIn("Weight out of range", rejects[0]['error'])
+
+    def test_jsonl_rows(self):
+        """Test unparseable JSONL lines and non-objects are rejected"""
+        text = '{"weight": 70, "height": 175}\n{"weight": \n[1]\n'
+        entries, rejects, _ = self.run_import(text, "jsonl")
+        self.assertEqual(len(entries), 1)
+        self.assertEqual([reject['reasons'] for reject in rejects], [['invalid_json'], ['not_an_object']])
+        self.assertNotIn('row', rejects[0])
+
+    def test_without_numpy(self):
+        """Test the pure Python batch path gives the same entries"""
+        expected, _, _ = self.run_import(CSV)
+        with mock.patch.object(utils, '_load_numpy', return_value=None):
+            entries, _, _ = self.run_import(CSV)
+        self.assertEqual(entries, expected)
+
+class TestImportHistory(unittest.TestCase):
+    """Test imports into profile histories"""
+
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.directory = tempfile.mkdtemp()
+        os.chdir(self.directory)
+        self.store = ProfileStore()
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        shutil.rmtree(self.directory)
+
+    def test_import_into_loaded_profile(self):
+        """Test imported entries follow existing ones and a cached profile is reloaded"""
+        self.store.append("alice", {'date': "2023-12-31 08:00", 'weight': 60, 'height': 165,
+                                    'bmi': 22.04, 'unit': 'metric', 'category': 'Normal'})
+        self.store.load("alice")
+        stats = import_history(io.StringIO(CSV), profile="alice", store=self.store)
+        self.assertEqual((stats.imported, stats.rejected), (3, 4))
+        self.assertNotIn("alice", self.store.cached_profiles())
+        entries = self.store.load("alice")
+        self.assertEqual([entry['date'][:10] for entry in entries],
+                         ["2023-12-31", "2024-01-05", "2024-01-06", "2024-01-07"])
+        self.assertEqual(self.store.store("alice").summary.count, 4)
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
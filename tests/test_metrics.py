@@ -0,0 +1,91 @@
+"""
+Tests for opt-in instrumentation
+"""
+
+import os
+import shutil
+import tempfile
+import time
+import unittest
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import metrics
+
+class TestMetrics(unittest.TestCase):
+    """Test counters, histograms and snapshots"""
+
+    def setUp(self):
+        self.was_enabled = metrics.enabled()
+        metrics.enable()
+        metrics.reset()
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'metrics.jsonl')
+
+    def tearDown(self):
+        metrics.stop_snapshots()
+        if not self.was_enabled:
+            metrics.disable()
+        shutil.rmtree(self.directory)
+
+    def test_disabled_decorator_returns_function(self):
+        """Test functions decorated while disabled are not wrapped at all"""
+        metrics.disable()
+        double = lambda x: x * 2
+        self.assertIs(metrics.timed('test.off')(double), double)
+        metrics.count('test.off')
+        self.assertNotIn('test.off', metrics.snapshot()['counters'])
+
+    def test_timed_records_calls(self):
+        """Test a timed function counts calls and latencies, errors included"""
+        @metrics.timed('test.sleep')
+        def sleep(seconds):
+            time.sleep(seconds)
+            if seconds > 0.002:
+                raise ValueError("slow")
+        sleep(0)
+        with self.assertRaises(ValueError):
+            sleep(0.004)
+        latency = metrics.histogram('test.sleep')
+        self.assertEqual(latency.count, 2)
+        self.assertGreaterEqual(latency.max, 0.004)
+        self.assertLessEqual(latency.percentile(0.5), latency.percentile(0.99))
+        metrics.disable()
+        sleep(0)
+        self.assertEqual(latency.count, 2)
+
+    def test_counters_and_reset(self):
+        """Test counters add up and reset zeroes them"""
+        metrics.count('test.bytes', 100)
+        metrics.count('test.bytes', 20)
+        self.assertEqual(metrics.snapshot()['counters']['test.bytes'], 120)
+        metrics.reset()
+        self.assertEqual(metrics.snapshot()['counters']['test.bytes'], 0)
+
+    def test_snapshot_file(self):
+        """Test snapshots append as JSON lines and rotate past the size limit"""
+        metrics.count('test.saved', 3)
+        metrics.histogram('test.latency').observe(0.0015)
+        metrics.write_snapshot(self.path)
+        metrics.write_snapshot(self.path)
+        snapshots = metrics.read_snapshots(self.path)
+        self.assertEqual(len(snapshots), 2)
+        self.assertEqual(snapshots[-1]['counters']['test.saved'], 3)
+        self.assertEqual(snapshots[-1]['histograms']['test.latency']['buckets'], {'2048': 1})
+
+        with open(self.path, 'a') as f:
+            f.write(" " * metrics.MAX_SNAPSHOT_BYTES)
+        metrics.write_snapshot(self.path)
+        self.assertTrue(os.path.exists(self.path + '.1'))
+        self.assertEqual(len(metrics.read_snapshots(self.path)), 1)
+
+    def test_periodic_snapshots(self):
+        """Test the snapshot thread writes periodically and once more on stop"""
+        self.assertIsNotNone(metrics.start_snapshots(self.path, interval=0.01))
+        time.sleep(0.1)
+        metrics.stop_snapshots()
+        self.assertGreaterEqual(len(metrics.read_snapshots(self.path)), 2)
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
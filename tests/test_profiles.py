@@ -0,0 +1,138 @@
+"""
+Tests for per-profile history storage
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from history import HISTORY_FILE
+from profiles import ProfileStore, DEFAULT_PROFILE, normalize_profile_id
+from utils import calculate_bmi, create_history_entry, get_bmi_category
+
+class TestProfileStore(unittest.TestCase):
+    """Test sharded profile histories and the LRU cache"""
+
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.directory = tempfile.mkdtemp()
+        os.chdir(self.directory)
+        self.store = ProfileStore('profiles', max_entries=10)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        shutil.rmtree(self.directory)
+
+    def fill(self, profile, count):
+        for i in range(count):
+            self.store.append(profile, create_history_entry(60 + i, 170, 20.76, "metric"))
+
+    def test_profile_ids(self):
+        """Test IDs are case-insensitive and cannot escape the profile directory"""
+        self.assertEqual(normalize_profile_id(" Patient-42 "), "patient-42")
+        for bad in ("", "../etc", "a/b", ".hidden", "x" * 65):
+            with self.assertRaises(ValueError):
+                normalize_profile_id(bad)
+
+    def test_sharded_paths(self):
+        """Test profiles live in shard directories and default keeps the old file"""
+        self.assertEqual(self.store.path(DEFAULT_PROFILE), HISTORY_FILE)
+        path = self.store.path("alice")
+        self.assertEqual(os.path.basename(path), "alice.jsonl")
+        self.assertRegex(os.path.basename(os.path.dirname(path)), r'^[0-9a-f]{2}$')
+
+    def test_custom_root_holds_default_profile(self):
+        """Test a store with its own root keeps the default profile there, not in the working directory"""
+        import io
+        from export import export_history
+        from importer import import_history
+        root = os.path.join(self.directory, "elsewhere")
+        store = ProfileStore(root)
+        self.assertEqual(store.path(DEFAULT_PROFILE), os.path.join(root, HISTORY_FILE))
+        stats = import_history(io.StringIO("weight,height\n70,175\n"), store=store)
+        self.assertEqual(stats.imported, 1)
+        self.assertEqual(os.listdir(self.directory), ["elsewhere"])
+        self.assertEqual(store.profiles(), [DEFAULT_PROFILE])
+        output = io.StringIO()
+        self.assertEqual(export_history(output, fmt="jsonl", store=ProfileStore(root)).entries, 1)
+
+    def test_profiles_are_separate(self):
+        """Test each profile has its own entries and appears in profiles()"""
+        self.fill("alice", 2)
+        self.fill("bob", 3)
+        self.assertEqual(len(self.store.load("alice")), 2)
+        self.assertEqual(len(self.store.load("bob")), 3)
+        self.assertEqual(self.store.profiles(), ["alice", "bob"])
+        self.assertEqual(len(ProfileStore('profiles').load("Alice")), 2)
+
+    def test_cache_hits_and_live_list(self):
+        """Test a loaded profile is served from memory and kept up to date"""
+        entries = self.store.load("alice")
+        self.fill("alice", 2)
+        self.assertIs(self.store.load("alice"), entries)
+        self.assertEqual(len(entries), 2)
+        self.assertEqual((self.store.hits, self.store.misses), (1, 1))
+        self.store.clear("alice")
+        self.assertEqual(entries, [])
+        self.assertEqual(self.store.cached_entries(), 0)
+
+    def test_failed_write_leaves_cache_unchanged(self):
+        """Test an append that fails on disk is not added to the cached entries"""
+        entries = self.store.load("alice")
+        self.fill("alice", 1)
+        store = self.store.store("alice")
+        with mock.patch.object(store, 'append', side_effect=OSError("No space left on device")):
+            with self.assertRaises(OSError):
+                self.fill("alice", 1)
+        self.assertEqual(len(entries), 1)
+        self.assertEqual(self.store.cached_entries(), 1)
+
+    def test_lru_eviction_by_entries(self):
+        """Test the least recently used profiles are evicted past max_entries"""
+        for profile in ("a1", "b2", "c3"):
+            self.fill(profile, 4)
+        for profile in ("a1", "b2", "c3"):
+            self.store.load(profile)
+        self.assertEqual(self.store.cached_profiles(), ["b2", "c3"])
+        self.assertEqual(self.store.cached_entries(), 8)
+        self.store.load("b2")
+        self.store.load("a1")
+        self.assertEqual(self.store.cached_profiles(), ["b2", "a1"])
+
+    def test_current_profile_is_never_evicted(self):
+        """Test a profile larger than the cache stays loaded while it is current"""
+        self.fill("big", 15)
+        entries = self.store.load("big")
+        self.fill("big", 1)
+        self.assertEqual(self.store.cached_profiles(), ["big"])
+        self.assertEqual(len(entries), 16)
+
+    def test_lru_eviction_by_bytes(self):
+        """Test max_bytes bounds the estimated memory of cached entries"""
+        store = ProfileStore('profiles', max_entries=1000, max_bytes=1)
+        for profile in ("a1", "b2"):
+            self.fill(profile, 3)
+            store.load(profile)
+        self.assertEqual(store.cached_profiles(), ["b2"])
+        self.assertGreater(store.cached_bytes(), 0)
+
+    def test_saved_category_follows_scheme(self):
+        """Test the console saves the category shown under a non-default scheme"""
+        from bmi_console import ConsoleBMICalculator
+        for scheme, weight, height, expected in (("who_asian", 70, 170, "Overweight"),
+                                                 ("who_classes", 120, 170, "Obese Class III")):
+            calculator = ConsoleBMICalculator("alice")
+            calculator.scheme = scheme
+            bmi = calculate_bmi(weight, height)
+            category, _ = get_bmi_category(bmi, scheme)
+            self.assertEqual(category, expected)
+            calculator.save_to_history(weight, height, bmi, category)
+            self.assertEqual(ProfileStore().load("alice")[-1]['category'], expected)
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
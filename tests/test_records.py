@@ -0,0 +1,71 @@
+"""
+Tests for compact history records
+"""
+
+import json
+import os
+import unittest
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from records import HistoryRecord, json_default, parse_date, to_record
+from utils import create_history_entry
+
+class TestHistoryRecord(unittest.TestCase):
+    """Test records read and serialize like the JSON entries they replace"""
+
+    def setUp(self):
+        self.entry = create_history_entry(70, 175, 22.86, "metric")
+
+    def test_round_trip(self):
+        """Test a record equals its entry and serializes back to it"""
+        record = HistoryRecord.from_dict(self.entry)
+        self.assertEqual(dict(record), self.entry)
+        self.assertEqual(record.to_dict(), self.entry)
+        self.assertEqual(json.loads(json.dumps(record, default=json_default)), self.entry)
+        self.assertEqual(record.get('category'), self.entry['category'])
+
+    def test_extra_and_unknown_values_are_kept(self):
+        """Test keys and units/categories the record does not know survive"""
+        entry = dict(self.entry, unit="stone", category="Custom", note="after lunch")
+        record = HistoryRecord.from_dict(entry)
+        self.assertEqual(record.to_dict(), entry)
+        self.assertEqual(len(record), 7)
+        self.assertEqual(record['note'], "after lunch")
+
+    def test_missing_category_is_derived(self):
+        """Test old entries without a category get the BMI's category"""
+        entry = dict(self.entry)
+        del entry['category']
+        self.assertEqual(HistoryRecord.from_dict(entry)['category'], self.entry['category'])
+
+    def test_category_from_scheme(self):
+        """Test new entries take their category from the scheme in use"""
+        self.assertEqual(HistoryRecord.create(70, 170, 24.22, "metric", "who_asian")['category'], "Overweight")
+        self.assertEqual(HistoryRecord.create(70, 170, 24.22, "metric")['category'], "Normal")
+        self.assertEqual(create_history_entry(120, 170, 41.52, "metric", "who_classes")['category'],
+                         "Obese Class III")
+
+    def test_invalid_entries_are_left_alone(self):
+        """Test to_record returns entries it cannot convert unchanged"""
+        for entry in ({'weight': 70}, dict(self.entry, date="yesterday"), "text"):
+            self.assertIs(to_record(entry), entry)
+
+    def test_parse_date(self):
+        """Test the fast path agrees with strptime"""
+        from datetime import datetime
+        for date in ("2024-03-01 00:00", "2024-12-31 23:59", self.entry['date']):
+            self.assertEqual(parse_date(date),
+                             int(datetime.strptime(date, "%Y-%m-%d %H:%M").timestamp()))
+        with self.assertRaises(ValueError):
+            parse_date("2024-03-01 12:60")
+
+    def test_smaller_than_dict(self):
+        """Test a record uses less memory than the dict entry"""
+        record = HistoryRecord.from_dict(self.entry)
+        dict_size = sys.getsizeof(self.entry) + sum(sys.getsizeof(v) for v in self.entry.values())
+        self.assertLess(record.memory_size(), dict_size)
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
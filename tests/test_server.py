@@ -0,0 +1,146 @@
+"""
+Tests for the HTTP scoring service
+"""
+
+import asyncio
+import json
+import os
+import unittest
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from server import BMIServer
+
+async def read_response(reader):
+    """Read one response; returns (status, headers, body) with chunked bodies decoded"""
+    head = await reader.readuntil(b"\r\n\r\n")
+    lines = head.decode("latin-1").split("\r\n")
+    status = int(lines[0].split(" ")[1])
+    headers = {name.lower(): value.strip() for name, _, value in
+               (line.partition(":") for line in lines[1:] if line)}
+    if headers.get("transfer-encoding") == "chunked":
+        body = b""
+        while True:
+            size = int(await reader.readuntil(b"\r\n"), 16)
+            body += (await reader.readexactly(size + 2))[:-2]
+            if size == 0:
+                break
+    else:
+        body = await reader.readexactly(int(headers["content-length"]))
+    return status, headers, body
+
+class TestBMIServer(unittest.TestCase):
+    """Test the asyncio HTTP server over real sockets"""
+
+    def run_client(self, client, **options):
+        async def run():
+            server = BMIServer(port=0, **options)
+            await server.start()
+            reader, writer = await asyncio.open_connection(server.host, server.port)
+            try:
+                return await client(reader, writer)
+            finally:
+                writer.close()
+                await server.close()
+        return asyncio.run(run())
+
+    def request(self, raw):
+        async def client(reader, writer):
+            writer.write(raw)
+            return await read_response(reader)
+        return self.run_client(client)
+
+    def test_single_bmi(self):
+        """Test the single-record endpoint matches utils"""
+        status, _, body = self.request(b"GET /bmi?weight=70&height=175 HTTP/1.1\r\n\r\n")
+        self.assertEqual(status, 200)
+        self.assertEqual(json.loads(body), {"bmi": 22.86, "category": "Normal", "color": "#7ED321"})
+
+    def test_scheme_parameter(self):
+        """Test the classification scheme can be chosen per request"""
+        status, _, body = self.request(b"GET /category?bmi=24&scheme=who_asian HTTP/1.1\r\n\r\n")
+        self.assertEqual(status, 200)
+        self.assertEqual(json.loads(body)["category"], "Overweight")
+
+    def test_conversion(self):
+        """Test the conversion endpoints"""
+        status, _, body = self.request(b"GET /convert/kg_to_lbs?value=70 HTTP/1.1\r\n\r\n")
+        self.assertEqual(status, 200)
+        self.assertAlmostEqual(json.loads(body)["value"], 154.32, places=2)
+
+    def test_errors(self):
+        """Test bad requests get JSON errors with the right status"""
+        self.assertEqual(self.request(b"GET /bmi?weight=70 HTTP/1.1\r\n\r\n")[0], 400)
+        self.assertEqual(self.request(b"GET /bmi?weight=70&height=0 HTTP/1.1\r\n\r\n")[0], 400)
+        self.assertEqual(self.request(b"GET /nope HTTP/1.1\r\n\r\n")[0], 404)
+        self.assertEqual(self.request(b"GET /batch HTTP/1.1\r\n\r\n")[0], 405)
+        self.assertEqual(self.request(b"POST /batch HTTP/1.1\r\n\r\n")[0], 411)
+
+    def test_non_finite_numbers(self):
+        """Test nan and inf parameters are rejected instead of scored"""
+        for query in (b"/bmi?weight=nan&height=170", b"/bmi?weight=70&height=inf",
+                      b"/category?bmi=NaN", b"/category?bmi=-inf",
+                      b"/convert/kg_to_lbs?value=inf", b"/convert/feet_inches_to_cm?feet=nan&inches=0",
+                      b"/convert/feet_inches_to_cm?feet=inf&inches=0"):
+            status, _, body = self.request(b"GET %s HTTP/1.1\r\n\r\n" % query)
+            self.assertEqual(status, 400, query)
+            self.assertIn("Invalid number", json.loads(body)["error"])
+
+    def test_batch_content_length(self):
+        """Test batch rows are scored in order with per-line errors"""
+        body = b'{"weight": 70, "height": 175}\nnot json\n{"weight": 150, "height": 5.9, "unit": "imperial"}'
+        status, headers, response = self.request(
+            b"POST /batch HTTP/1.1\r\nContent-Length: %d\r\n\r\n%s" % (len(body), body))
+        self.assertEqual(status, 200)
+        self.assertEqual(headers["content-type"], "application/x-ndjson")
+        results = [json.loads(line) for line in response.splitlines()]
+        self.assertEqual(len(results), 3)
+        self.assertEqual(results[0]["bmi"], 22.86)
+        self.assertEqual(results[1]["line"], 2)
+        self.assertIn("error", results[1])
+        self.assertEqual(results[2]["category"], "Normal")
+
+    def test_batch_chunked_request(self):
+        """Test a chunked request body split inside a record"""
+        raw = (b"POST /batch HTTP/1.1\r\nTransfer-Encoding: chunked\r\n\r\n"
+               b"5\r\n{\"wei\r\n16\r\nght\":70,\"height\":175}\n\r\n0\r\n\r\n")
+        status, _, response = self.request(raw)
+        self.assertEqual(status, 200)
+        self.assertEqual(json.loads(response)["bmi"], 22.86)
+
+    def test_batch_oversized_chunk_size_line(self):
+        """Test an overlong chunk-size line ends the chunked response with an error line"""
+        async def client(reader, writer):
+            writer.write(b"POST /batch HTTP/1.1\r\nTransfer-Encoding: chunked\r\n\r\n"
+                         + b"0" * (70 * 1024) + b"5\r\n")
+            response = await read_response(reader)
+            return response, await reader.read()
+        (status, _, body), rest = self.run_client(client)
+        self.assertEqual(status, 200)
+        self.assertEqual(json.loads(body), {"error": "Chunk size line too long"})
+        self.assertEqual(rest, b"")
+
+    def test_keep_alive(self):
+        """Test several requests are served over one connection"""
+        async def client(reader, writer):
+            statuses = []
+            for weight in (60, 70, 80):
+                writer.write(b"GET /bmi?weight=%d&height=175 HTTP/1.1\r\n\r\n" % weight)
+                status, headers, _ = await read_response(reader)
+                statuses.append((status, headers["connection"]))
+            writer.write(b"GET /health HTTP/1.1\r\nConnection: close\r\n\r\n")
+            await read_response(reader)
+            statuses.append(await reader.read())
+            return statuses
+        self.assertEqual(self.run_client(client), [(200, "keep-alive")] * 3 + [b""])
+
+    def test_pipelined_requests_with_limit(self):
+        """Test pipelined requests all complete under a concurrency limit of one"""
+        async def client(reader, writer):
+            writer.write(b"GET /health HTTP/1.1\r\n\r\n" * 5)
+            return [(await read_response(reader))[0] for _ in range(5)]
+        self.assertEqual(self.run_client(client, max_concurrency=1), [200] * 5)
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,128 @@
+"""
+Tests for the headless GUI view-model
+"""
+
+import os
+import unittest
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from classification import get_scheme
+from utils import calculate_bmi, format_height_display, format_healthy_weight, format_weight_display
+from viewmodel import BMIViewModel, DependencyGraph
+
+class TestDependencyGraph(unittest.TestCase):
+    """Test propagation order, batching and change detection"""
+
+    def setUp(self):
+        self.graph = DependencyGraph()
+        self.graph.source('a', 1)
+        self.graph.source('b', 2)
+        self.graph.computed('total', ('a', 'b'), lambda a, b: a + b)
+        self.graph.computed('parity', ('total',), lambda total: total % 2)
+        self.seen = []
+        self.graph.bind('total', lambda value: self.seen.append(('total', value)), initial=False)
+        self.graph.bind('parity', lambda value: self.seen.append(('parity', value)), initial=False)
+
+    def test_propagates_in_dependency_order(self):
+        """Test a source change reaches every dependent once"""
+        self.graph.set('a', 2)
+        self.assertEqual(self.seen, [('total', 4), ('parity', 0)])
+        self.assertEqual(self.graph['parity'], 0)
+
+    def test_unchanged_values_stop_propagation(self):
+        """Test nodes whose value did not change do not notify or recompute dependents"""
+        self.graph.set('a', 1)
+        self.graph.update(a=3, b=0)
+        self.assertEqual(self.seen, [])
+        self.assertEqual(self.graph.stats['recomputes'], 1)
+
+    def test_batch_propagates_once(self):
+        """Test several changes in a batch give one propagation"""
+        with self.graph.batch():
+            for value in range(10):
+                self.graph.set('a', value)
+            self.assertEqual(self.seen, [])
+        # parity is recomputed but still 1, so only total notifies
+        self.assertEqual(self.seen, [('total', 11)])
+        self.assertEqual((self.graph.stats['flushes'], self.graph.stats['recomputes']), (1, 2))
+
+    def test_scheduled_propagation(self):
+        """Test a schedule function defers propagation to a single flush"""
+        pending = []
+        graph = DependencyGraph(schedule=pending.append)
+        graph.source('a', 1)
+        graph.computed('double', ('a',), lambda a: a * 2)
+        graph.set('a', 2)
+        graph.set('a', 3)
+        self.assertEqual((len(pending), graph['double']), (1, 2))
+        pending.pop()()
+        self.assertEqual(graph['double'], 6)
+
+    def test_invalid_nodes(self):
+        """Test only sources can be set and inputs must exist"""
+        with self.assertRaises(KeyError):
+            self.graph.set('total', 5)
+        with self.assertRaises(KeyError):
+            self.graph.computed('bad', ('missing',), lambda x: x)
+        with self.assertRaises(ValueError):
+            self.graph.source('a', 0)
+
+class TestBMIViewModel(unittest.TestCase):
+    """Test the calculator state matches the scalar functions"""
+
+    def setUp(self):
+        self.view = BMIViewModel()
+        self.labels = {}
+        for name in ('bmi_text', 'category_label', 'height_label', 'weight_label', 'unit_label',
+                     'band_label'):
+            self.view.bind(name, lambda value, name=name: self.labels.__setitem__(name, value))
+
+    def test_initial_state(self):
+        """Test outputs are computed for the initial inputs"""
+        self.assertEqual(self.view['bmi'], calculate_bmi(65, 170))
+        self.assertEqual(self.labels['bmi_text'], str(calculate_bmi(65, 170)))
+        self.assertEqual(self.labels['category_label'], "Normal (#7ED321)")
+        self.assertEqual(self.labels['height_label'], "1.70m")
+        self.assertEqual(self.labels['unit_label'], "Metric")
+        self.assertEqual(self.labels['band_label'], "Healthy weight: 53.5 - 72.2kg")
+
+    def test_inputs_update_outputs(self):
+        """Test slider and weight steps update BMI and labels"""
+        self.view.set_height(180.7)
+        for _ in range(3):
+            self.view.step_weight(0.1)
+        self.view.step_weight(30)
+        self.assertEqual(self.view['height'], 180)
+        self.assertEqual(self.view['bmi'], calculate_bmi(65.3 + 30, 180))
+        self.assertEqual(self.labels['weight_label'], "95.3kg")
+        self.assertEqual(self.labels['category_label'], "Overweight (#F5A623)")
+        self.assertEqual(self.labels['band_label'], format_healthy_weight(180))
+
+    def test_unit_toggle_only_relabels(self):
+        """Test a unit toggle recomputes labels but not the BMI"""
+        recomputes = self.view.stats['recomputes']
+        self.view.toggle_unit()
+        self.assertEqual(self.view.stats['recomputes'] - recomputes, 4)
+        self.assertEqual(self.labels['unit_label'], "Imperial")
+        self.assertEqual(self.labels['band_label'], format_healthy_weight(170, "imperial"))
+        self.assertEqual(self.labels['height_label'], format_height_display(170, "imperial"))
+        self.assertEqual(self.labels['weight_label'], format_weight_display(65, "imperial"))
+
+    def test_slider_jitter_does_not_notify(self):
+        """Test slider positions within the same centimeter change nothing"""
+        notifications = self.view.stats['notifications']
+        for position in (170.1, 170.5, 170.9):
+            self.view.set_height(position)
+        self.assertEqual(self.view.stats['notifications'], notifications)
+
+    def test_scheme_and_invalid_height(self):
+        """Test the scheme's labels are used and a zero height clears the result"""
+        view = BMIViewModel(height=170, weight=70, scheme=get_scheme("who_asian"))
+        self.assertEqual(view['category_label'], "Overweight (#F5A623)")
+        view.set('height', 0)
+        self.assertEqual((view['bmi'], view['bmi_text'], view['category_label']), (None, "0.0", ""))
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
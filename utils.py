@@ -2,10 +2,36 @@
 Utility functions for BMI Calculator Pro
 """
 
-import re
-from typing import Tuple, Optional, Dict, Any
+import math
+from array import array
+from bisect import bisect_right
+from typing import Tuple, Optional, Dict, Any, NamedTuple
 from datetime import datetime
 
+from classification import CutoffScheme, WHO_ADULT, get_scheme
+from metrics import timed
+
+# Default (WHO adult) category table shared by the scalar and batch code
+# paths: the index into BMI_CATEGORIES is the category code, BMI_CUTOFFS are
+# the lower bounds of codes 1..3.
+BMI_CATEGORIES = WHO_ADULT.categories
+BMI_CUTOFFS = WHO_ADULT.cutoffs
+INVALID_CATEGORY = -1
+
+_numpy = None
+
+def _load_numpy():
+    """Import NumPy on first use; returns None when it is not installed"""
+    global _numpy
+    if _numpy is None:
+        try:
+            import numpy
+            _numpy = numpy
+        except ImportError:
+            _numpy = False
+    return _numpy or None
+
+@timed('bmi.calculate')
 def calculate_bmi(weight_kg: float, height_cm: float) -> float:
     """
     Calculate BMI given weight in kg and height in cm
@@ -27,24 +53,150 @@ def calculate_bmi(weight_kg: float, height_cm: float) -> float:
     bmi = weight_kg / (height_m ** 2)
     return round(bmi, 2)
 
-def get_bmi_category(bmi: float) -> Tuple[str, str]:
+def get_bmi_category(bmi: float, scheme: Optional[str] = None) -> Tuple[str, str]:
     """
     Get BMI category and color based on BMI value
     
     Args:
         bmi: BMI value
+        scheme: Classification scheme key (see classification.SCHEMES),
+                WHO adult cutoffs if None
         
     Returns:
         Tuple of (category_name, color_hex)
     """
-    if bmi < 18.5:
-        return "Underweight", "#4A90E2"  # Blue
-    elif bmi < 25:
-        return "Normal", "#7ED321"  # Green
-    elif bmi < 30:
-        return "Overweight", "#F5A623"  # Orange
-    else:
-        return "Obese", "#D0021B"  # Red
+    if scheme is None:
+        return BMI_CATEGORIES[bisect_right(BMI_CUTOFFS, bmi)]
+    return get_scheme(scheme).classify(bmi)
+
+class BatchResult(NamedTuple):
+    """
+    Result of calculate_bmi_batch
+
+    Attributes:
+        bmi: BMI per row, NaN where the row is invalid
+        codes: Index into scheme.categories per row, INVALID_CATEGORY where invalid
+        invalid: Per-row mask, true where calculate_bmi would raise ValueError
+        scheme: Classification scheme the codes refer to
+    """
+    bmi: Any
+    codes: Any
+    invalid: Any
+    scheme: CutoffScheme = WHO_ADULT
+
+    def categories(self) -> list:
+        """Category names per row ("" for invalid rows)"""
+        names = [name for name, _ in self.scheme.categories] + [""]
+        return [names[code] for code in self.codes]
+
+    def colors(self) -> list:
+        """Category colors per row ("" for invalid rows)"""
+        colors = [color for _, color in self.scheme.categories] + [""]
+        return [colors[code] for code in self.codes]
+
+def _output_view(np, buffer, dtype, n: int, name: str):
+    """Wrap a caller-provided output buffer as a writable array without copying"""
+    view = buffer if isinstance(buffer, np.ndarray) else np.frombuffer(buffer, dtype=dtype)
+    if view.dtype != dtype or view.shape != (n,):
+        raise ValueError(f"{name} must be a 1-d {np.dtype(dtype).name} buffer of length {n}")
+    return view
+
+def _calculate_bmi_batch_numpy(np, weights, heights, out_bmi, out_codes, scheme) -> BatchResult:
+    w = np.asarray(weights, dtype=np.float64)
+    h = np.asarray(heights, dtype=np.float64)
+    if w.shape != h.shape or w.ndim != 1:
+        raise ValueError("weights and heights must be 1-d and of equal length")
+    n = len(w)
+    bmi = np.empty(n) if out_bmi is None else _output_view(np, out_bmi, np.float64, n, "out_bmi")
+    codes = (np.empty(n, dtype=np.int8) if out_codes is None
+             else _output_view(np, out_codes, np.int8, n, "out_codes"))
+
+    invalid = h <= 0
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        height_m = h / 100
+        np.divide(w, height_m * height_m, out=bmi)
+        scaled = bmi * 100
+        rounded = np.rint(scaled)
+        # round(x, 2) rounds the exact decimal value of x, rint(x * 100) rounds
+        # an already-rounded product; they can only disagree next to a .5
+        # boundary, so those rows are recomputed with the scalar function.
+        near_half = np.abs(np.abs(scaled - np.floor(scaled)) - 0.5) <= 1e-9 * np.maximum(1.0, np.abs(scaled))
+        np.divide(rounded, 100, out=bmi, where=np.isfinite(scaled))
+    near_half &= ~invalid
+    for i in np.flatnonzero(near_half):
+        bmi[i] = calculate_bmi(float(w[i]), float(h[i]))
+
+    codes[...] = np.searchsorted(np.asarray(scheme.cutoffs, dtype=np.float64), bmi, side='right')
+    bmi[invalid] = np.nan
+    codes[invalid] = INVALID_CATEGORY
+    return BatchResult(bmi, codes, invalid, scheme)
+
+def _calculate_bmi_batch_python(weights, heights, out_bmi, out_codes, scheme) -> BatchResult:
+    w = memoryview(weights) if _is_buffer(weights) else weights
+    h = memoryview(heights) if _is_buffer(heights) else heights
+    n = len(w)
+    if len(h) != n:
+        raise ValueError("weights and heights must be 1-d and of equal length")
+    bmi = array('d', bytes(8 * n)) if out_bmi is None else _typed_view(out_bmi, 'd')
+    codes = array('b', bytes(n)) if out_codes is None else _typed_view(out_codes, 'b')
+    if len(bmi) != n or len(codes) != n:
+        raise ValueError(f"output buffers must have length {n}")
+    invalid = array('B', bytes(n))
+    cutoffs = scheme.cutoffs
+    nan = float('nan')
+
+    for i in range(n):
+        height_cm = h[i]
+        if height_cm <= 0:
+            bmi[i] = nan
+            codes[i] = INVALID_CATEGORY
+            invalid[i] = 1
+            continue
+        height_m = height_cm / 100
+        value = round(w[i] / (height_m ** 2), 2)
+        bmi[i] = value
+        codes[i] = bisect_right(cutoffs, value)
+    return BatchResult(bmi, codes, invalid, scheme)
+
+def _typed_view(buffer, fmt: str) -> memoryview:
+    view = memoryview(buffer)
+    if view.format != fmt:
+        view = view.cast('B').cast(fmt)
+    return view
+
+def _is_buffer(obj) -> bool:
+    try:
+        memoryview(obj)
+    except TypeError:
+        return False
+    return True
+
+def calculate_bmi_batch(weights, heights, out_bmi=None, out_codes=None,
+                        scheme: Optional[str] = None) -> BatchResult:
+    """
+    Calculate BMI and category codes for many rows in one pass
+    
+    Accepts NumPy arrays, float64 buffers such as array('d') or memoryview
+    (used without copying) or plain sequences. Results match calculate_bmi
+    and get_bmi_category row for row; rows with zero or negative height, for
+    which calculate_bmi raises ValueError, are flagged in the invalid mask.
+    NumPy is used when installed, otherwise a pure Python loop.
+    
+    Args:
+        weights: Weights in kilograms
+        heights: Heights in centimeters
+        out_bmi: Optional float64 buffer of the same length to write BMIs into
+        out_codes: Optional int8 buffer of the same length to write codes into
+        scheme: Classification scheme key, WHO adult cutoffs if None
+        
+    Returns:
+        BatchResult of (bmi, codes, invalid, scheme)
+    """
+    table = get_scheme(scheme)
+    np = _load_numpy()
+    if np is not None:
+        return _calculate_bmi_batch_numpy(np, weights, heights, out_bmi, out_codes, table)
+    return _calculate_bmi_batch_python(weights, heights, out_bmi, out_codes, table)
 
 def convert_kg_to_lbs(kg: float) -> float:
     """Convert kilograms to pounds"""
@@ -71,6 +223,10 @@ def convert_feet_inches_to_cm(feet: int, inches: float) -> float:
     total_inches = feet * 12 + inches
     return total_inches * 2.54
 
+# Valid input ranges in each unit system's own units: kg and cm, lbs and feet
+WEIGHT_RANGES = {"metric": (20, 300), "imperial": (44, 661)}
+HEIGHT_RANGES = {"metric": (100, 250), "imperial": (3.3, 8.2)}
+
 def validate_weight(weight: float, unit: str = "metric") -> bool:
     """
     Validate weight input
@@ -82,10 +238,8 @@ def validate_weight(weight: float, unit: str = "metric") -> bool:
     Returns:
         True if valid, False otherwise
     """
-    if unit == "metric":
-        return 20 <= weight <= 300  # 20-300 kg
-    else:
-        return 44 <= weight <= 661  # 44-661 lbs
+    low, high = WEIGHT_RANGES["metric" if unit == "metric" else "imperial"]
+    return low <= weight <= high
 
 def validate_height(height: float, unit: str = "metric") -> bool:
     """
@@ -98,22 +252,142 @@ def validate_height(height: float, unit: str = "metric") -> bool:
     Returns:
         True if valid, False otherwise
     """
-    if unit == "metric":
-        return 100 <= height <= 250  # 100-250 cm
-    else:
-        return 3.3 <= height <= 8.2  # 3.3-8.2 feet
+    low, high = HEIGHT_RANGES["metric" if unit == "metric" else "imperial"]
+    return low <= height <= high
 
-def format_height_display(height_cm: float, unit: str = "metric") -> str:
+# Unit systems of normalize_units_batch; the index is the row's unit code.
+# Weights are kg, lbs or stones (plus lbs), heights cm or feet (plus inches).
+UNIT_SYSTEMS = ("metric", "imperial", "stones")
+UNIT_CODES = {name: code for code, name in enumerate(UNIT_SYSTEMS)}
+INVALID_UNIT = 1
+INVALID_WEIGHT = 2
+INVALID_HEIGHT = 4
+
+# Per unit code: the range system weights are validated in, and the
+# divisor from that system's weight unit to kg
+_RANGE_SYSTEMS = ("metric", "imperial", "imperial")
+_KG_DIVISORS = (1.0, 2.20462, 2.20462)
+
+class NormalizedBatch(NamedTuple):
     """
-    Format height for display
+    Result of normalize_units_batch
+
+    Attributes:
+        weight_kg: Weight per row in kilograms, NaN where the row is invalid
+        height_cm: Height per row in centimeters, NaN where the row is invalid
+        errors: Per-row INVALID_UNIT | INVALID_WEIGHT | INVALID_HEIGHT flags, 0 if valid
+    """
+    weight_kg: Any
+    height_cm: Any
+    errors: Any
+
+def _normalize_units_numpy(np, weights, heights, units, pounds, inches) -> NormalizedBatch:
+    w = np.asarray(weights, dtype=np.float64)
+    h = np.asarray(heights, dtype=np.float64)
+    codes = np.asarray(units)
+    lb = np.zeros(len(w)) if pounds is None else np.asarray(pounds, dtype=np.float64)
+    inch = np.zeros(len(w)) if inches is None else np.asarray(inches, dtype=np.float64)
+    if w.ndim != 1 or any(column.shape != w.shape for column in (h, codes, lb, inch)):
+        raise ValueError("input columns must be 1-d and of equal length")
+
+    bad_unit = (codes < 0) | (codes >= len(UNIT_SYSTEMS))
+    code = np.where(bad_unit, 0, codes).astype(np.intp)
+    metric = code == UNIT_CODES["metric"]
+    # Per-unit constants are gathered by code so every unit converts in one pass
+    weight_low, weight_high, height_low, height_high = (
+        np.take(np.array(table, dtype=np.float64), code) for table in (
+            [WEIGHT_RANGES[system][0] for system in _RANGE_SYSTEMS],
+            [WEIGHT_RANGES[system][1] for system in _RANGE_SYSTEMS],
+            [HEIGHT_RANGES[system][0] for system in _RANGE_SYSTEMS],
+            [HEIGHT_RANGES[system][1] for system in _RANGE_SYSTEMS]))
+    with np.errstate(invalid='ignore', over='ignore'):
+        weight = np.where(code == UNIT_CODES["stones"], w * 14 + lb, w)
+        height = np.where(metric, h, h + inch / 12)
+        errors = np.where((weight >= weight_low) & (weight <= weight_high), 0, INVALID_WEIGHT)
+        errors |= np.where((height >= height_low) & (height <= height_high), 0, INVALID_HEIGHT)
+        errors[bad_unit] = INVALID_UNIT
+        errors = errors.astype(np.int8)
+        weight_kg = weight / np.take(np.array(_KG_DIVISORS), code)
+        height_cm = np.where(metric, h, (h * 12 + inch) * 2.54)
+    invalid = errors != 0
+    weight_kg[invalid] = np.nan
+    height_cm[invalid] = np.nan
+    return NormalizedBatch(weight_kg, height_cm, errors)
+
+def _normalize_units_python(weights, heights, units, pounds, inches) -> NormalizedBatch:
+    w, h, codes = (memoryview(column) if _is_buffer(column) else column
+                   for column in (weights, heights, units))
+    n = len(w)
+    if (len(h) != n or len(codes) != n or (pounds is not None and len(pounds) != n)
+            or (inches is not None and len(inches) != n)):
+        raise ValueError("input columns must be 1-d and of equal length")
+    weight_kg = array('d', bytes(8 * n))
+    height_cm = array('d', bytes(8 * n))
+    errors = array('b', bytes(n))
+    ranges = [(WEIGHT_RANGES[system], HEIGHT_RANGES[system]) for system in _RANGE_SYSTEMS]
+    stones = UNIT_CODES["stones"]
+    nan = float('nan')
+
+    for i in range(n):
+        code = codes[i]
+        if not 0 <= code < len(UNIT_SYSTEMS):
+            errors[i] = INVALID_UNIT
+            weight_kg[i] = height_cm[i] = nan
+            continue
+        weight, height = w[i], h[i]
+        if code == stones:
+            weight = weight * 14 + (pounds[i] if pounds is not None else 0.0)
+        extra_inches = 0.0
+        if code and inches is not None:
+            extra_inches = inches[i]
+            height = height + extra_inches / 12
+        (weight_low, weight_high), (height_low, height_high) = ranges[code]
+        error = (0 if weight_low <= weight <= weight_high else INVALID_WEIGHT) | (
+            0 if height_low <= height <= height_high else INVALID_HEIGHT)
+        if error:
+            errors[i] = error
+            weight_kg[i] = height_cm[i] = nan
+            continue
+        weight_kg[i] = weight / _KG_DIVISORS[code]
+        height_cm[i] = (h[i] * 12 + extra_inches) * 2.54 if code else height
+    return NormalizedBatch(weight_kg, height_cm, errors)
+
+def normalize_units_batch(weights, heights, units, pounds=None, inches=None) -> NormalizedBatch:
+    """
+    Convert mixed-unit rows to kg/cm and check their ranges in one pass
+
+    Each row's unit code (an index into UNIT_SYSTEMS, see UNIT_CODES) says
+    how to read it: metric rows are kg and cm, imperial rows lbs and feet,
+    stones rows stones and feet. Ranges are checked in the row's own units
+    like validate_weight/validate_height (stones as lbs), and converted
+    values match convert_lbs_to_kg/convert_feet_inches_to_cm. The result
+    columns can be passed straight to calculate_bmi_batch.
     
     Args:
-        height_cm: Height in centimeters
-        unit: Display unit ("metric" or "imperial")
+        weights: Weight per row in the row's unit
+        heights: Height per row, cm or (whole or decimal) feet
+        units: Unit code per row
+        pounds: Optional lbs added to stones rows' weights
+        inches: Optional inches added to non-metric rows' heights
         
     Returns:
-        Formatted height string
+        NormalizedBatch of (weight_kg, height_cm, errors)
     """
+    np = _load_numpy()
+    if np is not None:
+        return _normalize_units_numpy(np, weights, heights, units, pounds, inches)
+    return _normalize_units_python(weights, heights, units, pounds, inches)
+
+# Display labels for the GUI's input domain: integer heights on the slider
+# and weights in 0.1 kg steps across validate_weight's metric range. Tables
+# map each value to its label and are built per unit on first use; values
+# outside them are formatted directly.
+HEIGHT_LABEL_RANGE = (100, 250)
+WEIGHT_LABEL_RANGE = (20, 300)
+_height_labels: Dict[str, Dict[float, str]] = {}
+_weight_labels: Dict[str, Dict[float, str]] = {}
+
+def _format_height(height_cm: float, unit: str) -> str:
     if unit == "metric":
         text_string = str(int(height_cm))
         if len(text_string) >= 2:
@@ -126,6 +400,50 @@ def format_height_display(height_cm: float, unit: str = "metric") -> str:
         feet, inches = convert_cm_to_feet_inches(height_cm)
         return f"{feet}'{inches:.1f}\""
 
+def _format_weight(weight_kg: float, unit: str) -> str:
+    if unit == "metric":
+        return f"{weight_kg:.1f}kg"
+    else:
+        lbs = convert_kg_to_lbs(weight_kg)
+        return f"{lbs:.1f}lbs"
+
+def height_labels(unit: str = "metric") -> Dict[float, str]:
+    """Labels of every centimeter in HEIGHT_LABEL_RANGE, built on first use"""
+    unit = "metric" if unit == "metric" else "imperial"
+    labels = _height_labels.get(unit)
+    if labels is None:
+        low, high = HEIGHT_LABEL_RANGE
+        labels = _height_labels[unit] = {cm: _format_height(cm, unit) for cm in range(low, high + 1)}
+    return labels
+
+def weight_labels(unit: str = "metric") -> Dict[float, str]:
+    """Labels of every 0.1 kg step in WEIGHT_LABEL_RANGE, built on first use"""
+    unit = "metric" if unit == "metric" else "imperial"
+    labels = _weight_labels.get(unit)
+    if labels is None:
+        low, high = WEIGHT_LABEL_RANGE
+        labels = _weight_labels[unit] = {tenths / 10: _format_weight(tenths / 10, unit)
+                                         for tenths in range(low * 10, high * 10 + 1)}
+    return labels
+
+def format_height_display(height_cm: float, unit: str = "metric") -> str:
+    """
+    Format height for display
+    
+    Args:
+        height_cm: Height in centimeters
+        unit: Display unit ("metric" or "imperial")
+        
+    Returns:
+        Formatted height string
+    """
+    labels = _height_labels.get(unit) or height_labels(unit)
+    label = labels.get(height_cm)
+    if label is None and unit == "metric" and HEIGHT_LABEL_RANGE[0] <= height_cm <= HEIGHT_LABEL_RANGE[1]:
+        # Metric labels truncate to the centimeter
+        label = labels[int(height_cm)]
+    return label if label is not None else _format_height(height_cm, unit)
+
 def format_weight_display(weight_kg: float, unit: str = "metric") -> str:
     """
     Format weight for display
@@ -137,13 +455,178 @@ def format_weight_display(weight_kg: float, unit: str = "metric") -> str:
     Returns:
         Formatted weight string
     """
-    if unit == "metric":
-        return f"{weight_kg:.1f}kg"
+    labels = _weight_labels.get(unit) or weight_labels(unit)
+    label = labels.get(weight_kg)
+    if label is None and WEIGHT_LABEL_RANGE[0] <= weight_kg <= WEIGHT_LABEL_RANGE[1]:
+        # Repeated 0.1 kg steps in the GUI drift slightly off the step
+        step = round(weight_kg * 10) / 10
+        if abs(weight_kg - step) < 1e-7:
+            label = labels.get(step)
+    return label if label is not None else _format_weight(weight_kg, unit)
+
+# Weight bands: the inverse of classification. Limits are in 0.1 kg steps,
+# the GUI's smallest weight step, and every weight from a band's low to its
+# high limit is classified into that band by calculate_bmi.
+HEALTHY_CATEGORY = "Normal"
+_band_tables: Dict[Tuple[str, str], Dict[int, str]] = {}
+
+class WeightBand(NamedTuple):
+    """Weights of one category at a given height, in kg (None for an open end)"""
+    name: str
+    color: str
+    low_kg: Optional[float]
+    high_kg: Optional[float]
+
+def _first_step(height_cm: float, cutoff: float) -> int:
+    """Smallest weight in 0.1 kg steps whose calculate_bmi result is at least cutoff"""
+    height_m2 = (height_cm / 100) ** 2
+    step = math.ceil((cutoff - 0.005) * height_m2 * 10)
+    # The estimate is off by at most a step where rounding lands exactly on .005
+    while round((step / 10) / height_m2, 2) < cutoff:
+        step += 1
+    while step > 0 and round(((step - 1) / 10) / height_m2, 2) >= cutoff:
+        step -= 1
+    return step
+
+def weight_bands(height_cm: float, scheme: Optional[str] = None) -> Tuple[WeightBand, ...]:
+    """
+    Weight range of every category at a height
+
+    Args:
+        height_cm: Height in centimeters
+        scheme: Classification scheme key, WHO adult cutoffs if None
+
+    Returns:
+        One WeightBand per category, lowest first
+
+    Raises:
+        ValueError: If height is zero or negative
+    """
+    if height_cm <= 0:
+        raise ValueError("Height must be positive")
+    table = get_scheme(scheme)
+    steps = [_first_step(height_cm, cutoff) for cutoff in table.cutoffs]
+    lows = [None] + [step / 10 for step in steps]
+    highs = [(step - 1) / 10 for step in steps] + [None]
+    return tuple(WeightBand(name, color, low, high)
+                 for (name, color), low, high in zip(table.categories, lows, highs))
+
+def healthy_weight_range(height_cm: float, scheme: Optional[str] = None) -> Tuple[float, float]:
+    """(lowest, highest) weight in kg classified as the healthy category at a height"""
+    bands = weight_bands(height_cm, scheme)
+    band = next((band for band in bands if band.name == HEALTHY_CATEGORY), bands[1])
+    return band.low_kg, band.high_kg
+
+def _format_band(height_cm: float, unit: str, scheme: Optional[str]) -> str:
+    low, high = healthy_weight_range(height_cm, scheme)
+    if unit != "metric":
+        return f"Healthy weight: {convert_kg_to_lbs(low):.1f} - {convert_kg_to_lbs(high):.1f}lbs"
+    return f"Healthy weight: {low:.1f} - {high:.1f}kg"
+
+def healthy_weight_labels(unit: str = "metric", scheme: Optional[str] = None) -> Dict[int, str]:
+    """Healthy weight label of every centimeter in HEIGHT_LABEL_RANGE, built on first use"""
+    unit = "metric" if unit == "metric" else "imperial"
+    key = (get_scheme(scheme).key, unit)
+    labels = _band_tables.get(key)
+    if labels is None:
+        low, high = HEIGHT_LABEL_RANGE
+        labels = _band_tables[key] = {cm: _format_band(cm, unit, scheme) for cm in range(low, high + 1)}
+    return labels
+
+def format_healthy_weight(height_cm: float, unit: str = "metric", scheme: Optional[str] = None) -> str:
+    """
+    Healthy weight range at a height for display, e.g. "Healthy weight: 53.5 - 72.2kg"
+
+    Args:
+        height_cm: Height in centimeters
+        unit: Display unit ("metric" or "imperial")
+        scheme: Classification scheme key, WHO adult cutoffs if None
+
+    Returns:
+        Formatted range ("" if height is not positive)
+    """
+    label = healthy_weight_labels(unit, scheme).get(height_cm)
+    if label is None:
+        if height_cm <= 0:
+            return ""
+        label = _format_band(height_cm, unit, scheme)
+    return label
+
+class BandBatch(NamedTuple):
+    """
+    Result of weight_bands_batch
+
+    Attributes:
+        lows: Per category, the lowest weight in kg of each row (None for the
+            first category), NaN where the row is invalid
+        highs: Per category, the highest weight in kg of each row (None for
+            the last category), NaN where the row is invalid
+        scheme: Classification scheme the categories come from
+    """
+    lows: Tuple[Any, ...]
+    highs: Tuple[Any, ...]
+    scheme: CutoffScheme = WHO_ADULT
+
+    def band(self, category: Any = HEALTHY_CATEGORY) -> Tuple[Any, Any]:
+        """(low, high) columns of a category, given by name or code"""
+        if isinstance(category, str):
+            names = [name for name, _ in self.scheme.categories]
+            category = names.index(category)
+        return self.lows[category], self.highs[category]
+
+def weight_bands_batch(heights_cm, scheme: Optional[str] = None) -> BandBatch:
+    """
+    Category weight ranges for many heights in one pass, e.g. a whole roster
+
+    Results match weight_bands row for row; rows with zero or negative
+    height get NaN. NumPy is used when installed, otherwise a pure Python
+    loop.
+
+    Args:
+        heights_cm: Heights in centimeters
+        scheme: Classification scheme key, WHO adult cutoffs if None
+
+    Returns:
+        BandBatch of per-category low and high columns
+    """
+    table = get_scheme(scheme)
+    np = _load_numpy()
+    if np is not None:
+        steps = _band_steps_numpy(np, heights_cm, table)
+        lows = [step / 10 for step in steps]
+        highs = [(step - 1) / 10 for step in steps]
     else:
-        lbs = convert_kg_to_lbs(weight_kg)
-        return f"{lbs:.1f}lbs"
+        steps = _band_steps_python(heights_cm, table)
+        lows = [array('d', (step / 10 for step in column)) for column in steps]
+        highs = [array('d', ((step - 1) / 10 for step in column)) for column in steps]
+    return BandBatch(tuple([None] + lows), tuple(highs + [None]), table)
 
-def create_history_entry(weight: float, height: float, bmi: float, unit: str) -> Dict[str, Any]:
+def _band_steps_python(heights_cm, table: CutoffScheme) -> list:
+    """Per cutoff, the _first_step of every row (NaN for invalid rows)"""
+    h = memoryview(heights_cm) if _is_buffer(heights_cm) else heights_cm
+    nan = float('nan')
+    return [[_first_step(height, cutoff) if height > 0 else nan for height in h]
+            for cutoff in table.cutoffs]
+
+def _band_steps_numpy(np, heights_cm, table: CutoffScheme) -> list:
+    h = np.asarray(heights_cm, dtype=np.float64)
+    if h.ndim != 1:
+        raise ValueError("heights must be 1-d")
+    invalid = ~(h > 0)
+    h = np.where(invalid, 1.0, h)
+    height_m2 = (h / 100) ** 2
+    columns = []
+    for cutoff in table.cutoffs:
+        steps = np.ceil((cutoff - 0.005) * height_m2 * 10)
+        # Same one-step correction as _first_step, with calculate_bmi's rounding
+        steps += calculate_bmi_batch(steps / 10, h).bmi < cutoff
+        steps -= (calculate_bmi_batch((steps - 1) / 10, h).bmi >= cutoff) & (steps > 0)
+        steps[invalid] = np.nan
+        columns.append(steps)
+    return columns
+
+def create_history_entry(weight: float, height: float, bmi: float, unit: str,
+                         scheme: Optional[str] = None) -> Dict[str, Any]:
     """
     Create a history entry
     
@@ -152,6 +635,8 @@ def create_history_entry(weight: float, height: float, bmi: float, unit: str) ->
         height: Height value
         bmi: Calculated BMI
         unit: Unit system used
+        scheme: Classification scheme key the category was shown in,
+                WHO adult cutoffs if None
         
     Returns:
         History entry dictionary
@@ -162,7 +647,7 @@ def create_history_entry(weight: float, height: float, bmi: float, unit: str) ->
         'height': height,
         'bmi': bmi,
         'unit': unit,
-        'category': get_bmi_category(bmi)[0]
+        'category': get_bmi_category(bmi, scheme)[0]
     }
 
 def sanitize_filename(filename: str) -> str:
@@ -175,6 +660,8 @@ def sanitize_filename(filename: str) -> str:
     Returns:
         Sanitized filename
     """
+    import re
+    
     # Remove or replace invalid characters
     filename = re.sub(r'[<>:"/\\|?*]', '_', filename)
     # Remove leading/trailing spaces and dots
@@ -18,7 +18,7 @@ def test_imports():
         return False
     
     try:
-        from settings import *
+        import settings
         print("✅ Settings imported successfully")
     except ImportError as e:
         print(f"❌ Settings import failed: {e}")
@@ -0,0 +1,211 @@
+"""
+Headless view-model for the BMI Calculator Pro GUI
+
+The GUI state (height, weight, unit and everything derived from them) is a
+small dependency graph with no Tk in it. Inputs are set on source nodes;
+computed nodes are recomputed only when one of their inputs changed, in
+dependency order, and each changed value is pushed to its bound callbacks
+once per propagation. Widgets only bind callbacks and set sources, so the
+whole update path can be driven and measured without a display.
+
+Propagation runs immediately, once per ``with graph.batch():`` block, or,
+with a ``schedule`` function such as Tk's after_idle, once per idle cycle
+however many inputs changed in between.
+"""
+
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import metrics
+from classification import CutoffScheme, get_scheme
+from utils import format_height_display, format_healthy_weight, format_weight_display
+
+class DependencyGraph:
+    """
+    Source and computed values with change propagation
+
+    Attributes:
+        stats: Counters of input events, propagations, node recomputes and
+            callback notifications
+    """
+
+    def __init__(self, schedule: Optional[Callable[[Callable[[], None]], Any]] = None):
+        """
+        Args:
+            schedule: Called with flush to defer propagation (e.g. Tk's
+                after_idle); None propagates as soon as a source changes
+        """
+        self.schedule = schedule
+        self.stats = {'events': 0, 'flushes': 0, 'recomputes': 0, 'notifications': 0}
+        self._values: Dict[str, Any] = {}
+        self._sources = set()
+        # Computed nodes in declaration order, which is a topological order
+        # because a node can only depend on nodes declared before it
+        self._computed: List[Tuple[str, Tuple[str, ...], Callable]] = []
+        self._order: List[str] = []
+        self._subscribers: Dict[str, List[Callable[[Any], Any]]] = {}
+        self._changed = set()
+        self._batch_depth = 0
+        self._scheduled = False
+
+    def source(self, name: str, value: Any):
+        """Declare an input node"""
+        self._declare(name)
+        self._sources.add(name)
+        self._values[name] = value
+
+    def computed(self, name: str, inputs: Sequence[str], fn: Callable[..., Any]):
+        """
+        Declare a node computed as fn(*input values)
+
+        Raises:
+            KeyError: If an input has not been declared yet
+        """
+        inputs = tuple(inputs)
+        for dependency in inputs:
+            if dependency not in self._values:
+                raise KeyError(f"Unknown input {dependency!r} for {name!r}")
+        self._declare(name)
+        self._computed.append((name, inputs, fn))
+        self._values[name] = fn(*(self._values[dependency] for dependency in inputs))
+
+    def _declare(self, name: str):
+        if name in self._values:
+            raise ValueError(f"Node {name!r} is already declared")
+        self._order.append(name)
+
+    def __getitem__(self, name: str) -> Any:
+        return self._values[name]
+
+    def set(self, name: str, value: Any):
+        """
+        Set a source; dependents update on the next propagation
+
+        Raises:
+            KeyError: If name is not a source node
+        """
+        if name not in self._sources:
+            raise KeyError(f"{name!r} is not a source node")
+        self.stats['events'] += 1
+        if value == self._values[name]:
+            return
+        self._values[name] = value
+        self._changed.add(name)
+        self._request_flush()
+
+    def update(self, **values: Any):
+        """Set several sources with a single propagation"""
+        with self.batch():
+            for name, value in values.items():
+                self.set(name, value)
+
+    @contextmanager
+    def batch(self):
+        """Defer propagation until the outermost batch block ends"""
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+        if self._changed:
+            self._request_flush()
+
+    def bind(self, name: str, callback: Callable[[Any], Any], initial: bool = True):
+        """Call callback(value) now (unless initial is False) and whenever the node changes"""
+        if name not in self._values:
+            raise KeyError(f"Unknown node {name!r}")
+        self._subscribers.setdefault(name, []).append(callback)
+        if initial:
+            callback(self._values[name])
+
+    def _request_flush(self):
+        if self._batch_depth:
+            return
+        if self.schedule is None:
+            self.flush()
+        elif not self._scheduled:
+            self._scheduled = True
+            self.schedule(self.flush)
+
+    @metrics.timed('gui.propagate')
+    def flush(self):
+        """Recompute nodes whose inputs changed and notify their subscribers"""
+        self._scheduled = False
+        changed = self._changed
+        if not changed:
+            return
+        self._changed = set()
+        stats = self.stats
+        stats['flushes'] += 1
+        values = self._values
+        for name, inputs, fn in self._computed:
+            if changed.isdisjoint(inputs):
+                continue
+            stats['recomputes'] += 1
+            value = fn(*(values[dependency] for dependency in inputs))
+            if value != values[name]:
+                values[name] = value
+                changed.add(name)
+        for name in self._order:
+            if name in changed:
+                for callback in self._subscribers.get(name, ()):
+                    stats['notifications'] += 1
+                    callback(values[name])
+
+def _bmi(height_cm: float, weight_kg: float) -> Optional[float]:
+    height_m = height_cm / 100
+    if height_m <= 0:  # Prevent division by zero
+        return None
+    return round(weight_kg / height_m ** 2, 2)
+
+class BMIViewModel(DependencyGraph):
+    """
+    The calculator's state as a dependency graph
+
+    Sources:
+        height (int cm), weight (float kg), unit ("metric" or "imperial")
+    Computed:
+        bmi (None when height is not positive), bmi_text, category_label,
+        height_label, weight_label, unit_label, band_label (healthy weight
+        range at the current height)
+    """
+
+    def __init__(self, height: int = 170, weight: float = 65.0, unit: str = "metric",
+                 scheme: Optional[CutoffScheme] = None,
+                 schedule: Optional[Callable[[Callable[[], None]], Any]] = None):
+        super().__init__(schedule)
+        self.scheme = scheme or get_scheme()
+        # BMIs are rounded to 2 decimals, so the precomputed label table hits
+        labels = self.scheme.label_table()
+        display_labels = self.scheme.display_labels
+        code = self.scheme.code
+
+        def category_label(bmi):
+            if bmi is None:
+                return ""
+            label = labels.get(bmi)
+            return display_labels[code(bmi)] if label is None else label
+
+        self.source('height', height)
+        self.source('weight', weight)
+        self.source('unit', unit)
+        self.computed('bmi', ('height', 'weight'), _bmi)
+        self.computed('bmi_text', ('bmi',), lambda bmi: "0.0" if bmi is None else str(bmi))
+        self.computed('category_label', ('bmi',), category_label)
+        self.computed('height_label', ('height', 'unit'), format_height_display)
+        self.computed('weight_label', ('weight', 'unit'), format_weight_display)
+        self.computed('unit_label', ('unit',), str.title)
+        # A table lookup per slider step (see utils.healthy_weight_labels)
+        self.computed('band_label', ('height', 'unit'),
+                      lambda height, unit: format_healthy_weight(height, unit, self.scheme.key))
+
+    def set_height(self, height_cm: float):
+        """Set the height from a slider position (whole centimeters)"""
+        self.set('height', int(height_cm))
+
+    def step_weight(self, amount: float):
+        """Add amount (negative to subtract) to the weight in kg"""
+        self.set('weight', self['weight'] + amount)
+
+    def toggle_unit(self):
+        self.set('unit', "imperial" if self['unit'] == "metric" else "metric")